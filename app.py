@@ -9,11 +9,44 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
+from datetime import datetime
+import functools
+import json
+import time
 import warnings
+import pyarrow as pa
 warnings.filterwarnings('ignore')
 
+from promo_pulse.data import (
+    dataset_cache_exists, dataset_cache_key, dataset_views, ingest_uploaded_data,
+    load_sample_frames, memory_report, read_dataset_cache, set_memo_store,
+    timestamp_issue_counts,
+)
+from promo_pulse.analytics import (
+    DAY_NAMES, cube_distinct_transactions, cube_rollup, filter_rows, format_month,
+    month_labels, overview_metrics, sales_cube, with_derived_columns,
+)
+from promo_pulse.simulation import (
+    ALL_LABEL, MC_DRAW_OPTIONS, PROMO_TYPE_MULTIPLIERS, best_scenario, cap_to_availability, grid_slice,
+    optimize_promotion, simulate_grid, simulate_inventory, simulate_monte_carlo, simulate_promotion,
+    simulation_baseline,
+)
+from promo_pulse import profiling
+from promo_pulse.profiling import profiled
+from promo_pulse.cleaning import (
+    auto_clean, convert_column_type, data_quality_metrics, fill_missing,
+    missing_value_summary, outlier_bounds, treat_outliers,
+)
+from promo_pulse.distributions import (
+    SCATTER_SAMPLE_SIZE, box_stats, density_grid, histogram_bins, kde_curve, scatter_mode,
+    stratified_sample, use_raw_points,
+)
+from promo_pulse.downsampling import downsample, point_budget
+from promo_pulse.elasticity import estimate_elasticities, lookup_elasticity
+from promo_pulse.figure_cache import FigureCache, fingerprint
+
 # =============================================================================
 # PAGE CONFIGURATION
 # =============================================================================
@@ -1641,10 +1674,62 @@ def render_empty_state(icon, title, message):
     st.markdown(f'<div style="text-align: center; padding: 60px 40px;"><div style="font-size: 4rem; margin-bottom: 16px;">{icon}</div><div style="font-size: 1.3rem; font-weight: 700; color: var(--text-primary); margin-bottom: 8px;">{title}</div><div style="color: var(--text-muted); font-size: 1rem;">{message}</div></div>', unsafe_allow_html=True)
 
 
+def _arrow_payload_bytes(df):
+    """Size of a DataFrame as the Arrow IPC stream st.dataframe sends, if computable."""
+    if not isinstance(df, pd.DataFrame):
+        return None
+    try:
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().size
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+
+
+def _trace_points(trace):
+    """Number of data points in a plotly trace."""
+    for attr in ('x', 'y', 'values', 'z'):
+        values = getattr(trace, attr, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+def render_plotly_chart(fig, **kwargs):
+    """st.plotly_chart, recorded as a profiler span sized by the figure JSON."""
+    with profiling.span('st.plotly_chart', 'chart') as record:
+        result = st.plotly_chart(fig, **kwargs)
+    if record is not None:
+        record['rows'] = sum(_trace_points(trace) for trace in fig.data)
+        record['bytes'] = len(fig.to_json())
+    return result
+
+
+def render_dataframe(data, **kwargs):
+    """st.dataframe, recorded as a profiler span sized by its Arrow payload."""
+    with profiling.span('st.dataframe', 'table') as record:
+        result = st.dataframe(data, **kwargs)
+    if record is not None:
+        record['rows'] = len(data) if isinstance(data, pd.DataFrame) else None
+        record['bytes'] = _arrow_payload_bytes(data)
+    return result
+
+
 # =============================================================================
 # CHART STYLING UTILITIES
 # =============================================================================
 
+# Approximate plot width of the wide page layout, used to size trend point budgets
+PAGE_CHART_WIDTH_PX = 1400
+
+
+def trend_point_budget(column_share=1.0):
+    """Points worth plotting on a trend chart spanning ``column_share`` of the page."""
+    return point_budget(PAGE_CHART_WIDTH_PX * column_share)
+
+
 def get_chart_colors():
     """Get premium chart color palette."""
     return ['#6366f1', '#ec4899', '#06b6d4', '#10b981', '#f59e0b', '#8b5cf6', '#f43f5e', '#14b8a6', '#f97316', '#84cc16']
@@ -1756,436 +1841,241 @@ def create_gauge_chart(value, title, max_value=100, color="primary"):
         height=250,
         margin=dict(l=30, r=30, t=50, b=30)
     )
-    
+
+    return fig
+
+
+def scatter_chart(df, x, y, color=None, **kwargs):
+    """Scatter of ``df`` rendered by point count (see ``scatter_mode``).
+
+    Small frames use SVG and larger ones WebGL; beyond WEBGL_POINTS_LIMIT a 2D
+    density grid is drawn under a stratified WebGL sample. Extra keyword
+    arguments go to ``px.scatter``.
+    """
+    mode = scatter_mode(len(df))
+    if mode != 'density':
+        return px.scatter(df, x=x, y=y, color=color, render_mode=mode, **kwargs)
+
+    strata = color if color is not None and not pd.api.types.is_numeric_dtype(df[color]) else None
+    sample = stratified_sample(df, SCATTER_SAMPLE_SIZE, strata)
+    fig = px.scatter(sample, x=x, y=y, color=color, render_mode='webgl', opacity=0.7, **kwargs)
+
+    x_centers, y_centers, counts = density_grid(df[x], df[y])
+    fig.add_trace(go.Heatmap(
+        x=x_centers, y=y_centers, z=np.where(counts > 0, counts, np.nan),
+        colorscale=[[0, 'rgba(99, 102, 241, 0.15)'], [1, 'rgba(99, 102, 241, 0.9)']],
+        showscale=False, name='Density', hovertemplate="count: %{z:,}<extra></extra>"
+    ))
+    # Draw the density grid beneath the sample points
+    fig.data = fig.data[-1:] + fig.data[:-1]
+    return fig
+
+
+@st.cache_resource
+def chart_figure_cache():
+    """Process-wide figure cache shared by all sessions."""
+    return FigureCache()
+
+
+def cached_figure(build, *inputs, **options):
+    """``build(*inputs, **options)``, reused while its inputs and options are unchanged.
+
+    ``inputs`` are the aggregated frames (hashed by content) and chart settings the
+    figure depends on. The cache holds the figure's JSON and a hit rebuilds a fresh
+    figure from it, so callers may modify the returned figure.
+    """
+    cache = chart_figure_cache()
+    key = fingerprint(build.__qualname__, *inputs, sorted(options.items()))
+    figure_json = cache.get(key)
+    if figure_json is not None:
+        return pio.from_json(figure_json)
+    with profiling.span(build.__name__, 'figure'):
+        fig = build(*inputs, **options)
+    cache.put(key, pio.to_json(fig, validate=False))
+    return fig
+
+
+def _distribution_groups(df, y, x=None):
+    """``(label, values)`` per category of ``x``, or one group for the whole column."""
+    if x is None:
+        return [(y, df[y])]
+    return [(str(label), values) for label, values in df.groupby(x, observed=True)[y]]
+
+
+def distribution_histogram(df, x, nbins=30, color='#6366f1'):
+    """Histogram of ``df[x]``; large columns are binned server-side."""
+    if use_raw_points(len(df)):
+        return px.histogram(df, x=x, nbins=nbins, color_discrete_sequence=[color])
+
+    counts, edges = histogram_bins(df[x], nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=f"{x}: %{{customdata[0]:,.2f}} – %{{customdata[1]:,.2f}}<br>count: %{{y:,}}<extra></extra>"
+    ))
+    fig.update_layout(xaxis_title=x, yaxis_title="count", bargap=0)
+    return fig
+
+
+def distribution_box(df, y, x=None, colors=None):
+    """Box plot of ``df[y]`` (per ``x`` category); large columns send quartiles only."""
+    colors = colors or ['#6366f1']
+    if use_raw_points(len(df)):
+        return px.box(df, x=x, y=y, color=x, color_discrete_sequence=colors)
+
+    fig = go.Figure()
+    for i, (label, values) in enumerate(_distribution_groups(df, y, x)):
+        stats = box_stats(values)
+        if stats is None:
+            continue
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(
+            x=[label], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']], mean=[stats['mean']],
+            name=label, marker_color=color, boxpoints=False
+        ))
+        if len(stats['outliers']) > 0:
+            fig.add_trace(go.Scatter(
+                x=[label] * len(stats['outliers']), y=stats['outliers'], mode='markers',
+                marker=dict(color=color, size=4), name=label, showlegend=False
+            ))
+    fig.update_layout(xaxis_title=x or "", yaxis_title=y)
+    return fig
+
+
+def distribution_violin(df, y, x=None, colors=None):
+    """Violin plot of ``df[y]`` (per ``x`` category); large columns send a KDE outline."""
+    colors = colors or ['#6366f1']
+    if use_raw_points(len(df)):
+        return px.violin(df, x=x, y=y, color=x, color_discrete_sequence=colors, box=True)
+
+    fig = go.Figure()
+    labels = []
+    for label, values in _distribution_groups(df, y, x):
+        grid, density = kde_curve(values)
+        stats = box_stats(values)
+        if stats is None:
+            continue
+        position = len(labels)
+        color = colors[position % len(colors)]
+        half = density / density.max() * 0.4
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([position + half, (position - half)[::-1]]),
+            y=np.concatenate([grid, grid[::-1]]),
+            fill='toself', mode='lines', line=dict(color=color, width=1),
+            name=label, hoverinfo='name'
+        ))
+        fig.add_trace(go.Box(
+            x=[position], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']],
+            name=label, marker_color=color, boxpoints=False, width=0.08, showlegend=False
+        ))
+        labels.append(label)
+    fig.update_layout(
+        xaxis=dict(tickvals=list(range(len(labels))), ticktext=labels, title=x or ""),
+        yaxis_title=y
+    )
     return fig
 
 
 # =============================================================================
-# DATA VALIDATION & LOADING
+# DATASET LOADING (CACHED)
 # =============================================================================
 
-EXPECTED_COLUMNS = {
-    'sales': ['transaction_id', 'sku_id', 'store_id', 'quantity_sold', 'unit_price', 'transaction_date'],
-    'inventory': ['record_id', 'sku_id', 'store_id', 'stock_level', 'reorder_point', 'reorder_quantity', 'last_updated'],
-    'promotions': ['promotion_id', 'sku_id', 'store_id', 'promotion_type', 'discount_percentage', 'start_date', 'end_date'],
-    'products': ['sku_id', 'product_name', 'category', 'brand', 'unit_cost', 'supplier_id']
-}
+# Dataset memos (derived columns, filter bitmaps, sales cube) are per session
+set_memo_store(st.session_state)
 
 
-def validate_dataframe(df, file_type):
-    """Validate DataFrame has required columns."""
-    if df is None or df.empty:
-        return False, "Empty dataframe"
-    
-    expected = set(EXPECTED_COLUMNS.get(file_type, []))
-    df.columns = df.columns.str.lower().str.strip()
-    actual = set(df.columns)
-    
-    missing = expected - actual
-    if missing:
-        return False, f"Missing columns: {', '.join(missing)}"
-    
-    return True, "Valid"
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_sample_data(seed=42, as_of=None):
+    """Sample star-schema frames (see load_sample_frames), memoized per process."""
+    return load_sample_frames(seed, as_of)
 
 
-@st.cache_data(ttl=3600)
-def load_and_process_data(sales_file, inventory_file, promotions_file, products_file=None):
-    """Load and process all data files with caching."""
-    try:
-        # Load files
-        sales_df = pd.read_csv(sales_file)
-        inventory_df = pd.read_csv(inventory_file)
-        promotions_df = pd.read_csv(promotions_file)
-        products_df = pd.read_csv(products_file) if products_file else None
-        
-        # Normalize column names
-        sales_df.columns = sales_df.columns.str.lower().str.strip().str.replace(' ', '_')
-        inventory_df.columns = inventory_df.columns.str.lower().str.strip().str.replace(' ', '_')
-        promotions_df.columns = promotions_df.columns.str.lower().str.strip().str.replace(' ', '_')
-        if products_df is not None:
-            products_df.columns = products_df.columns.str.lower().str.strip().str.replace(' ', '_')
-        
-        # Validate required columns (flexible validation)
-        def validate_df(df, name, required_cols):
-            actual = set(df.columns)
-            missing = set(required_cols) - actual
-            if missing:
-                return False, f"Missing columns: {', '.join(missing)}"
-            return True, "Valid"
-        
-        # Basic validation
-        sales_valid, sales_msg = validate_df(sales_df, 'sales', ['sku_id', 'store_id', 'quantity_sold'])
-        inventory_valid, inv_msg = validate_df(inventory_df, 'inventory', ['sku_id', 'store_id', 'stock_level'])
-        promo_valid, promo_msg = validate_df(promotions_df, 'promotions', ['sku_id', 'discount_percentage'])
-        
-        if not sales_valid:
-            return None, None, None, None, f"Sales: {sales_msg}"
-        if not inventory_valid:
-            return None, None, None, None, f"Inventory: {inv_msg}"
-        if not promo_valid:
-            return None, None, None, None, f"Promotions: {promo_msg}"
-        
-        # Process sales dates
-        date_cols = ['transaction_date', 'date', 'sale_date', 'order_date']
-        for col in date_cols:
-            if col in sales_df.columns:
-                sales_df['transaction_date'] = pd.to_datetime(sales_df[col], errors='coerce')
-                break
-        
-        if 'transaction_date' in sales_df.columns:
-            sales_df['date'] = sales_df['transaction_date'].dt.date
-            sales_df['month'] = sales_df['transaction_date'].dt.to_period('M').astype(str)
-            sales_df['week'] = sales_df['transaction_date'].dt.isocalendar().week
-            sales_df['day_of_week'] = sales_df['transaction_date'].dt.day_name()
-            sales_df['hour'] = sales_df['transaction_date'].dt.hour
-            sales_df['year'] = sales_df['transaction_date'].dt.year
-            sales_df['quarter'] = sales_df['transaction_date'].dt.quarter
-        
-        # Process promotion dates
-        if 'start_date' in promotions_df.columns:
-            promotions_df['start_date'] = pd.to_datetime(promotions_df['start_date'], errors='coerce')
-        if 'end_date' in promotions_df.columns:
-            promotions_df['end_date'] = pd.to_datetime(promotions_df['end_date'], errors='coerce')
-        
-        # Calculate revenue
-        if 'quantity_sold' in sales_df.columns and 'unit_price' in sales_df.columns:
-            sales_df['revenue'] = sales_df['quantity_sold'] * sales_df['unit_price']
-        elif 'quantity_sold' in sales_df.columns:
-            sales_df['revenue'] = sales_df['quantity_sold'] * 10  # Default price
-        
-        # Calculate inventory metrics
-        if 'stock_level' in inventory_df.columns:
-            if 'reorder_point' not in inventory_df.columns:
-                inventory_df['reorder_point'] = inventory_df['stock_level'] * 0.3
-            
-            inventory_df['stock_status'] = inventory_df.apply(
-                lambda x: 'Critical' if x['stock_level'] <= x['reorder_point'] * 0.5
-                else 'Low' if x['stock_level'] <= x['reorder_point']
-                else 'Healthy', axis=1
-            )
-            inventory_df['stock_ratio'] = inventory_df['stock_level'] / inventory_df['reorder_point'].replace(0, 1)
-        
-        # Merge product info if available
-        if products_df is not None:
-            if 'category' in products_df.columns and 'category' not in sales_df.columns:
-                sales_df = sales_df.merge(products_df[['sku_id', 'category', 'brand']].drop_duplicates(), 
-                                         on='sku_id', how='left')
-            if 'category' in products_df.columns and 'category' not in inventory_df.columns:
-                inventory_df = inventory_df.merge(products_df[['sku_id', 'category', 'brand']].drop_duplicates(), 
-                                                  on='sku_id', how='left')
-            if 'category' in products_df.columns and 'category' not in promotions_df.columns:
-                promotions_df = promotions_df.merge(products_df[['sku_id', 'category', 'brand']].drop_duplicates(), 
-                                                    on='sku_id', how='left')
-        
-        return sales_df, inventory_df, promotions_df, products_df, None
-        
-    except Exception as e:
-        return None, None, None, None, str(e)
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_cached_dataset(cache_key):
+    """Read a processed star-schema dataset from the disk cache (memoized per process)."""
+    return read_dataset_cache(cache_key)
+
+
+def upload_cache_key(files):
+    """Dataset cache key for the uploaded files, hashed once per set of uploads.
+
+    The key is kept in session state under the files' ``file_id``s, so reruns skip
+    rehashing the upload bytes until a file is added, removed or replaced.
+    """
+    file_ids = tuple(f.file_id if f is not None else None for f in files)
+    cached = st.session_state.get('upload_cache_key')
+    if cached is None or cached[0] != file_ids:
+        key = dataset_cache_key("upload", *[f.getvalue() if f is not None else None for f in files])
+        cached = (file_ids, key)
+        st.session_state['upload_cache_key'] = cached
+    return cached[1]
+
+
+@st.cache_data(show_spinner=False)
+def cached_memory_report(dataset_id, _frames):
+    """Memory report for a loaded dataset, computed once per dataset id."""
+    return memory_report(_frames)
+
+
+@profiled('render')
+def render_memory_report(dataset_id, frames):
+    """Render the per-table memory report in a sidebar expander."""
+    with st.expander("🧮 Memory Report", expanded=False):
+        report = cached_memory_report(dataset_id, frames)
+        if report.empty:
+            st.caption("No tables loaded")
+            return
+        current_mb = report['Memory (MB)'].sum()
+        baseline_mb = report['Unoptimized (MB)'].sum()
+        st.markdown(f"**In memory:** {current_mb:,.1f} MB (vs. {baseline_mb:,.1f} MB with default dtypes)")
+        render_dataframe(report, use_container_width=True, hide_index=True)
 
 # =============================================================================
-# SAMPLE DATA GENERATOR (COMPREHENSIVE) - FIXED
+# RENDER CALL TRACKING
 # =============================================================================
 
-def generate_sample_data():
-    """Generate comprehensive sample data for demonstration."""
-    np.random.seed(42)
-    
-    # Configuration
-    n_days = 365
-    n_skus = 150
-    n_stores = 25
-    n_sales = 75000
-    n_promos = 300
-    
-    # Generate date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=n_days)
-    dates = pd.date_range(start=start_date, end=end_date, freq='D')
-    
-    # Generate SKUs with categories and brands
-    categories = ['Electronics', 'Clothing', 'Food & Beverage', 'Home & Garden', 'Health & Beauty', 'Sports & Outdoors', 'Toys & Games', 'Automotive']
-    brands = ['Brand A', 'Brand B', 'Brand C', 'Brand D', 'Brand E', 'Premium Brand', 'Value Brand', 'Local Brand']
-    
-    skus = []
-    sku_categories = {}
-    sku_brands = {}
-    sku_prices = {}
-    
-    for i in range(1, n_skus + 1):
-        sku_id = f'SKU_{str(i).zfill(4)}'
-        skus.append(sku_id)
-        sku_categories[sku_id] = np.random.choice(categories)
-        sku_brands[sku_id] = np.random.choice(brands)
-        # Price varies by category
-        base_prices = {'Electronics': 200, 'Clothing': 80, 'Food & Beverage': 25, 'Home & Garden': 100, 
-                      'Health & Beauty': 50, 'Sports & Outdoors': 120, 'Toys & Games': 40, 'Automotive': 150}
-        base = base_prices.get(sku_categories[sku_id], 50)
-        sku_prices[sku_id] = round(np.random.uniform(base * 0.5, base * 2), 2)
-    
-    # Generate stores with regions
-    regions = ['Dubai', 'Abu Dhabi', 'Sharjah', 'Ajman', 'RAK']
-    store_types = ['Hypermarket', 'Supermarket', 'Express', 'Online']
-    
-    stores = []
-    store_regions = {}
-    store_types_map = {}
-    
-    for i in range(1, n_stores + 1):
-        store_id = f'STORE_{str(i).zfill(3)}'
-        stores.append(store_id)
-        store_regions[store_id] = np.random.choice(regions, p=[0.35, 0.25, 0.2, 0.1, 0.1])
-        store_types_map[store_id] = np.random.choice(store_types, p=[0.2, 0.4, 0.3, 0.1])
-    
-    # Generate promotion types
-    promo_types = ['BOGO', 'Percentage Off', 'Bundle Deal', 'Flash Sale', 'Clearance', 'Seasonal', 'Member Exclusive', 'Buy More Save More']
-    
-    # ==========================================================================
-    # SALES DATA
-    # ==========================================================================
-    
-    # Create seasonal patterns - FIXED: accepts pandas Timestamp
-    def get_seasonal_factor(date):
-        # Convert to pandas Timestamp if needed
-        if isinstance(date, np.datetime64):
-            date = pd.Timestamp(date)
-        month = date.month
-        # Ramadan/Eid boost (varies by year, simplified)
-        if month in [3, 4]:  # Approximate Ramadan period
-            return 1.4
-        # Summer (lower due to holidays)
-        elif month in [7, 8]:
-            return 0.85
-        # Year-end shopping
-        elif month in [11, 12]:
-            return 1.3
-        # Back to school
-        elif month == 9:
-            return 1.15
-        else:
-            return 1.0
-    
-    # Generate sales transactions
-    sales_data = {
-        'transaction_id': [],
-        'sku_id': [],
-        'store_id': [],
-        'quantity_sold': [],
-        'unit_price': [],
-        'transaction_date': [],
-        'customer_id': [],
-        'payment_method': []
-    }
-    
-    payment_methods = ['Cash', 'Credit Card', 'Debit Card', 'Mobile Payment', 'Online']
-    
-    # Pre-convert dates to list of Timestamps for faster random selection
-    dates_list = dates.tolist()
-    
-    for i in range(1, n_sales + 1):
-        sku = np.random.choice(skus)
-        store = np.random.choice(stores)
-        # Use random index to select date
-        date_idx = np.random.randint(0, len(dates_list))
-        date = dates_list[date_idx]
-        
-        seasonal = get_seasonal_factor(date)
-        
-        # Weekday effect
-        weekday_factor = 1.2 if date.weekday() >= 4 else 1.0  # Weekend boost
-        
-        # Store type effect
-        store_factor = {'Hypermarket': 1.3, 'Supermarket': 1.0, 'Express': 0.7, 'Online': 1.1}.get(store_types_map[store], 1.0)
-        
-        base_qty = max(1, int(np.random.exponential(3) * seasonal * weekday_factor * store_factor))
-        
-        sales_data['transaction_id'].append(f'TXN_{str(i).zfill(7)}')
-        sales_data['sku_id'].append(sku)
-        sales_data['store_id'].append(store)
-        sales_data['quantity_sold'].append(base_qty)
-        sales_data['unit_price'].append(sku_prices[sku])
-        sales_data['transaction_date'].append(date)
-        sales_data['customer_id'].append(f'CUST_{str(np.random.randint(1, 10000)).zfill(5)}')
-        sales_data['payment_method'].append(np.random.choice(payment_methods, p=[0.15, 0.35, 0.25, 0.15, 0.1]))
-    
-    sales_df = pd.DataFrame(sales_data)
-    sales_df['transaction_date'] = pd.to_datetime(sales_df['transaction_date'])
-    sales_df['revenue'] = sales_df['quantity_sold'] * sales_df['unit_price']
-    sales_df['date'] = sales_df['transaction_date'].dt.date
-    sales_df['month'] = sales_df['transaction_date'].dt.to_period('M').astype(str)
-    sales_df['week'] = sales_df['transaction_date'].dt.isocalendar().week
-    sales_df['day_of_week'] = sales_df['transaction_date'].dt.day_name()
-    sales_df['hour'] = np.random.choice(range(8, 23), len(sales_df))  # Store hours
-    sales_df['year'] = sales_df['transaction_date'].dt.year
-    sales_df['quarter'] = sales_df['transaction_date'].dt.quarter
-    sales_df['category'] = sales_df['sku_id'].map(sku_categories)
-    sales_df['brand'] = sales_df['sku_id'].map(sku_brands)
-    sales_df['region'] = sales_df['store_id'].map(store_regions)
-    sales_df['store_type'] = sales_df['store_id'].map(store_types_map)
-    
-    # ==========================================================================
-    # INVENTORY DATA
-    # ==========================================================================
-    
-    inventory_data = {
-        'record_id': [],
-        'sku_id': [],
-        'store_id': [],
-        'stock_level': [],
-        'reorder_point': [],
-        'reorder_quantity': [],
-        'last_updated': [],
-        'warehouse_location': [],
-        'supplier_id': []
-    }
-    
-    warehouses = ['WH-Dubai-1', 'WH-Dubai-2', 'WH-AbuDhabi', 'WH-Sharjah', 'WH-Central']
-    
-    # Get last 30 dates for inventory updates
-    recent_dates = dates_list[-30:]
-    
-    record_id = 1
-    for sku in skus:
-        for store in stores:
-            # Base stock varies by store type
-            base_stock = {'Hypermarket': 300, 'Supermarket': 150, 'Express': 50, 'Online': 200}.get(store_types_map[store], 100)
-            
-            # Category affects reorder points
-            cat_factor = {'Electronics': 0.7, 'Food & Beverage': 1.5, 'Clothing': 0.9}.get(sku_categories[sku], 1.0)
-            
-            stock = max(0, int(np.random.normal(base_stock, base_stock * 0.4)))
-            reorder_pt = int(base_stock * 0.3 * cat_factor)
-            reorder_qty = int(base_stock * 0.6)
-            
-            inventory_data['record_id'].append(f'INV_{str(record_id).zfill(6)}')
-            inventory_data['sku_id'].append(sku)
-            inventory_data['store_id'].append(store)
-            inventory_data['stock_level'].append(stock)
-            inventory_data['reorder_point'].append(reorder_pt)
-            inventory_data['reorder_quantity'].append(reorder_qty)
-            inventory_data['last_updated'].append(recent_dates[np.random.randint(0, len(recent_dates))])
-            inventory_data['warehouse_location'].append(np.random.choice(warehouses))
-            inventory_data['supplier_id'].append(f'SUP_{str(np.random.randint(1, 50)).zfill(3)}')
-            record_id += 1
-    
-    inventory_df = pd.DataFrame(inventory_data)
-    inventory_df['last_updated'] = pd.to_datetime(inventory_df['last_updated'])
-    inventory_df['stock_status'] = inventory_df.apply(
-        lambda x: 'Critical' if x['stock_level'] <= x['reorder_point'] * 0.5
-        else 'Low' if x['stock_level'] <= x['reorder_point']
-        else 'Healthy', axis=1
-    )
-    inventory_df['stock_ratio'] = inventory_df['stock_level'] / inventory_df['reorder_point'].replace(0, 1)
-    inventory_df['category'] = inventory_df['sku_id'].map(sku_categories)
-    inventory_df['brand'] = inventory_df['sku_id'].map(sku_brands)
-    inventory_df['region'] = inventory_df['store_id'].map(store_regions)
-    inventory_df['store_type'] = inventory_df['store_id'].map(store_types_map)
-    
-    # Calculate days of stock (based on average daily sales)
-    avg_daily_sales = sales_df.groupby(['sku_id', 'store_id'])['quantity_sold'].sum() / n_days
-    inventory_df['avg_daily_sales'] = inventory_df.apply(
-        lambda x: avg_daily_sales.get((x['sku_id'], x['store_id']), 1), axis=1
-    )
-    inventory_df['days_of_stock'] = (inventory_df['stock_level'] / inventory_df['avg_daily_sales'].replace(0, 0.1)).round(1)
-    inventory_df['days_of_stock'] = inventory_df['days_of_stock'].clip(0, 365)
-    
-    # ==========================================================================
-    # PROMOTIONS DATA
-    # ==========================================================================
-    
-    promotions_data = {
-        'promotion_id': [],
-        'sku_id': [],
-        'store_id': [],
-        'promotion_type': [],
-        'discount_percentage': [],
-        'start_date': [],
-        'end_date': [],
-        'budget': [],
-        'target_sales_lift': [],
-        'actual_sales_lift': [],
-        'promotion_name': []
-    }
-    
-    promo_names = ['Summer Sale', 'Ramadan Special', 'Eid Offer', 'Back to School', 'Weekend Deal', 
-                  'Flash Friday', 'Member Exclusive', 'Clearance Event', 'New Arrival Promo', 'Bundle Bonanza']
-    
-    # Use dates excluding last 30 days for promotion start dates
-    promo_start_dates = dates_list[:-30]
+def track_render(func):
+    """Count calls to a dashboard-level render function for the render-once check.
+
+    Calls are also recorded as profiler spans.
+    """
+    func = profiled('render')(func)
     
-    for i in range(1, n_promos + 1):
-        sku = np.random.choice(skus)
-        store = np.random.choice(stores + ['ALL'])  # Some promos are store-wide
-        promo_type = np.random.choice(promo_types)
-        
-        # Discount varies by type
-        if promo_type == 'BOGO':
-            discount = 50
-        elif promo_type == 'Clearance':
-            discount = np.random.choice([40, 50, 60, 70])
-        elif promo_type == 'Flash Sale':
-            discount = np.random.choice([20, 25, 30, 35])
-        else:
-            discount = np.random.choice([5, 10, 15, 20, 25, 30])
-        
-        start_idx = np.random.randint(0, len(promo_start_dates))
-        start = promo_start_dates[start_idx]
-        duration = np.random.randint(3, 21)
-        end = start + timedelta(days=duration)
-        
-        # Budget based on discount and duration
-        budget = discount * duration * np.random.randint(100, 500)
-        
-        # Target and actual lift
-        target_lift = discount * 0.8 + np.random.uniform(-5, 10)
-        actual_lift = target_lift * np.random.uniform(0.7, 1.3)
-        
-        promotions_data['promotion_id'].append(f'PROMO_{str(i).zfill(4)}')
-        promotions_data['sku_id'].append(sku)
-        promotions_data['store_id'].append(store)
-        promotions_data['promotion_type'].append(promo_type)
-        promotions_data['discount_percentage'].append(discount)
-        promotions_data['start_date'].append(start)
-        promotions_data['end_date'].append(end)
-        promotions_data['budget'].append(budget)
-        promotions_data['target_sales_lift'].append(round(target_lift, 1))
-        promotions_data['actual_sales_lift'].append(round(actual_lift, 1))
-        promotions_data['promotion_name'].append(np.random.choice(promo_names))
-    
-    promotions_df = pd.DataFrame(promotions_data)
-    promotions_df['start_date'] = pd.to_datetime(promotions_df['start_date'])
-    promotions_df['end_date'] = pd.to_datetime(promotions_df['end_date'])
-    promotions_df['duration_days'] = (promotions_df['end_date'] - promotions_df['start_date']).dt.days
-    promotions_df['category'] = promotions_df['sku_id'].map(sku_categories)
-    promotions_df['brand'] = promotions_df['sku_id'].map(sku_brands)
-    promotions_df['is_active'] = (promotions_df['start_date'] <= pd.Timestamp.now()) & (promotions_df['end_date'] >= pd.Timestamp.now())
-    promotions_df['roi'] = ((promotions_df['actual_sales_lift'] / 100) * promotions_df['budget'] * 2 - promotions_df['budget']) / promotions_df['budget'] * 100
-    
-    return sales_df, inventory_df, promotions_df
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        counts = st.session_state.setdefault('render_counts', {})
+        counts[func.__name__] = counts.get(func.__name__, 0) + 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def check_render_once():
+    """Flag dashboard render functions that ran more than once in this (full or fragment) rerun."""
+    repeated = {name: count for name, count in st.session_state.get('render_counts', {}).items() if count > 1}
+    if repeated:
+        details = ", ".join(f"{name} ×{count}" for name, count in sorted(repeated.items()))
+        st.error(f"⚠️ Rendered more than once in this rerun: {details}")
+    return not repeated
+
 
 # =============================================================================
 # DASHBOARD SECTIONS WITH LOCAL FILTERS
 # =============================================================================
 
+@track_render
 def render_overview_kpis(sales_df, inventory_df, promotions_df):
     """Render comprehensive overview KPIs."""
     
     # Calculate metrics
-    total_revenue = sales_df['revenue'].sum()
-    total_transactions = sales_df['transaction_id'].nunique()
-    total_units = sales_df['quantity_sold'].sum()
-    total_skus = sales_df['sku_id'].nunique()
-    total_stores = sales_df['store_id'].nunique()
-    avg_order_value = total_revenue / total_transactions if total_transactions > 0 else 0
-    
-    # Inventory metrics
-    critical_stock = len(inventory_df[inventory_df['stock_status'] == 'Critical'])
-    low_stock = len(inventory_df[inventory_df['stock_status'] == 'Low'])
-    healthy_stock = len(inventory_df[inventory_df['stock_status'] == 'Healthy'])
-    stock_health_pct = (healthy_stock / len(inventory_df) * 100) if len(inventory_df) > 0 else 0
-    
-    # Promotion metrics
-    active_promos = len(promotions_df[promotions_df['is_active']]) if 'is_active' in promotions_df.columns else len(promotions_df)
-    avg_discount = promotions_df['discount_percentage'].mean()
+    metrics = overview_metrics(sales_df, inventory_df, promotions_df)
+    total_revenue = metrics['total_revenue']
+    total_transactions = metrics['total_transactions']
+    critical_stock = metrics['critical_stock']
     
     # Period comparison (simulate)
     prev_revenue = total_revenue * 0.92
@@ -2197,17 +2087,76 @@ def render_overview_kpis(sales_df, inventory_df, promotions_df):
     kpis = [
         {"icon": "💰", "value": f"${total_revenue:,.0f}", "label": "Total Revenue", "type": "primary", "delta": f"{revenue_change:+.1f}%", "delta_type": "positive" if revenue_change > 0 else "negative"},
         {"icon": "🛒", "value": f"{total_transactions:,}", "label": "Transactions", "type": "success", "delta": f"{trans_change:+.1f}%", "delta_type": "positive" if trans_change > 0 else "negative"},
-        {"icon": "📦", "value": f"{total_units:,}", "label": "Units Sold", "type": "accent"},
-        {"icon": "💵", "value": f"${avg_order_value:.2f}", "label": "Avg Order Value", "type": "secondary"},
-        {"icon": "🏷️", "value": f"{total_skus}", "label": "Active SKUs", "type": "info"},
-        {"icon": "🏪", "value": f"{total_stores}", "label": "Stores", "type": "primary"},
-        {"icon": "⚠️", "value": f"{critical_stock + low_stock}", "label": "Stock Alerts", "type": "danger" if critical_stock > 50 else "warning"},
-        {"icon": "🎯", "value": f"{active_promos}", "label": "Active Promos", "type": "success"},
+        {"icon": "📦", "value": f"{metrics['total_units']:,}", "label": "Units Sold", "type": "accent"},
+        {"icon": "💵", "value": f"${metrics['avg_order_value']:.2f}", "label": "Avg Order Value", "type": "secondary"},
+        {"icon": "🏷️", "value": f"{metrics['total_skus']}", "label": "Active SKUs", "type": "info"},
+        {"icon": "🏪", "value": f"{metrics['total_stores']}", "label": "Stores", "type": "primary"},
+        {"icon": "⚠️", "value": f"{critical_stock + metrics['low_stock']}", "label": "Stock Alerts", "type": "danger" if critical_stock > 50 else "warning"},
+        {"icon": "🎯", "value": f"{metrics['active_promos']}", "label": "Active Promos", "type": "success"},
     ]
     
     render_kpi_row(kpis)
 
 
+def build_trend_figure(trend_df, x_col, y, chart_type, color, fillcolor, xaxis_title, yaxis_title, point_budget):
+    """Area, line or bar trend of ``y``; line/area traces are LTTB-downsampled."""
+    if chart_type == "Area Chart":
+        fig = px.area(downsample(trend_df, x_col, y, point_budget), x=x_col, y=y,
+                      color_discrete_sequence=[color])
+        fig.update_traces(fill='tozeroy', fillcolor=fillcolor, line=dict(width=3))
+    elif chart_type == "Line Chart":
+        fig = px.line(downsample(trend_df, x_col, y, point_budget), x=x_col, y=y,
+                      color_discrete_sequence=[color], markers=True)
+        fig.update_traces(line=dict(width=3), marker=dict(size=8))
+    else:
+        fig = px.bar(trend_df, x=x_col, y=y, color_discrete_sequence=[color])
+
+    fig = apply_chart_style(fig, height=380)
+    fig.update_layout(xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
+
+
+def build_category_pie(cat_df):
+    """Donut of revenue share by category."""
+    fig = px.pie(cat_df, values='Revenue', names='Category',
+                 color_discrete_sequence=get_chart_colors(),
+                 hole=0.55)
+    fig = apply_chart_style(fig, height=380)
+    fig.update_traces(textposition='outside', textinfo='percent+label',
+                      textfont=dict(size=11))
+    return fig
+
+
+def build_ranking_bar(ranked_df, x, y, color, color_scale, height, xaxis_title=None):
+    """Horizontal bar ranking, largest at the top, with a continuous color scale."""
+    fig = px.bar(ranked_df.sort_values(x, ascending=True),
+                 x=x, y=y, orientation='h',
+                 color=color, color_continuous_scale=color_scale)
+    fig = apply_chart_style(fig, height=height, show_legend=False)
+    fig.update_layout(coloraxis_showscale=False)
+    if xaxis_title is not None:
+        fig.update_layout(yaxis_title="", xaxis_title=xaxis_title)
+    return fig
+
+
+def build_region_bar(region_df):
+    """Revenue bar by region."""
+    fig = px.bar(region_df, x='Region', y='Revenue',
+                 color='Region', color_discrete_sequence=get_chart_colors())
+    return apply_chart_style(fig, height=350, show_legend=False)
+
+
+def build_region_bubble(region_df):
+    """Transactions vs revenue by region, sized by units."""
+    fig = scatter_chart(region_df, 'Transactions', 'Revenue', size='Units',
+                        color='Region', hover_name='Region',
+                        color_discrete_sequence=get_chart_colors())
+    fig = apply_chart_style(fig, height=350)
+    fig.update_traces(marker=dict(line=dict(width=2, color='white')), selector=dict(mode='markers'))
+    return fig
+
+
+@track_render
 def render_sales_analysis(sales_df):
     """Render comprehensive sales analysis with local filters."""
     render_section_header("📈", "Sales Performance Analytics", "Deep dive into sales metrics with interactive filters")
@@ -2226,6 +2175,11 @@ def render_sales_analysis(sales_df):
             key="sales_time_granularity"
         )
     
+    # Charts roll up the pre-aggregated cube; the raw rows only back distinct counts
+    x_col = {"Daily": 'date', "Weekly": 'week', "Monthly": 'month', "Quarterly": 'quarter'}[time_granularity]
+    cube = sales_cube(sales_df)
+    sales_df = with_derived_columns(sales_df, ['month'])
+    
     with filter_cols[1]:
         if 'category' in sales_df.columns:
             categories = ['All Categories'] + sorted(sales_df['category'].dropna().unique().tolist())
@@ -2282,11 +2236,12 @@ def render_sales_analysis(sales_df):
     
     with filter_cols2[2]:
         if 'month' in sales_df.columns:
-            months = sorted(sales_df['month'].unique().tolist())
+            months = sorted(sales_df['month'].dropna().unique().tolist())
             date_range = st.select_slider(
                 "📆 Date Range",
                 options=months,
                 value=(months[0], months[-1]),
+                format_func=format_month,
                 key="sales_date_range"
             )
         else:
@@ -2300,33 +2255,27 @@ def render_sales_analysis(sales_df):
     # =========================================================================
     # FILTER DATA
     # =========================================================================
-    filtered_df = sales_df.copy()
-    
-    if selected_category != 'All Categories' and 'category' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['category'] == selected_category]
-    
-    if selected_region != 'All Regions' and 'region' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['region'] == selected_region]
-    
-    if selected_brand != 'All Brands' and 'brand' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['brand'] == selected_brand]
-    
-    if selected_store_type != 'All Store Types' and 'store_type' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['store_type'] == selected_store_type]
-    
-    if date_range and 'month' in filtered_df.columns:
-        filtered_df = filtered_df[(filtered_df['month'] >= date_range[0]) & (filtered_df['month'] <= date_range[1])]
+    selections = {
+        'category': None if selected_category == 'All Categories' else selected_category,
+        'region': None if selected_region == 'All Regions' else selected_region,
+        'brand': None if selected_brand == 'All Brands' else selected_brand,
+        'store_type': None if selected_store_type == 'All Store Types' else selected_store_type,
+        'month': [month for month in months if date_range[0] <= month <= date_range[1]]
+                 if date_range and date_range != (months[0], months[-1]) else None,
+    }
+    filtered_cube = filter_rows(cube, selections)
+    raw_rows = lambda: filter_rows(sales_df, selections)
     
-    if filtered_df.empty:
+    if filtered_cube.empty:
         render_empty_state("📊", "No Data Available", "Try adjusting your filters to see results.")
         return
     
     # =========================================================================
     # SECTION KPIs
     # =========================================================================
-    section_revenue = filtered_df['revenue'].sum()
-    section_units = filtered_df['quantity_sold'].sum()
-    section_transactions = filtered_df['transaction_id'].nunique()
+    section_revenue = filtered_cube['revenue'].sum()
+    section_units = filtered_cube['quantity_sold'].sum()
+    section_transactions = cube_distinct_transactions(filtered_cube, raw_rows)
     section_aov = section_revenue / section_transactions if section_transactions > 0 else 0
     
     section_kpis = [
@@ -2348,49 +2297,27 @@ def render_sales_analysis(sales_df):
         render_chart_title("Revenue Trend Over Time", "💰")
         
         # Aggregate based on granularity
-        if time_granularity == "Daily":
-            agg_df = filtered_df.groupby('date').agg({'revenue': 'sum', 'quantity_sold': 'sum', 'transaction_id': 'nunique'}).reset_index()
-            x_col = 'date'
-        elif time_granularity == "Weekly":
-            agg_df = filtered_df.groupby('week').agg({'revenue': 'sum', 'quantity_sold': 'sum', 'transaction_id': 'nunique'}).reset_index()
-            x_col = 'week'
-        elif time_granularity == "Monthly":
-            agg_df = filtered_df.groupby('month').agg({'revenue': 'sum', 'quantity_sold': 'sum', 'transaction_id': 'nunique'}).reset_index()
-            x_col = 'month'
-        else:  # Quarterly
-            agg_df = filtered_df.groupby('quarter').agg({'revenue': 'sum', 'quantity_sold': 'sum', 'transaction_id': 'nunique'}).reset_index()
-            x_col = 'quarter'
-        
+        agg_df = cube_rollup(filtered_cube, x_col)[[x_col, 'revenue', 'quantity_sold', 'transactions']]
         agg_df.columns = [x_col, 'Revenue', 'Units', 'Transactions']
-        
-        if chart_type == "Area Chart":
-            fig = px.area(agg_df, x=x_col, y='Revenue', color_discrete_sequence=['#6366f1'])
-            fig.update_traces(fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.3)', line=dict(width=3))
-        elif chart_type == "Line Chart":
-            fig = px.line(agg_df, x=x_col, y='Revenue', color_discrete_sequence=['#6366f1'], markers=True)
-            fig.update_traces(line=dict(width=3), marker=dict(size=8))
-        else:
-            fig = px.bar(agg_df, x=x_col, y='Revenue', color_discrete_sequence=['#6366f1'])
-        
-        fig = apply_chart_style(fig, height=380)
-        fig.update_layout(xaxis_title=time_granularity, yaxis_title="Revenue ($)")
-        st.plotly_chart(fig, use_container_width=True)
+        if x_col == 'month':
+            agg_df['month'] = month_labels(agg_df['month'])
+        # Line/area traces are LTTB-downsampled to the half-width chart's point budget
+        trend_budget = trend_point_budget(0.5)
+        
+        fig = cached_figure(
+            build_trend_figure, agg_df[[x_col, 'Revenue']], x_col, 'Revenue', chart_type,
+            '#6366f1', 'rgba(99, 102, 241, 0.3)', time_granularity, "Revenue ($)", trend_budget
+        )
+        render_plotly_chart(fig, use_container_width=True)
     
     with col2:
         render_chart_title("Units Sold Trend", "📦")
         
-        if chart_type == "Area Chart":
-            fig2 = px.area(agg_df, x=x_col, y='Units', color_discrete_sequence=['#10b981'])
-            fig2.update_traces(fill='tozeroy', fillcolor='rgba(16, 185, 129, 0.3)', line=dict(width=3))
-        elif chart_type == "Line Chart":
-            fig2 = px.line(agg_df, x=x_col, y='Units', color_discrete_sequence=['#10b981'], markers=True)
-            fig2.update_traces(line=dict(width=3), marker=dict(size=8))
-        else:
-            fig2 = px.bar(agg_df, x=x_col, y='Units', color_discrete_sequence=['#10b981'])
-        
-        fig2 = apply_chart_style(fig2, height=380)
-        fig2.update_layout(xaxis_title=time_granularity, yaxis_title="Units")
-        st.plotly_chart(fig2, use_container_width=True)
+        fig2 = cached_figure(
+            build_trend_figure, agg_df[[x_col, 'Units']], x_col, 'Units', chart_type,
+            '#10b981', 'rgba(16, 185, 129, 0.3)', time_granularity, "Units", trend_budget
+        )
+        render_plotly_chart(fig2, use_container_width=True)
     
     render_divider_subtle()
     
@@ -2402,31 +2329,23 @@ def render_sales_analysis(sales_df):
     with col1:
         render_chart_title("Revenue by Category", "🏷️")
         
-        if 'category' in filtered_df.columns:
-            cat_df = filtered_df.groupby('category').agg({'revenue': 'sum'}).reset_index()
+        if 'category' in filtered_cube.columns:
+            cat_df = cube_rollup(filtered_cube, 'category')[['category', 'revenue']]
             cat_df = cat_df.nlargest(top_n, 'revenue')
             cat_df.columns = ['Category', 'Revenue']
             
-            fig3 = px.pie(cat_df, values='Revenue', names='Category', 
-                         color_discrete_sequence=get_chart_colors(),
-                         hole=0.55)
-            fig3 = apply_chart_style(fig3, height=380)
-            fig3.update_traces(textposition='outside', textinfo='percent+label',
-                             textfont=dict(size=11))
-            st.plotly_chart(fig3, use_container_width=True)
+            fig3 = cached_figure(build_category_pie, cat_df)
+            render_plotly_chart(fig3, use_container_width=True)
         else:
             render_empty_state("📊", "Category data not available", "")
     
     with col2:
         render_chart_title("Top Performing Categories", "📊")
         
-        if 'category' in filtered_df.columns:
-            fig4 = px.bar(cat_df.sort_values('Revenue', ascending=True), 
-                         x='Revenue', y='Category', orientation='h',
-                         color='Revenue', color_continuous_scale=['#6366f1', '#ec4899'])
-            fig4 = apply_chart_style(fig4, height=380, show_legend=False)
-            fig4.update_layout(coloraxis_showscale=False, yaxis_title="", xaxis_title="Revenue ($)")
-            st.plotly_chart(fig4, use_container_width=True)
+        if 'category' in filtered_cube.columns:
+            fig4 = cached_figure(build_ranking_bar, cat_df, 'Revenue', 'Category', 'Revenue',
+                                 ['#6366f1', '#ec4899'], 380, xaxis_title="Revenue ($)")
+            render_plotly_chart(fig4, use_container_width=True)
     
     render_divider_subtle()
     
@@ -2438,70 +2357,46 @@ def render_sales_analysis(sales_df):
     with col1:
         render_chart_title(f"Top {top_n} Products by Revenue", "🏆")
         
-        top_products = filtered_df.groupby('sku_id').agg({
-            'revenue': 'sum',
-            'quantity_sold': 'sum',
-            'transaction_id': 'nunique'
-        }).reset_index()
+        top_products = cube_rollup(filtered_cube, 'sku_id')[['sku_id', 'revenue', 'quantity_sold', 'transactions']]
         top_products = top_products.nlargest(top_n, 'revenue')
         top_products.columns = ['SKU', 'Revenue', 'Units', 'Transactions']
         
-        fig5 = px.bar(top_products.sort_values('Revenue', ascending=True),
-                     x='Revenue', y='SKU', orientation='h',
-                     color='Units', color_continuous_scale=['#06b6d4', '#8b5cf6'])
-        fig5 = apply_chart_style(fig5, height=400, show_legend=False)
-        fig5.update_layout(coloraxis_showscale=False)
-        st.plotly_chart(fig5, use_container_width=True)
+        fig5 = cached_figure(build_ranking_bar, top_products, 'Revenue', 'SKU', 'Units',
+                             ['#06b6d4', '#8b5cf6'], 400)
+        render_plotly_chart(fig5, use_container_width=True)
     
     with col2:
         render_chart_title(f"Top {top_n} Stores by Revenue", "🏪")
         
-        top_stores = filtered_df.groupby('store_id').agg({
-            'revenue': 'sum',
-            'quantity_sold': 'sum',
-            'transaction_id': 'nunique'
-        }).reset_index()
+        top_stores = cube_rollup(filtered_cube, 'store_id', raw_rows)[['store_id', 'revenue', 'quantity_sold', 'transactions']]
         top_stores = top_stores.nlargest(top_n, 'revenue')
         top_stores.columns = ['Store', 'Revenue', 'Units', 'Transactions']
         
-        fig6 = px.bar(top_stores.sort_values('Revenue', ascending=True),
-                     x='Revenue', y='Store', orientation='h',
-                     color='Transactions', color_continuous_scale=['#f59e0b', '#ef4444'])
-        fig6 = apply_chart_style(fig6, height=400, show_legend=False)
-        fig6.update_layout(coloraxis_showscale=False)
-        st.plotly_chart(fig6, use_container_width=True)
+        fig6 = cached_figure(build_ranking_bar, top_stores, 'Revenue', 'Store', 'Transactions',
+                             ['#f59e0b', '#ef4444'], 400)
+        render_plotly_chart(fig6, use_container_width=True)
     
     render_divider_subtle()
     
     # =========================================================================
     # REGIONAL ANALYSIS
     # =========================================================================
-    if 'region' in filtered_df.columns:
+    if 'region' in filtered_cube.columns:
         render_chart_title("Regional Performance Comparison", "🌍")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            region_df = filtered_df.groupby('region').agg({
-                'revenue': 'sum',
-                'quantity_sold': 'sum',
-                'transaction_id': 'nunique'
-            }).reset_index()
+            region_df = cube_rollup(filtered_cube, 'region', raw_rows)[['region', 'revenue', 'quantity_sold', 'transactions']]
             region_df.columns = ['Region', 'Revenue', 'Units', 'Transactions']
             region_df['AOV'] = region_df['Revenue'] / region_df['Transactions']
             
-            fig7 = px.bar(region_df, x='Region', y='Revenue',
-                         color='Region', color_discrete_sequence=get_chart_colors())
-            fig7 = apply_chart_style(fig7, height=350, show_legend=False)
-            st.plotly_chart(fig7, use_container_width=True)
+            fig7 = cached_figure(build_region_bar, region_df)
+            render_plotly_chart(fig7, use_container_width=True)
         
         with col2:
-            fig8 = px.scatter(region_df, x='Transactions', y='Revenue', size='Units',
-                            color='Region', hover_name='Region',
-                            color_discrete_sequence=get_chart_colors())
-            fig8 = apply_chart_style(fig8, height=350)
-            fig8.update_traces(marker=dict(line=dict(width=2, color='white')))
-            st.plotly_chart(fig8, use_container_width=True)
+            fig8 = cached_figure(build_region_bubble, region_df)
+            render_plotly_chart(fig8, use_container_width=True)
     
     # =========================================================================
     # INSIGHTS
@@ -2509,20 +2404,78 @@ def render_sales_analysis(sales_df):
     st.markdown("")
     
     # Generate insights
-    if 'category' in filtered_df.columns:
-        top_cat = filtered_df.groupby('category')['revenue'].sum().idxmax()
-        top_cat_pct = (filtered_df.groupby('category')['revenue'].sum().max() / section_revenue * 100)
+    if 'category' in filtered_cube.columns:
+        category_revenue = filtered_cube.groupby('category', observed=True)['revenue'].sum()
+        top_cat = category_revenue.idxmax()
+        top_cat_pct = (category_revenue.max() / section_revenue * 100)
         render_insight_box("🏆", "Top Category", f"{top_cat} leads with {top_cat_pct:.1f}% of total revenue in the selected filters.", "success")
     
-    if 'day_of_week' in filtered_df.columns:
-        best_day = filtered_df.groupby('day_of_week')['revenue'].sum().idxmax()
+    if 'day_of_week' in filtered_cube.columns:
+        best_day = DAY_NAMES[int(filtered_cube.groupby('day_of_week')['revenue'].sum().idxmax())]
         render_insight_box("📅", "Peak Sales Day", f"{best_day} generates the highest revenue. Consider scheduling major promotions on this day.", "primary")
     
-    if 'store_type' in filtered_df.columns:
-        top_store_type = filtered_df.groupby('store_type')['revenue'].sum().idxmax()
+    if 'store_type' in filtered_cube.columns:
+        top_store_type = filtered_cube.groupby('store_type', observed=True)['revenue'].sum().idxmax()
         render_insight_box("🏪", "Best Store Type", f"{top_store_type} stores are the top performers. Focus expansion efforts here.", "accent")
 
 
+STOCK_STATUS_COLORS = {'Critical': '#ef4444', 'Low': '#f59e0b', 'Healthy': '#10b981'}
+
+
+def build_status_donut(status_counts, total_items):
+    """Donut of items per stock status with the item count in the center."""
+    fig = px.pie(status_counts, values='Count', names='Status',
+                color='Status', color_discrete_map=STOCK_STATUS_COLORS,
+                hole=0.6)
+    fig = apply_chart_style(fig, height=350)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    
+    # Add center annotation
+    fig.add_annotation(
+        text=f"{total_items:,}<br>Items",
+        x=0.5, y=0.5,
+        font=dict(size=18, color='white', family='Inter'),
+        showarrow=False
+    )
+    return fig
+
+
+def build_category_status_bar(cat_status):
+    """Stacked item counts per category and stock status."""
+    fig = px.bar(cat_status, x='category', y='count', color='stock_status',
+                 color_discrete_map=STOCK_STATUS_COLORS, barmode='stack')
+    fig = apply_chart_style(fig, height=350)
+    fig.update_layout(xaxis_title="", yaxis_title="Items", legend_title="Status")
+    return fig
+
+
+def build_days_of_stock_histogram(inv_df):
+    """Days-of-stock histogram with the critical and warning thresholds marked."""
+    fig = distribution_histogram(inv_df, 'days_of_stock', nbins=30, color='#6366f1')
+    fig.add_vline(x=7, line_dash="dash", line_color="#ef4444",
+                  annotation_text="Critical (7 days)")
+    fig.add_vline(x=14, line_dash="dash", line_color="#f59e0b",
+                  annotation_text="Warning (14 days)")
+    fig = apply_chart_style(fig, height=350)
+    fig.update_layout(xaxis_title="Days of Stock", yaxis_title="Count")
+    return fig
+
+
+def build_stock_vs_reorder_scatter(inv_df):
+    """Stock level against reorder point per item, with the reorder line."""
+    fig = scatter_chart(inv_df, 'reorder_point', 'stock_level',
+                        color='stock_status', color_discrete_map=STOCK_STATUS_COLORS,
+                        hover_data=['sku_id', 'store_id'])
+    fig.add_trace(go.Scatter(x=[0, inv_df['reorder_point'].max()],
+                             y=[0, inv_df['reorder_point'].max()],
+                             mode='lines', name='Reorder Line',
+                             line=dict(dash='dash', color='#71717a')))
+    fig = apply_chart_style(fig, height=350)
+    fig.update_layout(xaxis_title="Reorder Point", yaxis_title="Stock Level")
+    return fig
+
+
+@track_render
 def render_inventory_analysis(inventory_df, sales_df):
     """Render comprehensive inventory analysis with local filters."""
     render_section_header("📦", "Inventory Health Monitor", "Real-time stock levels, risk assessment, and replenishment insights")
@@ -2614,28 +2567,17 @@ def render_inventory_analysis(inventory_df, sales_df):
     # =========================================================================
     # FILTER DATA
     # =========================================================================
-    filtered_inv = inventory_df.copy()
-    
-    if status_filter:
-        filtered_inv = filtered_inv[filtered_inv['stock_status'].isin(status_filter)]
-    
-    if inv_category != 'All Categories' and 'category' in filtered_inv.columns:
-        filtered_inv = filtered_inv[filtered_inv['category'] == inv_category]
-    
-    if inv_region != 'All Regions' and 'region' in filtered_inv.columns:
-        filtered_inv = filtered_inv[filtered_inv['region'] == inv_region]
-    
-    if inv_store_type != 'All Store Types' and 'store_type' in filtered_inv.columns:
-        filtered_inv = filtered_inv[filtered_inv['store_type'] == inv_store_type]
-    
-    if 'days_of_stock' in filtered_inv.columns:
-        filtered_inv = filtered_inv[
-            (filtered_inv['days_of_stock'] >= dos_range[0]) &
-            (filtered_inv['days_of_stock'] <= dos_range[1])
-        ]
-    
-    if selected_store != 'All Stores' and 'store_id' in filtered_inv.columns:
-        filtered_inv = filtered_inv[filtered_inv['store_id'] == selected_store]
+    filtered_inv = filter_rows(
+        inventory_df,
+        {
+            'stock_status': status_filter or None,
+            'category': None if inv_category == 'All Categories' else inv_category,
+            'region': None if inv_region == 'All Regions' else inv_region,
+            'store_type': None if inv_store_type == 'All Store Types' else inv_store_type,
+            'store_id': None if selected_store == 'All Stores' else selected_store,
+        },
+        ranges={'days_of_stock': dos_range}
+    )
     
     if filtered_inv.empty:
         render_empty_state("📦", "No Inventory Data", "Adjust your filters to see inventory items.")
@@ -2675,33 +2617,17 @@ def render_inventory_analysis(inventory_df, sales_df):
         status_counts = filtered_inv['stock_status'].value_counts().reset_index()
         status_counts.columns = ['Status', 'Count']
         
-        colors_map = {'Critical': '#ef4444', 'Low': '#f59e0b', 'Healthy': '#10b981'}
-        fig = px.pie(status_counts, values='Count', names='Status',
-                    color='Status', color_discrete_map=colors_map,
-                    hole=0.6)
-        fig = apply_chart_style(fig, height=350)
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        
-        # Add center annotation
-        fig.add_annotation(
-            text=f"{total_items:,}<br>Items",
-            x=0.5, y=0.5,
-            font=dict(size=18, color='white', family='Inter'),
-            showarrow=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        fig = cached_figure(build_status_donut, status_counts, total_items)
+        render_plotly_chart(fig, use_container_width=True)
     
     with col2:
         render_chart_title("Stock Health by Category", "📊")
         
         if 'category' in filtered_inv.columns:
-            cat_status = filtered_inv.groupby(['category', 'stock_status']).size().reset_index(name='count')
+            cat_status = filtered_inv.groupby(['category', 'stock_status'], observed=True).size().reset_index(name='count')
             
-            fig2 = px.bar(cat_status, x='category', y='count', color='stock_status',
-                         color_discrete_map=colors_map, barmode='stack')
-            fig2 = apply_chart_style(fig2, height=350)
-            fig2.update_layout(xaxis_title="", yaxis_title="Items", legend_title="Status")
-            st.plotly_chart(fig2, use_container_width=True)
+            fig2 = cached_figure(build_category_status_bar, cat_status)
+            render_plotly_chart(fig2, use_container_width=True)
         else:
             render_empty_state("📊", "No category data", "")
     
@@ -2716,30 +2642,17 @@ def render_inventory_analysis(inventory_df, sales_df):
         render_chart_title("Days of Stock Distribution", "📆")
         
         if 'days_of_stock' in filtered_inv.columns:
-            fig3 = px.histogram(filtered_inv, x='days_of_stock', nbins=30,
-                               color_discrete_sequence=['#6366f1'])
-            fig3.add_vline(x=7, line_dash="dash", line_color="#ef4444", 
-                          annotation_text="Critical (7 days)")
-            fig3.add_vline(x=14, line_dash="dash", line_color="#f59e0b",
-                          annotation_text="Warning (14 days)")
-            fig3 = apply_chart_style(fig3, height=350)
-            fig3.update_layout(xaxis_title="Days of Stock", yaxis_title="Count")
-            st.plotly_chart(fig3, use_container_width=True)
+            fig3 = cached_figure(build_days_of_stock_histogram, filtered_inv[['days_of_stock']])
+            render_plotly_chart(fig3, use_container_width=True)
     
     with col2:
         render_chart_title("Stock Level vs Reorder Point", "📈")
         
-        sample_inv = filtered_inv.sample(min(200, len(filtered_inv)))
-        fig4 = px.scatter(sample_inv, x='reorder_point', y='stock_level',
-                         color='stock_status', color_discrete_map=colors_map,
-                         hover_data=['sku_id', 'store_id'])
-        fig4.add_trace(go.Scatter(x=[0, sample_inv['reorder_point'].max()],
-                                  y=[0, sample_inv['reorder_point'].max()],
-                                  mode='lines', name='Reorder Line',
-                                  line=dict(dash='dash', color='#71717a')))
-        fig4 = apply_chart_style(fig4, height=350)
-        fig4.update_layout(xaxis_title="Reorder Point", yaxis_title="Stock Level")
-        st.plotly_chart(fig4, use_container_width=True)
+        fig4 = cached_figure(
+            build_stock_vs_reorder_scatter,
+            filtered_inv[['reorder_point', 'stock_level', 'stock_status', 'sku_id', 'store_id']]
+        )
+        render_plotly_chart(fig4, use_container_width=True)
     
     render_divider_subtle()
     
@@ -2768,7 +2681,7 @@ def render_inventory_analysis(inventory_df, sales_df):
         display_cols.append('region')
     
     available_cols = [c for c in display_cols if c in display_df.columns]
-    st.dataframe(display_df[available_cols], use_container_width=True, hide_index=True, height=400)
+    render_dataframe(display_df[available_cols], use_container_width=True, hide_index=True, height=400)
     
     # =========================================================================
     # INSIGHTS & RECOMMENDATIONS
@@ -2786,12 +2699,80 @@ def render_inventory_analysis(inventory_df, sales_df):
         render_insight_box("✅", "Healthy Inventory", f"Only {critical_pct:.1f}% of items are critical. Inventory health is good.", "success")
     
     if 'category' in filtered_inv.columns:
-        worst_cat = filtered_inv[filtered_inv['stock_status'] == 'Critical'].groupby('category').size()
+        worst_cat = filtered_inv[filtered_inv['stock_status'] == 'Critical'].groupby('category', observed=True).size()
         if len(worst_cat) > 0:
             worst_cat_name = worst_cat.idxmax()
             render_insight_box("📦", "Category Focus", f"{worst_cat_name} has the most critical stock items. Prioritize replenishment for this category.", "warning")
 
 
+def build_count_bar(counts_df, x, y):
+    """Vertical bar per label, one color each."""
+    fig = px.bar(counts_df, x=x, y=y,
+                 color=x, color_discrete_sequence=get_chart_colors())
+    return apply_chart_style(fig, height=350, show_legend=False)
+
+
+def build_histogram(values_df, x, nbins, color, xaxis_title, yaxis_title):
+    """Histogram of one column with axis titles."""
+    fig = distribution_histogram(values_df, x, nbins=nbins, color=color)
+    fig = apply_chart_style(fig, height=350)
+    fig.update_layout(xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
+
+
+def build_share_donut(share_df, values, names):
+    """Donut of ``values`` by ``names``."""
+    fig = px.pie(share_df, values=values, names=names,
+                 color_discrete_sequence=get_chart_colors(), hole=0.5)
+    return apply_chart_style(fig, height=350)
+
+
+def build_discount_lift_scatter(promo_df):
+    """Sales lift against discount per promotion, with the 1:1 line."""
+    fig = scatter_chart(promo_df, 'discount_percentage', 'actual_sales_lift',
+                        color='promotion_type' if 'promotion_type' in promo_df.columns else None,
+                        size='budget' if 'budget' in promo_df.columns else None,
+                        hover_data=['promotion_id'],
+                        color_discrete_sequence=get_chart_colors())
+    fig.add_trace(go.Scatter(x=[0, 70], y=[0, 70], mode='lines',
+                             name='1:1 Line', line=dict(dash='dash', color='#71717a')))
+    fig = apply_chart_style(fig, height=400)
+    fig.update_layout(xaxis_title="Discount %", yaxis_title="Sales Lift %")
+    return fig
+
+
+def build_monthly_line(monthly_df):
+    """Promotions launched per month."""
+    fig = px.line(monthly_df, x='Month', y='Promotions', markers=True,
+                  color_discrete_sequence=['#6366f1'])
+    fig.update_traces(line=dict(width=3), marker=dict(size=10))
+    return apply_chart_style(fig, height=350)
+
+
+def build_monthly_area(monthly_df):
+    """Promotion budget per month."""
+    fig = px.area(monthly_df, x='Month', y='Budget',
+                  color_discrete_sequence=['#10b981'])
+    fig.update_traces(fill='tozeroy', fillcolor='rgba(16, 185, 129, 0.3)')
+    return apply_chart_style(fig, height=350)
+
+
+def build_distribution_box(values_df, y, x, yaxis_title=None):
+    """Box plot of ``y`` per ``x`` category."""
+    fig = distribution_box(values_df, y, x=x, colors=get_chart_colors())
+    fig = apply_chart_style(fig, height=400, show_legend=False)
+    if yaxis_title is not None:
+        fig.update_layout(xaxis_title="", yaxis_title=yaxis_title)
+    return fig
+
+
+def build_distribution_violin(values_df, y, x):
+    """Violin of ``y`` per ``x`` category."""
+    fig = distribution_violin(values_df, y, x=x, colors=get_chart_colors())
+    return apply_chart_style(fig, height=400, show_legend=False)
+
+
+@track_render
 def render_promotions_analysis(promotions_df, sales_df):
     """Render comprehensive promotions analysis with local filters."""
     render_section_header("🎯", "Promotional Performance Hub", "Analyze campaign effectiveness and optimize promotional strategies")
@@ -2887,33 +2868,16 @@ def render_promotions_analysis(promotions_df, sales_df):
     # =========================================================================
     # FILTER DATA
     # =========================================================================
-    filtered_promo = promotions_df.copy()
-    
-    if selected_promo_type != 'All Types' and 'promotion_type' in filtered_promo.columns:
-        filtered_promo = filtered_promo[filtered_promo['promotion_type'] == selected_promo_type]
-    
-    if promo_category != 'All Categories' and 'category' in filtered_promo.columns:
-        filtered_promo = filtered_promo[filtered_promo['category'] == promo_category]
-    
-    if 'discount_percentage' in filtered_promo.columns:
-        filtered_promo = filtered_promo[
-            (filtered_promo['discount_percentage'] >= discount_range[0]) &
-            (filtered_promo['discount_percentage'] <= discount_range[1])
-        ]
-    
-    if promo_brand != 'All Brands' and 'brand' in filtered_promo.columns:
-        filtered_promo = filtered_promo[filtered_promo['brand'] == promo_brand]
-    
-    if promo_status == 'Active Only' and 'is_active' in filtered_promo.columns:
-        filtered_promo = filtered_promo[filtered_promo['is_active'] == True]
-    elif promo_status == 'Completed Only' and 'is_active' in filtered_promo.columns:
-        filtered_promo = filtered_promo[filtered_promo['is_active'] == False]
-    
-    if 'duration_days' in filtered_promo.columns:
-        filtered_promo = filtered_promo[
-            (filtered_promo['duration_days'] >= duration_range[0]) &
-            (filtered_promo['duration_days'] <= duration_range[1])
-        ]
+    filtered_promo = filter_rows(
+        promotions_df,
+        {
+            'promotion_type': None if selected_promo_type == 'All Types' else selected_promo_type,
+            'category': None if promo_category == 'All Categories' else promo_category,
+            'brand': None if promo_brand == 'All Brands' else promo_brand,
+            'is_active': {'Active Only': True, 'Completed Only': False}.get(promo_status),
+        },
+        ranges={'discount_percentage': discount_range, 'duration_days': duration_range}
+    )
     
     if filtered_promo.empty:
         render_empty_state("🎯", "No Promotions Found", "Adjust your filters to see promotional campaigns.")
@@ -2951,48 +2915,39 @@ def render_promotions_analysis(promotions_df, sales_df):
         with col1:
             render_chart_title("Promotions by Type", "📊")
             if 'promotion_type' in filtered_promo.columns:
-                type_counts = filtered_promo['promotion_type'].value_counts().reset_index()
+                type_counts = filtered_promo['promotion_type'].value_counts().loc[lambda counts: counts > 0].reset_index()
                 type_counts.columns = ['Type', 'Count']
                 
-                fig = px.bar(type_counts, x='Type', y='Count',
-                            color='Type', color_discrete_sequence=get_chart_colors())
-                fig = apply_chart_style(fig, height=350, show_legend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = cached_figure(build_count_bar, type_counts, 'Type', 'Count')
+                render_plotly_chart(fig, use_container_width=True)
         
         with col2:
             render_chart_title("Discount Distribution", "💸")
             if 'discount_percentage' in filtered_promo.columns:
-                fig2 = px.histogram(filtered_promo, x='discount_percentage', nbins=15,
-                                   color_discrete_sequence=['#10b981'])
-                fig2 = apply_chart_style(fig2, height=350)
-                fig2.update_layout(xaxis_title="Discount %", yaxis_title="Count")
-                st.plotly_chart(fig2, use_container_width=True)
+                fig2 = cached_figure(build_histogram, filtered_promo[['discount_percentage']],
+                                     'discount_percentage', 15, '#10b981', "Discount %", "Count")
+                render_plotly_chart(fig2, use_container_width=True)
         
         col1, col2 = st.columns(2)
         
         with col1:
             render_chart_title("Budget by Category", "💰")
             if 'category' in filtered_promo.columns and 'budget' in filtered_promo.columns:
-                cat_budget = filtered_promo.groupby('category')['budget'].sum().reset_index()
+                cat_budget = filtered_promo.groupby('category', observed=True)['budget'].sum().reset_index()
                 cat_budget.columns = ['Category', 'Budget']
                 
-                fig3 = px.pie(cat_budget, values='Budget', names='Category',
-                             color_discrete_sequence=get_chart_colors(), hole=0.5)
-                fig3 = apply_chart_style(fig3, height=350)
-                st.plotly_chart(fig3, use_container_width=True)
+                fig3 = cached_figure(build_share_donut, cat_budget, 'Budget', 'Category')
+                render_plotly_chart(fig3, use_container_width=True)
         
         with col2:
             render_chart_title("Promotions by Category", "📦")
             if 'category' in filtered_promo.columns:
-                cat_counts = filtered_promo['category'].value_counts().reset_index()
+                cat_counts = filtered_promo['category'].value_counts().loc[lambda counts: counts > 0].reset_index()
                 cat_counts.columns = ['Category', 'Count']
                 
-                fig4 = px.bar(cat_counts.sort_values('Count', ascending=True),
-                             x='Count', y='Category', orientation='h',
-                             color='Count', color_continuous_scale=['#6366f1', '#ec4899'])
-                fig4 = apply_chart_style(fig4, height=350, show_legend=False)
-                fig4.update_layout(coloraxis_showscale=False)
-                st.plotly_chart(fig4, use_container_width=True)
+                fig4 = cached_figure(build_ranking_bar, cat_counts, 'Count', 'Category', 'Count',
+                                     ['#6366f1', '#ec4899'], 350)
+                render_plotly_chart(fig4, use_container_width=True)
     
     elif view_mode == "Performance Analysis":
         col1, col2 = st.columns(2)
@@ -3000,41 +2955,29 @@ def render_promotions_analysis(promotions_df, sales_df):
         with col1:
             render_chart_title("Sales Lift by Promotion Type", "📈")
             if 'promotion_type' in filtered_promo.columns and 'actual_sales_lift' in filtered_promo.columns:
-                lift_by_type = filtered_promo.groupby('promotion_type')['actual_sales_lift'].mean().reset_index()
+                lift_by_type = filtered_promo.groupby('promotion_type', observed=True)['actual_sales_lift'].mean().reset_index()
                 lift_by_type.columns = ['Type', 'Sales Lift']
                 
-                fig = px.bar(lift_by_type.sort_values('Sales Lift', ascending=True),
-                            x='Sales Lift', y='Type', orientation='h',
-                            color='Sales Lift', color_continuous_scale=['#ef4444', '#10b981'])
-                fig = apply_chart_style(fig, height=350, show_legend=False)
-                fig.update_layout(coloraxis_showscale=False)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = cached_figure(build_ranking_bar, lift_by_type, 'Sales Lift', 'Type', 'Sales Lift',
+                                    ['#ef4444', '#10b981'], 350)
+                render_plotly_chart(fig, use_container_width=True)
         
         with col2:
             render_chart_title("ROI by Promotion Type", "💹")
             if 'promotion_type' in filtered_promo.columns and 'roi' in filtered_promo.columns:
-                roi_by_type = filtered_promo.groupby('promotion_type')['roi'].mean().reset_index()
+                roi_by_type = filtered_promo.groupby('promotion_type', observed=True)['roi'].mean().reset_index()
                 roi_by_type.columns = ['Type', 'ROI']
                 
-                fig2 = px.bar(roi_by_type.sort_values('ROI', ascending=True),
-                             x='ROI', y='Type', orientation='h',
-                             color='ROI', color_continuous_scale=['#ef4444', '#10b981'])
-                fig2 = apply_chart_style(fig2, height=350, show_legend=False)
-                fig2.update_layout(coloraxis_showscale=False)
-                st.plotly_chart(fig2, use_container_width=True)
+                fig2 = cached_figure(build_ranking_bar, roi_by_type, 'ROI', 'Type', 'ROI',
+                                     ['#ef4444', '#10b981'], 350)
+                render_plotly_chart(fig2, use_container_width=True)
         
         render_chart_title("Discount vs Sales Lift Analysis", "🔍")
         if 'discount_percentage' in filtered_promo.columns and 'actual_sales_lift' in filtered_promo.columns:
-            fig3 = px.scatter(filtered_promo, x='discount_percentage', y='actual_sales_lift',
-                            color='promotion_type' if 'promotion_type' in filtered_promo.columns else None,
-                            size='budget' if 'budget' in filtered_promo.columns else None,
-                            hover_data=['promotion_id'],
-                            color_discrete_sequence=get_chart_colors())
-            fig3.add_trace(go.Scatter(x=[0, 70], y=[0, 70], mode='lines',
-                                     name='1:1 Line', line=dict(dash='dash', color='#71717a')))
-            fig3 = apply_chart_style(fig3, height=400)
-            fig3.update_layout(xaxis_title="Discount %", yaxis_title="Sales Lift %")
-            st.plotly_chart(fig3, use_container_width=True)
+            scatter_cols = [c for c in ['discount_percentage', 'actual_sales_lift', 'promotion_type',
+                                        'budget', 'promotion_id'] if c in filtered_promo.columns]
+            fig3 = cached_figure(build_discount_lift_scatter, filtered_promo[scatter_cols])
+            render_plotly_chart(fig3, use_container_width=True)
     
     elif view_mode == "Timeline":
         render_chart_title("Promotion Timeline", "📅")
@@ -3042,39 +2985,29 @@ def render_promotions_analysis(promotions_df, sales_df):
             promo_timeline = filtered_promo.groupby(filtered_promo['start_date'].dt.to_period('M').astype(str)).size().reset_index()
             promo_timeline.columns = ['Month', 'Promotions']
             
-            fig = px.line(promo_timeline, x='Month', y='Promotions', markers=True,
-                         color_discrete_sequence=['#6366f1'])
-            fig.update_traces(line=dict(width=3), marker=dict(size=10))
-            fig = apply_chart_style(fig, height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            fig = cached_figure(build_monthly_line, promo_timeline)
+            render_plotly_chart(fig, use_container_width=True)
         
         render_chart_title("Budget Allocation Over Time", "💰")
         if 'start_date' in filtered_promo.columns and 'budget' in filtered_promo.columns:
             budget_timeline = filtered_promo.groupby(filtered_promo['start_date'].dt.to_period('M').astype(str))['budget'].sum().reset_index()
             budget_timeline.columns = ['Month', 'Budget']
             
-            fig2 = px.area(budget_timeline, x='Month', y='Budget',
-                          color_discrete_sequence=['#10b981'])
-            fig2.update_traces(fill='tozeroy', fillcolor='rgba(16, 185, 129, 0.3)')
-            fig2 = apply_chart_style(fig2, height=350)
-            st.plotly_chart(fig2, use_container_width=True)
+            fig2 = cached_figure(build_monthly_area, budget_timeline)
+            render_plotly_chart(fig2, use_container_width=True)
     
     else:  # Comparison
         render_chart_title("Promotion Type Comparison", "⚖️")
         if 'promotion_type' in filtered_promo.columns:
-            fig = px.box(filtered_promo, x='promotion_type', y='discount_percentage',
-                        color='promotion_type', color_discrete_sequence=get_chart_colors())
-            fig = apply_chart_style(fig, height=400, show_legend=False)
-            fig.update_layout(xaxis_title="", yaxis_title="Discount %")
-            st.plotly_chart(fig, use_container_width=True)
+            fig = cached_figure(build_distribution_box, filtered_promo[['promotion_type', 'discount_percentage']],
+                                'discount_percentage', 'promotion_type', "Discount %")
+            render_plotly_chart(fig, use_container_width=True)
         
         if 'promotion_type' in filtered_promo.columns and 'actual_sales_lift' in filtered_promo.columns:
             render_chart_title("Sales Lift Distribution by Type", "📊")
-            fig2 = px.violin(filtered_promo, x='promotion_type', y='actual_sales_lift',
-                           color='promotion_type', color_discrete_sequence=get_chart_colors(),
-                           box=True)
-            fig2 = apply_chart_style(fig2, height=400, show_legend=False)
-            st.plotly_chart(fig2, use_container_width=True)
+            fig2 = cached_figure(build_distribution_violin, filtered_promo[['promotion_type', 'actual_sales_lift']],
+                                 'actual_sales_lift', 'promotion_type')
+            render_plotly_chart(fig2, use_container_width=True)
     
     render_divider_subtle()
     
@@ -3097,7 +3030,7 @@ def render_promotions_analysis(promotions_df, sales_df):
         display_cols.append('category')
     
     available_cols = [c for c in display_cols if c in top_promos.columns]
-    st.dataframe(top_promos[available_cols], use_container_width=True, hide_index=True)
+    render_dataframe(top_promos[available_cols], use_container_width=True, hide_index=True)
     
     # =========================================================================
     # INSIGHTS
@@ -3105,8 +3038,8 @@ def render_promotions_analysis(promotions_df, sales_df):
     st.markdown("")
     
     if 'promotion_type' in filtered_promo.columns and 'actual_sales_lift' in filtered_promo.columns:
-        best_type = filtered_promo.groupby('promotion_type')['actual_sales_lift'].mean().idxmax()
-        best_lift = filtered_promo.groupby('promotion_type')['actual_sales_lift'].mean().max()
+        best_type = filtered_promo.groupby('promotion_type', observed=True)['actual_sales_lift'].mean().idxmax()
+        best_lift = filtered_promo.groupby('promotion_type', observed=True)['actual_sales_lift'].mean().max()
         render_insight_box("🏆", "Best Promotion Type", f"{best_type} delivers the highest average sales lift of {best_lift:.1f}%.", "success")
     
     if 'roi' in filtered_promo.columns:
@@ -3117,6 +3050,115 @@ def render_promotions_analysis(promotions_df, sales_df):
 # WHAT-IF PROMOTION SIMULATOR
 # =============================================================================
 
+def add_percentile_band(fig, days, bands, color):
+    """Overlay a P10–P90 band and the P50 line from Monte Carlo percentile paths."""
+    red, green, blue = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    fig.add_trace(go.Scatter(
+        x=list(days) + list(days)[::-1],
+        y=list(bands[90]) + list(bands[10])[::-1],
+        fill='toself', fillcolor=f'rgba({red}, {green}, {blue}, 0.15)',
+        line=dict(width=0), name='P10–P90', hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=days, y=bands[50], name='P50',
+        line=dict(color=color, width=2, dash='dot')
+    ))
+    return fig
+
+
+def build_projection_figure(days, baseline_cumulative, projected_cumulative, color, fillcolor, bands, yaxis_title):
+    """Cumulative baseline vs promotion path, with the Monte Carlo band when given."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=days, y=baseline_cumulative, name='Baseline',
+        line=dict(color='#71717a', dash='dash', width=2),
+        fill='tozeroy', fillcolor='rgba(113, 113, 122, 0.1)'
+    ))
+    fig.add_trace(go.Scatter(
+        x=days, y=projected_cumulative, name='With Promotion',
+        line=dict(color=color, width=3),
+        fill='tozeroy', fillcolor=fillcolor
+    ))
+    if bands is not None:
+        add_percentile_band(fig, days, bands, color)
+    fig = apply_chart_style(fig, height=320)
+    fig.update_layout(xaxis_title="Campaign Day", yaxis_title=yaxis_title)
+    return fig
+
+
+def build_sensitivity_figure(sens_df, current_discount):
+    """Revenue impact bars and ROI line per discount, with the current discount marked."""
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(
+        go.Bar(x=sens_df['Discount'], y=sens_df['Revenue Impact'], name='Revenue Impact',
+               marker_color=['#10b981' if x > 0 else '#ef4444' for x in sens_df['Revenue Impact']]),
+        secondary_y=False
+    )
+    fig.add_trace(
+        go.Scatter(x=sens_df['Discount'], y=sens_df['ROI'], name='ROI %',
+                   line=dict(color='#f59e0b', width=3), mode='lines+markers'),
+        secondary_y=True
+    )
+    fig.add_vline(x=current_discount, line_dash="dash", line_color="#6366f1",
+                  annotation_text=f"Current: {current_discount}%")
+    fig = apply_chart_style(fig, height=350)
+    fig.update_layout(
+        xaxis_title="Discount %",
+        yaxis_title="Revenue Impact ($)",
+        yaxis2_title="ROI %"
+    )
+    return fig
+
+
+def build_response_surface(values, discounts, durations, current_discount, current_duration):
+    """Heatmap of a grid metric over discount x duration, with the current scenario marked."""
+    fig = px.imshow(
+        values.T,
+        x=discounts,
+        y=durations,
+        color_continuous_scale=['#ef4444', '#1a1a2e', '#10b981'],
+        color_continuous_midpoint=0,
+        aspect='auto',
+        origin='lower'
+    )
+    fig.add_trace(go.Scatter(
+        x=[current_discount], y=[current_duration], mode='markers', name='Current',
+        marker=dict(symbol='x', size=14, color='#ffffff')
+    ))
+    fig = apply_chart_style(fig, height=380, show_legend=False)
+    fig.update_layout(xaxis_title="Discount %", yaxis_title="Duration (days)", hovermode='closest')
+    return fig
+
+
+def build_frontier_figure(frontier, optimal_point, current_point, margin_floor, current_label='Current'):
+    """Revenue vs margin frontier per promotion type, with the margin floor and the
+    optimal and current scenarios as ``(incremental revenue, margin)`` points."""
+    fig = scatter_chart(
+        frontier, 'incremental_revenue', 'margin', color='promo_type',
+        hover_data={'discount': ':.1f', 'duration': True, 'net_impact': ':,.0f'},
+        color_discrete_sequence=get_chart_colors()
+    )
+    fig.update_traces(mode='lines+markers', selector=dict(mode='markers'))
+    fig.add_trace(go.Scatter(
+        x=[optimal_point[0]], y=[optimal_point[1]], mode='markers', name='Optimal',
+        marker=dict(symbol='star', size=16, color='#f59e0b')
+    ))
+    fig.add_trace(go.Scatter(
+        x=[current_point[0]], y=[current_point[1]], mode='markers', name=current_label,
+        marker=dict(symbol='x', size=14, color='#ffffff')
+    ))
+    fig.add_hline(y=margin_floor, line_dash="dash", line_color="#71717a",
+                  annotation_text=f"Margin floor ({margin_floor:.0%})")
+    fig = apply_chart_style(fig, height=380)
+    fig.update_layout(xaxis_title="Incremental Revenue ($)", yaxis_title="Margin (% of revenue)",
+                      yaxis_tickformat='.0%', hovermode='closest')
+    return fig
+
+
+SIM_AUDIENCE_SEGMENTS = ["All Customers", "Premium Members", "New Customers", "Lapsed Customers", "High-Value Customers"]
+
+
+@track_render
 def render_promo_simulator(sales_df, inventory_df, promotions_df):
     """Render the comprehensive What-If Promotion Simulator."""
     render_section_header("🧪", "What-If Promotion Simulator", "Simulate promotional scenarios and predict outcomes with AI-powered insights")
@@ -3146,14 +3188,14 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
         if 'category' in sales_df.columns:
             sim_category = st.selectbox(
                 "Category",
-                sorted(sales_df['category'].unique()),
+                sorted(sales_df['category'].dropna().unique()),
                 key="sim_category"
             )
         else:
             sim_category = "General"
         
         if 'brand' in sales_df.columns:
-            category_brands = sales_df[sales_df['category'] == sim_category]['brand'].unique() if 'category' in sales_df.columns else sales_df['brand'].unique()
+            category_brands = filter_rows(sales_df, {'category': sim_category})['brand'].dropna().unique()
             sim_brand = st.selectbox(
                 "Brand",
                 ['All Brands'] + sorted(category_brands.tolist()),
@@ -3163,12 +3205,10 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
             sim_brand = "All Brands"
         
         if 'sku_id' in sales_df.columns:
-            if sim_brand != 'All Brands' and 'brand' in sales_df.columns:
-                available_skus = sales_df[(sales_df['category'] == sim_category) & (sales_df['brand'] == sim_brand)]['sku_id'].unique()
-            elif 'category' in sales_df.columns:
-                available_skus = sales_df[sales_df['category'] == sim_category]['sku_id'].unique()
-            else:
-                available_skus = sales_df['sku_id'].unique()
+            available_skus = filter_rows(sales_df, {
+                'category': sim_category,
+                'brand': None if sim_brand == 'All Brands' else sim_brand,
+            })['sku_id'].dropna().unique()
             
             sim_sku = st.selectbox(
                 "Specific SKU (Optional)",
@@ -3238,7 +3278,7 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
         # Promotion type
         sim_promo_type = st.selectbox(
             "Type",
-            ["Percentage Off", "BOGO", "Bundle Deal", "Flash Sale", "Clearance", "Member Exclusive"],
+            list(PROMO_TYPE_MULTIPLIERS),
             key="sim_promo_type"
         )
         
@@ -3247,7 +3287,7 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
         
         # Store selection
         if 'region' in sales_df.columns:
-            regions = ['All Regions'] + sorted(sales_df['region'].unique().tolist())
+            regions = ['All Regions'] + sorted(sales_df['region'].dropna().unique().tolist())
             sim_region = st.selectbox(
                 "Target Region",
                 regions,
@@ -3257,7 +3297,7 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
             sim_region = "All Regions"
         
         if 'store_type' in sales_df.columns:
-            store_types = ['All Store Types'] + sorted(sales_df['store_type'].unique().tolist())
+            store_types = ['All Store Types'] + sorted(sales_df['store_type'].dropna().unique().tolist())
             sim_store_type = st.selectbox(
                 "Store Type",
                 store_types,
@@ -3271,7 +3311,7 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
         
         sim_audience = st.multiselect(
             "Customer Segments",
-            ["All Customers", "Premium Members", "New Customers", "Lapsed Customers", "High-Value Customers"],
+            SIM_AUDIENCE_SEGMENTS,
             default=["All Customers"],
             key="sim_audience"
         )
@@ -3288,6 +3328,53 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
             key="sim_budget"
         )
         
+        sim_margin_floor = st.slider(
+            "Minimum Margin (%)",
+            min_value=-20,
+            max_value=40,
+            value=10,
+            key="sim_margin_floor",
+            help="Optimizer floor on net impact as a share of projected revenue"
+        )
+        
+        sim_stock_cap = st.number_input(
+            "Stock Cap (units, 0 = none)",
+            min_value=0,
+            value=0,
+            step=500,
+            key="sim_stock_cap",
+            help="Optimizer limit on projected campaign units"
+        )
+        
+        st.markdown("")
+        st.markdown("**📦 Inventory**")
+        
+        sim_inventory_cap = st.toggle(
+            "Cap sales at stock on hand",
+            value=True,
+            key="sim_inventory_cap",
+            help="Sell the projected demand against each SKU × store's latest stock level, with reorders arriving after the lead time"
+        )
+        
+        st.markdown("")
+        st.markdown("**🎲 Uncertainty**")
+        
+        sim_monte_carlo = st.toggle(
+            "Monte Carlo bands",
+            value=False,
+            key="sim_monte_carlo",
+            help="Sample elasticity, baseline demand and fatigue from the filtered history and show P10/P50/P90 bands"
+        )
+        sim_mc_draws = MC_DRAW_OPTIONS[0]
+        if sim_monte_carlo:
+            sim_mc_draws = st.select_slider(
+                "Draws",
+                options=list(MC_DRAW_OPTIONS),
+                value=MC_DRAW_OPTIONS[0],
+                format_func=lambda n: f"{n:,}",
+                key="sim_mc_draws"
+            )
+        
         st.markdown("")
         
         # Run simulation button
@@ -3318,106 +3405,63 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
             # =====================================================================
             
             # Filter base data for simulation
-            sim_sales = sales_df.copy()
-            if 'category' in sim_sales.columns and sim_category:
-                sim_sales = sim_sales[sim_sales['category'] == sim_category]
-            if sim_brand != 'All Brands' and 'brand' in sim_sales.columns:
-                sim_sales = sim_sales[sim_sales['brand'] == sim_brand]
-            if sim_sku != 'All SKUs in Category' and 'sku_id' in sim_sales.columns:
-                sim_sales = sim_sales[sim_sales['sku_id'] == sim_sku]
-            if sim_region != 'All Regions' and 'region' in sim_sales.columns:
-                sim_sales = sim_sales[sim_sales['region'] == sim_region]
-            if sim_store_type != 'All Store Types' and 'store_type' in sim_sales.columns:
-                sim_sales = sim_sales[sim_sales['store_type'] == sim_store_type]
-            
-            # Calculate base metrics
-            if len(sim_sales) > 0:
-                total_days = (sim_sales['transaction_date'].max() - sim_sales['transaction_date'].min()).days
-                total_days = max(total_days, 1)
-                
-                base_daily_revenue = sim_sales['revenue'].sum() / total_days
-                base_daily_units = sim_sales['quantity_sold'].sum() / total_days
-                base_avg_price = sim_sales['unit_price'].mean()
-            else:
-                base_daily_revenue = 10000
-                base_daily_units = 100
-                base_avg_price = 100
-            
-            # Price elasticity model
-            # Elasticity varies by category
-            category_elasticity = {
-                'Electronics': -1.8,
-                'Clothing': -2.2,
-                'Food & Beverage': -1.2,
-                'Home & Garden': -1.5,
-                'Health & Beauty': -1.6,
-                'Sports & Outdoors': -1.7,
-                'Toys & Games': -2.0,
-                'Automotive': -1.3
-            }
-            base_elasticity = category_elasticity.get(sim_category, -1.5)
-            
-            # Adjust elasticity for promotion type
-            type_multiplier = {
-                "Percentage Off": 1.0,
-                "BOGO": 1.4,
-                "Bundle Deal": 1.2,
-                "Flash Sale": 1.5,
-                "Clearance": 1.1,
-                "Member Exclusive": 0.9
-            }
-            adjusted_elasticity = base_elasticity * type_multiplier.get(sim_promo_type, 1.0)
-            
-            # Calculate lift
-            price_change_pct = -sim_discount / 100
-            volume_lift = abs(adjusted_elasticity) * sim_discount / 100
-            
-            # Duration effects
-            if sim_duration <= 3:
-                duration_factor = 1.3  # Urgency boost
-            elif sim_duration <= 7:
-                duration_factor = 1.0
-            elif sim_duration <= 14:
-                duration_factor = 0.9  # Some fatigue
-            else:
-                duration_factor = 0.8  # Promotion fatigue
-            
-            # Audience factor
-            audience_factor = 1.0
-            if "Premium Members" in sim_audience:
-                audience_factor *= 1.15
-            if "High-Value Customers" in sim_audience:
-                audience_factor *= 1.1
-            if len(sim_audience) > 2:
-                audience_factor *= 1.05
-            
-            # Final calculations
-            final_lift = volume_lift * duration_factor * audience_factor
-            
-            # Projected metrics
-            projected_daily_units = base_daily_units * (1 + final_lift)
-            discounted_price = base_avg_price * (1 - sim_discount / 100)
-            projected_daily_revenue = projected_daily_units * discounted_price
-            
-            # Campaign totals
-            projected_total_units = projected_daily_units * sim_duration
-            projected_total_revenue = projected_daily_revenue * sim_duration
-            baseline_revenue = base_daily_revenue * sim_duration
+            sim_sales = filter_rows(sales_df, {
+                'category': sim_category or None,
+                'brand': None if sim_brand == 'All Brands' else sim_brand,
+                'sku_id': None if sim_sku == 'All SKUs in Category' else sim_sku,
+                'region': None if sim_region == 'All Regions' else sim_region,
+                'store_type': None if sim_store_type == 'All Store Types' else sim_store_type,
+            })
             
-            # Incremental metrics
-            incremental_units = projected_total_units - (base_daily_units * sim_duration)
-            incremental_revenue = projected_total_revenue - baseline_revenue
+            # Elasticity fitted from the selected region and store type's history
+            # (SKU-level when one is picked)
+            fitted_elasticity = lookup_elasticity(
+                estimate_elasticities(sales_df, {
+                    'region': None if sim_region == 'All Regions' else sim_region,
+                    'store_type': None if sim_store_type == 'All Store Types' else sim_store_type,
+                }),
+                sim_category,
+                None if sim_sku == 'All SKUs in Category' else sim_sku
+            )
+            sim_elasticity = fitted_elasticity['elasticity']
+            # A prior fallback has no fitted standard error; Monte Carlo then
+            # estimates the spread from the history (see elasticity_spread)
+            sim_elasticity_sd = fitted_elasticity['std_error'] if fitted_elasticity['weight'] > 0 else None
             
-            # Cost and ROI
-            discount_cost = (base_avg_price * sim_discount / 100) * projected_total_units
-            estimated_cogs = projected_total_revenue * 0.6  # Assume 40% margin
-            gross_profit = projected_total_revenue - estimated_cogs
-            net_impact = gross_profit - discount_cost
+            # Project the scenario
+            baseline = simulation_baseline(sim_sales)
+            result = simulate_promotion(
+                baseline, sim_category, sim_discount, sim_duration,
+                sim_promo_type, sim_audience, sim_budget, elasticity=sim_elasticity
+            )
             
-            roi = ((projected_total_revenue - baseline_revenue) / sim_budget * 100) if sim_budget > 0 else 0
+            # Cap the uplifted demand at what each SKU x store has on the shelf
+            availability = simulate_inventory(
+                sim_sales, inventory_df, result['final_lift'], sim_duration
+            ) if sim_inventory_cap else None
+            # The grid, surface and optimizer project uncapped demand; compare against this
+            uncapped_result = result
+            if availability is not None:
+                result = cap_to_availability(result, availability, baseline, sim_discount, sim_duration, sim_budget)
+            grid_basis = " (uncapped demand)" if availability is not None else ""
             
-            # Confidence score
-            confidence = min(95, 70 + (len(sim_sales) / 1000) * 5)
+            base_daily_units = baseline['daily_units']
+            projected_daily_units = result['projected_daily_units']
+            projected_total_units = result['projected_total_units']
+            projected_total_revenue = result['projected_total_revenue']
+            baseline_revenue = result['baseline_revenue']
+            incremental_units = result['incremental_units']
+            incremental_revenue = result['incremental_revenue']
+            final_lift = result['final_lift']
+            discount_cost = result['discount_cost']
+            net_impact = result['net_impact']
+            roi = result['roi']
+            monte_carlo = simulate_monte_carlo(
+                sim_sales, sim_category, sim_discount, sim_duration, sim_promo_type,
+                sim_audience, sim_budget, draws=sim_mc_draws,
+                elasticity=sim_elasticity, elasticity_sd=sim_elasticity_sd,
+                availability=availability
+            ) if sim_monte_carlo else None
             
             # =====================================================================
             # DISPLAY RESULTS
@@ -3434,16 +3478,54 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
             
             st.markdown("")
             
-            # Secondary metrics
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
+            # Secondary metrics; the uncertainty card only appears with Monte Carlo bands
+            status_cols = st.columns(4 if monte_carlo is not None else 3)
+            with status_cols[0]:
                 render_status_card("ROI", f"{roi:+.1f}%", "success" if roi > 0 else "danger")
-            with col2:
+            with status_cols[1]:
                 render_status_card("Discount Cost", f"${discount_cost:,.0f}", "warning")
-            with col3:
+            with status_cols[2]:
                 render_status_card("Net Impact", f"${net_impact:+,.0f}", "success" if net_impact > 0 else "danger")
-            with col4:
-                render_status_card("Confidence", f"{confidence:.0f}%", "success" if confidence > 80 else "warning")
+            if monte_carlo is not None:
+                band_width = monte_carlo['total_revenue'][90] - monte_carlo['total_revenue'][10]
+                band_pct = band_width / projected_total_revenue * 100 if projected_total_revenue > 0 else 0
+                with status_cols[3]:
+                    render_status_card("Revenue P10–P90 Width", f"${band_width:,.0f}",
+                                       "success" if band_pct < 20 else "warning")
+                st.caption(
+                    f"🎲 {monte_carlo['draws']:,} draws in {monte_carlo['seconds'] * 1000:,.0f} ms · "
+                    f"P(revenue gain) {monte_carlo['prob_positive'] * 100:.0f}% · "
+                    f"revenue P10–P90 ${monte_carlo['total_revenue'][10]:,.0f}–${monte_carlo['total_revenue'][90]:,.0f} · "
+                    f"ROI P10–P90 {monte_carlo['roi'][10]:+.1f}% to {monte_carlo['roi'][90]:+.1f}% · "
+                    f"elasticity σ {monte_carlo['elasticity_sd']:.2f} · "
+                    f"fatigue σ {monte_carlo['fatigue_sd']:.2f}"
+                )
+            if availability is not None:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    render_status_card("Lost Units", f"{availability['lost_units']:,.0f}",
+                                       "danger" if availability['lost_units'] > 0 else "success")
+                with col2:
+                    render_status_card("Stockout Pairs", f"{availability['stockout_pairs']:,} / {availability['tracked_pairs']:,}",
+                                       "warning" if availability['stockout_pairs'] else "success")
+                with col3:
+                    first_stockout = availability['first_stockout_day']
+                    render_status_card("First Stockout", f"Day {first_stockout:.0f}" if first_stockout else "None",
+                                       "warning" if first_stockout else "success")
+                with col4:
+                    render_status_card("Fill Rate", f"{availability['fill_rate'] * 100:.1f}%",
+                                       "success" if availability['fill_rate'] > 0.95 else "warning")
+                st.caption(
+                    f"📦 Demand sold against {availability['tracked_pairs']:,} SKU × store stock positions in "
+                    f"{availability['seconds'] * 1000:,.0f} ms"
+                    + (f" · {availability['untracked_units']:,.0f} units from pairs missing from the snapshot left uncapped"
+                       if availability['untracked_units'] > 0 else "")
+                )
+            st.caption(
+                f"📐 Elasticity {sim_elasticity:.2f} ± {fitted_elasticity['std_error']:.2f} "
+                f"({fitted_elasticity['level']}, {fitted_elasticity['source']}, "
+                f"{fitted_elasticity['weight']:.0%} from {fitted_elasticity['observations']:,} SKU-days)"
+            )
             
             render_divider_subtle()
             
@@ -3457,104 +3539,163 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
                 render_chart_title("Revenue Projection", "📈")
                 
                 days = list(range(1, sim_duration + 1))
+                if availability is not None:
+                    # Uncapped demand less the units lost to stockouts so far
+                    demand_daily_units = (projected_total_units + availability['lost_units']) / sim_duration
+                    projected_units_cum = demand_daily_units * np.arange(1, sim_duration + 1) - np.cumsum(availability['daily_lost'])
+                else:
+                    projected_units_cum = projected_daily_units * np.arange(1, sim_duration + 1)
                 baseline_cumulative = [baseline_revenue / sim_duration * d for d in days]
-                projected_cumulative = [projected_total_revenue / sim_duration * d for d in days]
+                projected_cumulative = projected_units_cum * baseline['avg_price'] * (1 - sim_discount / 100)
                 
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=days, y=baseline_cumulative, name='Baseline',
-                    line=dict(color='#71717a', dash='dash', width=2),
-                    fill='tozeroy', fillcolor='rgba(113, 113, 122, 0.1)'
-                ))
-                fig.add_trace(go.Scatter(
-                    x=days, y=projected_cumulative, name='With Promotion',
-                    line=dict(color='#6366f1', width=3),
-                    fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.2)'
-                ))
-                fig = apply_chart_style(fig, height=320)
-                fig.update_layout(xaxis_title="Campaign Day", yaxis_title="Cumulative Revenue ($)")
-                st.plotly_chart(fig, use_container_width=True)
+                fig = cached_figure(
+                    build_projection_figure, days, baseline_cumulative, projected_cumulative,
+                    '#6366f1', 'rgba(99, 102, 241, 0.2)',
+                    monte_carlo['revenue_bands'] if monte_carlo is not None else None,
+                    "Cumulative Revenue ($)"
+                )
+                render_plotly_chart(fig, use_container_width=True)
             
             with col2:
                 render_chart_title("Units Projection", "📦")
                 
                 baseline_units_cum = [base_daily_units * d for d in days]
-                projected_units_cum = [projected_daily_units * d for d in days]
                 
-                fig2 = go.Figure()
-                fig2.add_trace(go.Scatter(
-                    x=days, y=baseline_units_cum, name='Baseline',
-                    line=dict(color='#71717a', dash='dash', width=2),
-                    fill='tozeroy', fillcolor='rgba(113, 113, 122, 0.1)'
-                ))
-                fig2.add_trace(go.Scatter(
-                    x=days, y=projected_units_cum, name='With Promotion',
-                    line=dict(color='#10b981', width=3),
-                    fill='tozeroy', fillcolor='rgba(16, 185, 129, 0.2)'
-                ))
-                fig2 = apply_chart_style(fig2, height=320)
-                fig2.update_layout(xaxis_title="Campaign Day", yaxis_title="Cumulative Units")
-                st.plotly_chart(fig2, use_container_width=True)
+                fig2 = cached_figure(
+                    build_projection_figure, days, baseline_units_cum, projected_units_cum,
+                    '#10b981', 'rgba(16, 185, 129, 0.2)',
+                    monte_carlo['units_bands'] if monte_carlo is not None else None,
+                    "Cumulative Units"
+                )
+                render_plotly_chart(fig2, use_container_width=True)
             
             # =====================================================================
             # SENSITIVITY ANALYSIS
             # =====================================================================
             
-            render_chart_title("Sensitivity Analysis: Discount vs Revenue Impact", "🔍")
-            
-            discount_range = list(range(5, 75, 5))
-            revenue_impacts = []
-            roi_impacts = []
-            
-            for disc in discount_range:
-                temp_lift = abs(adjusted_elasticity) * disc / 100 * duration_factor * audience_factor
-                temp_units = base_daily_units * (1 + temp_lift) * sim_duration
-                temp_price = base_avg_price * (1 - disc / 100)
-                temp_revenue = temp_units * temp_price
-                temp_impact = temp_revenue - baseline_revenue
-                revenue_impacts.append(temp_impact)
-                roi_impacts.append((temp_impact / sim_budget * 100) if sim_budget > 0 else 0)
+            render_chart_title(f"Sensitivity Analysis: Discount vs Revenue Impact{grid_basis}", "🔍")
             
+            # Response surface over every discount x duration x type x audience x
+            # region x store type, evaluated in one broadcast
+            scope_sales = filter_rows(sales_df, {
+                'category': sim_category or None,
+                'brand': None if sim_brand == 'All Brands' else sim_brand,
+                'sku_id': None if sim_sku == 'All SKUs in Category' else sim_sku,
+            })
+            grid_audiences = [tuple(sim_audience)] + [
+                (segment,) for segment in SIM_AUDIENCE_SEGMENTS if (segment,) != tuple(sim_audience)
+            ]
+            grid_region = ALL_LABEL if sim_region == 'All Regions' else sim_region
+            grid_store_type = ALL_LABEL if sim_store_type == 'All Store Types' else sim_store_type
+            grid = simulate_grid(
+                scope_sales, sim_category, sim_budget,
+                durations=range(1, 31),
+                audiences=grid_audiences,
+                regions=[ALL_LABEL] + (sorted(sales_df['region'].dropna().unique().tolist()) if 'region' in sales_df.columns else []),
+                store_types=[ALL_LABEL] + (sorted(sales_df['store_type'].dropna().unique().tolist()) if 'store_type' in sales_df.columns else []),
+                elasticity=sim_elasticity
+            )
+            scope_grid = grid_slice(grid, region=grid_region, store_type=grid_store_type)
+            scenario_grid = grid_slice(scope_grid, promo_type=sim_promo_type, audience=sim_audience)
+            sens_grid = grid_slice(scenario_grid, duration=sim_duration)
             sens_df = pd.DataFrame({
-                'Discount': discount_range,
-                'Revenue Impact': revenue_impacts,
-                'ROI': roi_impacts
+                'Discount': sens_grid['coords']['discount'],
+                'Revenue Impact': sens_grid['metrics']['incremental_revenue'],
+                'ROI': sens_grid['metrics']['roi']
             })
             
-            fig3 = make_subplots(specs=[[{"secondary_y": True}]])
-            fig3.add_trace(
-                go.Bar(x=sens_df['Discount'], y=sens_df['Revenue Impact'], name='Revenue Impact',
-                      marker_color=['#10b981' if x > 0 else '#ef4444' for x in sens_df['Revenue Impact']]),
-                secondary_y=False
-            )
-            fig3.add_trace(
-                go.Scatter(x=sens_df['Discount'], y=sens_df['ROI'], name='ROI %',
-                          line=dict(color='#f59e0b', width=3), mode='lines+markers'),
-                secondary_y=True
-            )
-            fig3.add_vline(x=sim_discount, line_dash="dash", line_color="#6366f1",
-                          annotation_text=f"Current: {sim_discount}%")
-            fig3 = apply_chart_style(fig3, height=350)
-            fig3.update_layout(
-                xaxis_title="Discount %",
-                yaxis_title="Revenue Impact ($)",
-                yaxis2_title="ROI %"
-            )
-            st.plotly_chart(fig3, use_container_width=True)
+            fig3 = cached_figure(build_sensitivity_figure, sens_df, sim_discount)
+            render_plotly_chart(fig3, use_container_width=True)
             
             # =====================================================================
-            # AI RECOMMENDATIONS
+            # RESPONSE SURFACE
+            # =====================================================================
+            
+            render_chart_title(f"Response Surface: Discount × Duration{grid_basis}", "🗺️")
+            
+            surface_metric = st.radio(
+                "Surface metric",
+                ["Incremental Revenue", "ROI", "Net Impact"],
+                horizontal=True,
+                key="sim_surface_metric"
+            )
+            metric_key = {"Incremental Revenue": 'incremental_revenue', "ROI": 'roi', "Net Impact": 'net_impact'}[surface_metric]
+            
+            fig_surface = cached_figure(
+                build_response_surface, scenario_grid['metrics'][metric_key],
+                scenario_grid['coords']['discount'], scenario_grid['coords']['duration'],
+                sim_discount, sim_duration
+            )
+            render_plotly_chart(fig_surface, use_container_width=True)
+            
+            best = best_scenario(scope_grid, metric_key)
+            if best is not None:
+                render_insight_box(
+                    "🏆",
+                    f"Best Scenario by {surface_metric}",
+                    f"{best['promo_type']} at {best['discount']}% for {best['duration']} days targeting "
+                    f"{', '.join(best['audience']) or 'all customers'}: incremental revenue ${best['incremental_revenue']:+,.0f}, "
+                    f"ROI {best['roi']:+.1f}%, net impact ${best['net_impact']:+,.0f} "
+                    f"(searched {scope_grid['metrics'][metric_key].size:,} scenarios for {sim_region} / {sim_store_type})",
+                    "success"
+                )
+            
+            # =====================================================================
+            # CONSTRAINED OPTIMIZER
+            # =====================================================================
+            
+            render_chart_title(f"Optimal Promotions: Revenue vs Margin Frontier{grid_basis}", "🧭")
+            
+            optimization = optimize_promotion(
+                scope_sales, sim_category, sim_budget,
+                audience=sim_audience, region=grid_region, store_type=grid_store_type,
+                margin_floor=sim_margin_floor / 100,
+                stock_cap=sim_stock_cap or None,
+                elasticity=sim_elasticity
+            )
+            optimal = optimization['best']
+            if optimal is None:
+                render_insight_box(
+                    "⚠️", "No Feasible Promotion",
+                    f"No discount, duration and type fits a ${sim_budget:,.0f} budget with a {sim_margin_floor}% margin floor"
+                    + (f" and {sim_stock_cap:,} units of stock" if sim_stock_cap else "")
+                    + ". Relax a constraint to see the frontier.",
+                    "warning"
+                )
+            else:
+                frontier = optimization['frontier']
+                # The optimizer's basis, so the current point is comparable to the frontier
+                current_revenue = uncapped_result['projected_total_revenue']
+                current_margin = uncapped_result['net_impact'] / current_revenue if current_revenue > 0 else 0.0
+                fig_frontier = cached_figure(
+                    build_frontier_figure, frontier,
+                    (optimal['incremental_revenue'], optimal['margin']),
+                    (uncapped_result['incremental_revenue'], current_margin),
+                    sim_margin_floor / 100,
+                    current_label=f"Current{grid_basis}"
+                )
+                render_plotly_chart(fig_frontier, use_container_width=True)
+                st.caption(
+                    f"🧭 {optimization['feasible']:,} of {optimization['evaluated']:,} scenarios feasible · "
+                    f"{len(frontier):,} on the frontier · {optimization['seconds'] * 1000:,.0f} ms"
+                )
+            
+            # =====================================================================
+            # AI RECOMMENDATIONS
             # =====================================================================
             
             recommendations = []
             
-            # Discount recommendation
-            optimal_discount_idx = sens_df['Revenue Impact'].idxmax()
-            optimal_discount = sens_df.loc[optimal_discount_idx, 'Discount']
-            if abs(optimal_discount - sim_discount) > 5:
+            # Discount recommendation from the constrained optimizer
+            if optimal is not None and (
+                abs(optimal['discount'] - sim_discount) > 5 or optimal['duration'] != sim_duration
+                or optimal['promo_type'] != sim_promo_type
+            ):
                 recommendations.append({
                     "icon": "🎯",
-                    "text": f"Consider adjusting discount to {optimal_discount}% for maximum revenue impact (${sens_df.loc[optimal_discount_idx, 'Revenue Impact']:+,.0f})"
+                    "text": f"Consider a {optimal['promo_type']} at {optimal['discount']:.1f}% for {optimal['duration']} days "
+                            f"for maximum revenue impact within budget and margin (${optimal['incremental_revenue']:+,.0f}, "
+                            f"margin {optimal['margin']:.1%})"
                 })
             
             # Duration recommendation
@@ -3596,6 +3737,13 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
                 })
             
             # Inventory check
+            if availability is not None and availability['lost_units'] > 0:
+                recommendations.append({
+                    "icon": "📦",
+                    "text": f"Stock runs out for {availability['stockout_pairs']:,} SKU × store pairs (first on day "
+                            f"{availability['first_stockout_day']:.0f}), losing {availability['lost_units']:,.0f} units of demand. "
+                            f"Replenish ahead of launch"
+                })
             if 'category' in inventory_df.columns:
                 cat_inventory = inventory_df[inventory_df['category'] == sim_category] if 'category' in inventory_df.columns else inventory_df
                 critical_items = len(cat_inventory[cat_inventory['stock_status'] == 'Critical'])
@@ -3606,10 +3754,18 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
                     })
             
             # Add general recommendation
-            recommendations.append({
-                "icon": "📊",
-                "text": f"Based on {len(sim_sales):,} historical transactions, confidence level is {confidence:.0f}%"
-            })
+            if monte_carlo is not None:
+                recommendations.append({
+                    "icon": "📊",
+                    "text": f"Across {monte_carlo['draws']:,} simulated outcomes from {len(sim_sales):,} historical transactions, "
+                            f"{monte_carlo['prob_positive'] * 100:.0f}% show a revenue gain (P10–P90 incremental "
+                            f"${monte_carlo['incremental_revenue'][10]:+,.0f} to ${monte_carlo['incremental_revenue'][90]:+,.0f})"
+                })
+            else:
+                recommendations.append({
+                    "icon": "📊",
+                    "text": f"Based on {len(sim_sales):,} historical transactions; enable Monte Carlo for an uncertainty range"
+                })
             
             render_ai_recommendations(recommendations)
             
@@ -3674,6 +3830,56 @@ def render_promo_simulator(sales_df, inventory_df, promotions_df):
             render_ai_recommendations(tips)
 
 
+def build_store_ranking_bar(top_stores, metric):
+    """Top stores by ``metric``, largest at the top."""
+    fig = px.bar(
+        top_stores.sort_values(metric, ascending=True),
+        x=metric,
+        y='Store',
+        orientation='h',
+        color=metric,
+        color_continuous_scale=['#6366f1', '#ec4899'],
+        hover_data=['Transactions', 'AOV'] if 'Transactions' in top_stores.columns else None
+    )
+    fig = apply_chart_style(fig, height=400, show_legend=False)
+    fig.update_layout(coloraxis_showscale=False, yaxis_title="")
+    return fig
+
+
+def build_store_scatter(store_metrics):
+    """Revenue against transactions per store, sized by units and colored by AOV."""
+    fig = scatter_chart(
+        store_metrics,
+        'Transactions',
+        'Revenue',
+        size='Units',
+        color='AOV',
+        hover_name='Store',
+        color_continuous_scale=['#f59e0b', '#10b981']
+    )
+    fig = apply_chart_style(fig, height=400)
+    fig.update_traces(marker=dict(line=dict(width=1, color='white')), selector=dict(mode='markers'))
+    return fig
+
+
+def build_store_type_bar(type_perf):
+    """Average revenue per store type, colored by average AOV."""
+    fig = px.bar(type_perf, x='Type', y='Avg Revenue',
+                 color='Avg AOV', color_continuous_scale=['#6366f1', '#10b981'])
+    fig = apply_chart_style(fig, height=350, show_legend=False)
+    fig.update_layout(coloraxis_showscale=False)
+    return fig
+
+
+def build_store_type_scatter(type_perf):
+    """Average revenue against average transactions per store type."""
+    fig = scatter_chart(type_perf, 'Avg Transactions', 'Avg Revenue',
+                        size='Avg Units', color='Type',
+                        color_discrete_sequence=get_chart_colors())
+    return apply_chart_style(fig, height=350)
+
+
+@track_render
 def render_store_performance(sales_df, inventory_df):
     """Render comprehensive store performance analysis."""
     render_section_header("🏪", "Store Performance Analysis", "Compare and benchmark store performance across regions")
@@ -3694,7 +3900,7 @@ def render_store_performance(sales_df, inventory_df):
     
     with filter_cols[1]:
         if 'region' in sales_df.columns:
-            regions = ['All Regions'] + sorted(sales_df['region'].unique().tolist())
+            regions = ['All Regions'] + sorted(sales_df['region'].dropna().unique().tolist())
             store_region = st.selectbox(
                 "🌍 Region",
                 regions,
@@ -3705,7 +3911,7 @@ def render_store_performance(sales_df, inventory_df):
     
     with filter_cols[2]:
         if 'store_type' in sales_df.columns:
-            store_types = ['All Types'] + sorted(sales_df['store_type'].unique().tolist())
+            store_types = ['All Types'] + sorted(sales_df['store_type'].dropna().unique().tolist())
             store_type_filter = st.selectbox(
                 "🏬 Store Type",
                 store_types,
@@ -3715,11 +3921,13 @@ def render_store_performance(sales_df, inventory_df):
             store_type_filter = 'All Types'
     
     with filter_cols[3]:
+        sales_df = with_derived_columns(sales_df, ['month'])
         if 'month' in sales_df.columns:
-            months = ['All Time'] + sorted(sales_df['month'].unique().tolist())
+            months = ['All Time'] + sorted(sales_df['month'].dropna().unique().tolist())
             store_time_period = st.selectbox(
                 "📅 Time Period",
                 months,
+                format_func=lambda month: month if month == 'All Time' else format_month(month),
                 key="store_time_period"
             )
         else:
@@ -3741,7 +3949,7 @@ def render_store_performance(sales_df, inventory_df):
         if 'category' in sales_df.columns:
             store_category = st.selectbox(
                 "🏷️ Category Focus",
-                ['All Categories'] + sorted(sales_df['category'].unique().tolist()),
+                ['All Categories'] + sorted(sales_df['category'].dropna().unique().tolist()),
                 key="store_category_filter"
             )
         else:
@@ -3752,19 +3960,12 @@ def render_store_performance(sales_df, inventory_df):
     # =========================================================================
     # FILTER DATA
     # =========================================================================
-    filtered_sales = sales_df.copy()
-    
-    if store_region != 'All Regions' and 'region' in filtered_sales.columns:
-        filtered_sales = filtered_sales[filtered_sales['region'] == store_region]
-    
-    if store_type_filter != 'All Types' and 'store_type' in filtered_sales.columns:
-        filtered_sales = filtered_sales[filtered_sales['store_type'] == store_type_filter]
-    
-    if store_time_period != 'All Time' and 'month' in filtered_sales.columns:
-        filtered_sales = filtered_sales[filtered_sales['month'] == store_time_period]
-    
-    if store_category != 'All Categories' and 'category' in filtered_sales.columns:
-        filtered_sales = filtered_sales[filtered_sales['category'] == store_category]
+    filtered_sales = filter_rows(sales_df, {
+        'region': None if store_region == 'All Regions' else store_region,
+        'store_type': None if store_type_filter == 'All Types' else store_type_filter,
+        'month': None if store_time_period == 'All Time' else store_time_period,
+        'category': None if store_category == 'All Categories' else store_category,
+    })
     
     if filtered_sales.empty:
         render_empty_state("🏪", "No Store Data", "Adjust filters to see store performance.")
@@ -3773,7 +3974,7 @@ def render_store_performance(sales_df, inventory_df):
     # =========================================================================
     # CALCULATE STORE METRICS
     # =========================================================================
-    store_metrics = filtered_sales.groupby('store_id').agg({
+    store_metrics = filtered_sales.groupby('store_id', observed=True).agg({
         'revenue': 'sum',
         'quantity_sold': 'sum',
         'transaction_id': 'nunique',
@@ -3785,11 +3986,11 @@ def render_store_performance(sales_df, inventory_df):
     
     # Add store attributes
     if 'region' in sales_df.columns:
-        store_regions = sales_df.groupby('store_id')['region'].first()
+        store_regions = sales_df.groupby('store_id', observed=True)['region'].first()
         store_metrics['Region'] = store_metrics['Store'].map(store_regions)
     
     if 'store_type' in sales_df.columns:
-        store_types_map = sales_df.groupby('store_id')['store_type'].first()
+        store_types_map = sales_df.groupby('store_id', observed=True)['store_type'].first()
         store_metrics['Type'] = store_metrics['Store'].map(store_types_map)
     
     # Select metric for ranking
@@ -3832,34 +4033,14 @@ def render_store_performance(sales_df, inventory_df):
         
         top_stores = store_metrics.nlargest(top_n_stores, selected_metric)
         
-        fig = px.bar(
-            top_stores.sort_values(selected_metric, ascending=True),
-            x=selected_metric,
-            y='Store',
-            orientation='h',
-            color=selected_metric,
-            color_continuous_scale=['#6366f1', '#ec4899'],
-            hover_data=['Transactions', 'AOV'] if 'Transactions' in top_stores.columns else None
-        )
-        fig = apply_chart_style(fig, height=400, show_legend=False)
-        fig.update_layout(coloraxis_showscale=False, yaxis_title="")
-        st.plotly_chart(fig, use_container_width=True)
+        fig = cached_figure(build_store_ranking_bar, top_stores, selected_metric)
+        render_plotly_chart(fig, use_container_width=True)
     
     with col2:
         render_chart_title("Store Performance Distribution", "📊")
         
-        fig2 = px.scatter(
-            store_metrics,
-            x='Transactions',
-            y='Revenue',
-            size='Units',
-            color='AOV',
-            hover_name='Store',
-            color_continuous_scale=['#f59e0b', '#10b981']
-        )
-        fig2 = apply_chart_style(fig2, height=400)
-        fig2.update_traces(marker=dict(line=dict(width=1, color='white')))
-        st.plotly_chart(fig2, use_container_width=True)
+        fig2 = cached_figure(build_store_scatter, store_metrics)
+        render_plotly_chart(fig2, use_container_width=True)
     
     render_divider_subtle()
     
@@ -3872,7 +4053,7 @@ def render_store_performance(sales_df, inventory_df):
         col1, col2 = st.columns(2)
         
         with col1:
-            region_perf = store_metrics.groupby('Region').agg({
+            region_perf = store_metrics.groupby('Region', observed=True).agg({
                 'Revenue': 'sum',
                 'Units': 'sum',
                 'Transactions': 'sum',
@@ -3881,17 +4062,13 @@ def render_store_performance(sales_df, inventory_df):
             region_perf.columns = ['Region', 'Revenue', 'Units', 'Transactions', 'Store Count']
             region_perf['Revenue per Store'] = region_perf['Revenue'] / region_perf['Store Count']
             
-            fig3 = px.bar(region_perf, x='Region', y='Revenue',
-                         color='Region', color_discrete_sequence=get_chart_colors())
-            fig3 = apply_chart_style(fig3, height=350, show_legend=False)
+            fig3 = cached_figure(build_region_bar, region_perf)
             fig3.update_layout(xaxis_title="")
-            st.plotly_chart(fig3, use_container_width=True)
+            render_plotly_chart(fig3, use_container_width=True)
         
         with col2:
-            fig4 = px.pie(region_perf, values='Revenue', names='Region',
-                         color_discrete_sequence=get_chart_colors(), hole=0.5)
-            fig4 = apply_chart_style(fig4, height=350)
-            st.plotly_chart(fig4, use_container_width=True)
+            fig4 = cached_figure(build_share_donut, region_perf, 'Revenue', 'Region')
+            render_plotly_chart(fig4, use_container_width=True)
     
     # =========================================================================
     # STORE TYPE ANALYSIS
@@ -3902,7 +4079,7 @@ def render_store_performance(sales_df, inventory_df):
         col1, col2 = st.columns(2)
         
         with col1:
-            type_perf = store_metrics.groupby('Type').agg({
+            type_perf = store_metrics.groupby('Type', observed=True).agg({
                 'Revenue': 'mean',
                 'Units': 'mean',
                 'Transactions': 'mean',
@@ -3910,18 +4087,12 @@ def render_store_performance(sales_df, inventory_df):
             }).reset_index()
             type_perf.columns = ['Type', 'Avg Revenue', 'Avg Units', 'Avg Transactions', 'Avg AOV']
             
-            fig5 = px.bar(type_perf, x='Type', y='Avg Revenue',
-                         color='Avg AOV', color_continuous_scale=['#6366f1', '#10b981'])
-            fig5 = apply_chart_style(fig5, height=350, show_legend=False)
-            fig5.update_layout(coloraxis_showscale=False)
-            st.plotly_chart(fig5, use_container_width=True)
+            fig5 = cached_figure(build_store_type_bar, type_perf)
+            render_plotly_chart(fig5, use_container_width=True)
         
         with col2:
-            fig6 = px.scatter(type_perf, x='Avg Transactions', y='Avg Revenue',
-                            size='Avg Units', color='Type',
-                            color_discrete_sequence=get_chart_colors())
-            fig6 = apply_chart_style(fig6, height=350)
-            st.plotly_chart(fig6, use_container_width=True)
+            fig6 = cached_figure(build_store_type_scatter, type_perf)
+            render_plotly_chart(fig6, use_container_width=True)
     
     render_divider_subtle()
     
@@ -3942,7 +4113,7 @@ def render_store_performance(sales_df, inventory_df):
     display_df['Transactions'] = display_df['Transactions'].apply(lambda x: f"{x:,}")
     display_df['AOV'] = display_df['AOV'].apply(lambda x: f"${x:.2f}")
     
-    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    render_dataframe(display_df, use_container_width=True, hide_index=True)
     
     # =========================================================================
     # INSIGHTS
@@ -3958,10 +4129,106 @@ def render_store_performance(sales_df, inventory_df):
     render_insight_box("📊", "Performance Gap", f"Revenue gap between top and bottom performers is ${revenue_gap:,.0f}. Consider best practice sharing.", "warning")
     
     if 'Region' in store_metrics.columns:
-        best_region = store_metrics.groupby('Region')['Revenue'].sum().idxmax()
+        best_region = store_metrics.groupby('Region', observed=True)['Revenue'].sum().idxmax()
         render_insight_box("🌍", "Regional Leader", f"{best_region} region generates the highest total revenue. Consider expansion opportunities.", "primary")
 
 
+def build_value_bar(value_df, x, color_scale, height, yaxis_title=None):
+    """Bar of ``Value`` per ``x``, colored by value."""
+    fig = px.bar(value_df, x=x, y='Value',
+                 color='Value', color_continuous_scale=color_scale)
+    fig = apply_chart_style(fig, height=height, show_legend=False)
+    fig.update_layout(coloraxis_showscale=False)
+    if yaxis_title is not None:
+        fig.update_layout(xaxis_title="", yaxis_title=yaxis_title)
+    return fig
+
+
+def build_weekday_radar(dow_data, metric_label):
+    """Closed radar of ``Value`` by day of week."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=dow_data['Value'].tolist() + [dow_data['Value'].iloc[0]],
+        theta=dow_data['Day'].tolist() + [dow_data['Day'].iloc[0]],
+        fill='toself',
+        fillcolor='rgba(99, 102, 241, 0.3)',
+        line=dict(color='#6366f1', width=3),
+        name=metric_label
+    ))
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, gridcolor='rgba(255,255,255,0.1)'),
+            angularaxis=dict(gridcolor='rgba(255,255,255,0.1)')
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#a1a1aa'),
+        height=380,
+        showlegend=False
+    )
+    return fig
+
+
+def build_hourly_line(hourly_data, metric_label):
+    """``Value`` by hour with the peak hour highlighted."""
+    fig = px.line(hourly_data, x='Hour', y='Value', markers=True,
+                  color_discrete_sequence=['#6366f1'])
+    fig.update_traces(line=dict(width=3), marker=dict(size=8))
+
+    # Add peak hour highlighting
+    peak_hour = hourly_data.loc[hourly_data['Value'].idxmax(), 'Hour']
+    fig.add_vrect(x0=peak_hour-0.5, x1=peak_hour+0.5,
+                  fillcolor="rgba(16, 185, 129, 0.2)",
+                  layer="below", line_width=0)
+
+    fig = apply_chart_style(fig, height=380)
+    fig.update_layout(xaxis_title="Hour of Day", yaxis_title=metric_label)
+    return fig
+
+
+def build_monthly_trend(trend_data, metric_label):
+    """Monthly ``Value`` bars with the 3-month moving average."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=trend_data['Month'], y=trend_data['Value'],
+        name=metric_label, marker_color='#6366f1',
+        opacity=0.7
+    ))
+    fig.add_trace(go.Scatter(
+        x=trend_data['Month'], y=trend_data['MA_3'],
+        name='3-Month MA', line=dict(color='#ec4899', width=3),
+        mode='lines'
+    ))
+    fig = apply_chart_style(fig, height=400)
+    fig.update_layout(xaxis_title="", yaxis_title=metric_label, barmode='overlay')
+    return fig
+
+
+def build_seasonal_line(seasonal_data, avg_value, metric_label):
+    """``Value`` by calendar month against the average."""
+    fig = px.line(seasonal_data, x='Month_Name', y='Value', markers=True,
+                  color_discrete_sequence=['#6366f1'])
+    fig.update_traces(fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.2)', line=dict(width=3))
+    fig.add_hline(y=avg_value, line_dash="dash", line_color="#71717a",
+                  annotation_text="Average")
+    fig = apply_chart_style(fig, height=380)
+    fig.update_layout(xaxis_title="", yaxis_title=metric_label)
+    return fig
+
+
+def build_seasonal_index_bar(seasonal_data):
+    """Seasonal index by calendar month, green at or above the 100 baseline."""
+    colors = ['#10b981' if x >= 100 else '#ef4444' for x in seasonal_data['Seasonal_Index']]
+    fig = px.bar(seasonal_data, x='Month_Name', y='Seasonal_Index',
+                 color_discrete_sequence=['#6366f1'])
+    fig.update_traces(marker_color=colors)
+    fig.add_hline(y=100, line_dash="dash", line_color="#71717a",
+                  annotation_text="Baseline (100)")
+    fig = apply_chart_style(fig, height=380, show_legend=False)
+    fig.update_layout(xaxis_title="", yaxis_title="Seasonal Index")
+    return fig
+
+
+@track_render
 def render_time_analysis(sales_df):
     """Render comprehensive time-based analysis."""
     render_section_header("⏰", "Time-Based Analytics", "Discover temporal patterns, trends, and seasonality")
@@ -3980,11 +4247,18 @@ def render_time_analysis(sales_df):
             key="time_analysis_type"
         )
     
+    time_part = {
+        "Day of Week": 'day_of_week', "Hourly Pattern": 'hour', "Monthly Trend": 'month',
+        "Quarterly Comparison": 'quarter', "Seasonality": 'month'
+    }.get(analysis_type)
+    if time_part:
+        sales_df = with_derived_columns(sales_df, [time_part])
+    
     with filter_cols[1]:
         if 'category' in sales_df.columns:
             time_category = st.selectbox(
                 "🏷️ Category",
-                ['All Categories'] + sorted(sales_df['category'].unique().tolist()),
+                ['All Categories'] + sorted(sales_df['category'].dropna().unique().tolist()),
                 key="time_category"
             )
         else:
@@ -3994,7 +4268,7 @@ def render_time_analysis(sales_df):
         if 'region' in sales_df.columns:
             time_region = st.selectbox(
                 "🌍 Region",
-                ['All Regions'] + sorted(sales_df['region'].unique().tolist()),
+                ['All Regions'] + sorted(sales_df['region'].dropna().unique().tolist()),
                 key="time_region"
             )
         else:
@@ -4012,13 +4286,10 @@ def render_time_analysis(sales_df):
     # =========================================================================
     # FILTER DATA
     # =========================================================================
-    filtered_df = sales_df.copy()
-    
-    if time_category != 'All Categories' and 'category' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['category'] == time_category]
-    
-    if time_region != 'All Regions' and 'region' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['region'] == time_region]
+    filtered_df = filter_rows(sales_df, {
+        'category': None if time_category == 'All Categories' else time_category,
+        'region': None if time_region == 'All Regions' else time_region,
+    })
     
     if filtered_df.empty:
         render_empty_state("⏰", "No Data for Analysis", "Adjust filters to see time patterns.")
@@ -4039,7 +4310,7 @@ def render_time_analysis(sales_df):
     if analysis_type == "Day of Week":
         render_chart_title("Sales by Day of Week", "📅")
         
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        day_order = DAY_NAMES
         
         if time_metric == "Transactions":
             dow_data = filtered_df.groupby('day_of_week')[metric_col].nunique().reset_index()
@@ -4052,40 +4323,19 @@ def render_time_analysis(sales_df):
             dow_data = filtered_df.groupby('day_of_week')[metric_col].sum().reset_index()
         
         dow_data.columns = ['Day', 'Value'] if len(dow_data.columns) == 2 else ['Day', 'Value']
-        dow_data['Day'] = pd.Categorical(dow_data['Day'], categories=day_order, ordered=True)
         dow_data = dow_data.sort_values('Day')
+        dow_data['Day'] = pd.Categorical.from_codes(dow_data['Day'].astype('int8'), categories=day_order, ordered=True)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.bar(dow_data, x='Day', y='Value',
-                        color='Value', color_continuous_scale=['#6366f1', '#ec4899'])
-            fig = apply_chart_style(fig, height=380, show_legend=False)
-            fig.update_layout(coloraxis_showscale=False, xaxis_title="", yaxis_title=time_metric)
-            st.plotly_chart(fig, use_container_width=True)
+            fig = cached_figure(build_value_bar, dow_data, 'Day', ['#6366f1', '#ec4899'], 380, time_metric)
+            render_plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Radar chart
-            fig2 = go.Figure()
-            fig2.add_trace(go.Scatterpolar(
-                r=dow_data['Value'].tolist() + [dow_data['Value'].iloc[0]],
-                theta=dow_data['Day'].tolist() + [dow_data['Day'].iloc[0]],
-                fill='toself',
-                fillcolor='rgba(99, 102, 241, 0.3)',
-                line=dict(color='#6366f1', width=3),
-                name=time_metric
-            ))
-            fig2.update_layout(
-                polar=dict(
-                    radialaxis=dict(visible=True, gridcolor='rgba(255,255,255,0.1)'),
-                    angularaxis=dict(gridcolor='rgba(255,255,255,0.1)')
-                ),
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='#a1a1aa'),
-                height=380,
-                showlegend=False
-            )
-            st.plotly_chart(fig2, use_container_width=True)
+            fig2 = cached_figure(build_weekday_radar, dow_data, time_metric)
+            render_plotly_chart(fig2, use_container_width=True)
         
         # Insights
         best_day = dow_data.loc[dow_data['Value'].idxmax(), 'Day']
@@ -4124,27 +4374,13 @@ def render_time_analysis(sales_df):
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.line(hourly_data, x='Hour', y='Value', markers=True,
-                             color_discrete_sequence=['#6366f1'])
-                fig.update_traces(line=dict(width=3), marker=dict(size=8))
-                
-                # Add peak hour highlighting
-                peak_hour = hourly_data.loc[hourly_data['Value'].idxmax(), 'Hour']
-                fig.add_vrect(x0=peak_hour-0.5, x1=peak_hour+0.5, 
-                             fillcolor="rgba(16, 185, 129, 0.2)", 
-                             layer="below", line_width=0)
-                
-                fig = apply_chart_style(fig, height=380)
-                fig.update_layout(xaxis_title="Hour of Day", yaxis_title=time_metric)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = cached_figure(build_hourly_line, hourly_data, time_metric)
+                render_plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Heatmap style
-                fig2 = px.bar(hourly_data, x='Hour', y='Value',
-                             color='Value', color_continuous_scale=['#1a1a2e', '#6366f1', '#ec4899'])
-                fig2 = apply_chart_style(fig2, height=380, show_legend=False)
-                fig2.update_layout(coloraxis_showscale=False)
-                st.plotly_chart(fig2, use_container_width=True)
+                fig2 = cached_figure(build_value_bar, hourly_data, 'Hour', ['#1a1a2e', '#6366f1', '#ec4899'], 380)
+                render_plotly_chart(fig2, use_container_width=True)
             
             # Insights
             peak_hour = hourly_data.loc[hourly_data['Value'].idxmax(), 'Hour']
@@ -4179,6 +4415,7 @@ def render_time_analysis(sales_df):
         
         monthly_data.columns = ['Month', 'Value']
         monthly_data = monthly_data.sort_values('Month')
+        monthly_data['Month'] = month_labels(monthly_data['Month'])
         
         # Calculate moving average
         monthly_data['MA_3'] = monthly_data['Value'].rolling(window=3, min_periods=1).mean()
@@ -4186,20 +4423,9 @@ def render_time_analysis(sales_df):
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=monthly_data['Month'], y=monthly_data['Value'],
-                name=time_metric, marker_color='#6366f1',
-                opacity=0.7
-            ))
-            fig.add_trace(go.Scatter(
-                x=monthly_data['Month'], y=monthly_data['MA_3'],
-                name='3-Month MA', line=dict(color='#ec4899', width=3),
-                mode='lines'
-            ))
-            fig = apply_chart_style(fig, height=400)
-            fig.update_layout(xaxis_title="", yaxis_title=time_metric, barmode='overlay')
-            st.plotly_chart(fig, use_container_width=True)
+            trend_data = downsample(monthly_data, 'Month', 'Value', trend_point_budget(2 / 3))
+            fig = cached_figure(build_monthly_trend, trend_data, time_metric)
+            render_plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Month-over-month changes
@@ -4241,16 +4467,12 @@ def render_time_analysis(sales_df):
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.bar(quarterly_data, x='Quarter', y='Value',
-                            color='Quarter', color_discrete_sequence=get_chart_colors())
-                fig = apply_chart_style(fig, height=350, show_legend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = cached_figure(build_count_bar, quarterly_data, 'Quarter', 'Value')
+                render_plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig2 = px.pie(quarterly_data, values='Value', names='Quarter',
-                             color_discrete_sequence=get_chart_colors(), hole=0.5)
-                fig2 = apply_chart_style(fig2, height=350)
-                st.plotly_chart(fig2, use_container_width=True)
+                fig2 = cached_figure(build_share_donut, quarterly_data, 'Value', 'Quarter')
+                render_plotly_chart(fig2, use_container_width=True)
             
             best_quarter = quarterly_data.loc[quarterly_data['Value'].idxmax(), 'Quarter']
             render_insight_box("🏆", "Best Quarter", f"{best_quarter} shows highest {time_metric.lower()}. Plan major campaigns around this period.", "success")
@@ -4262,8 +4484,8 @@ def render_time_analysis(sales_df):
         render_chart_title("Seasonality Analysis", "🌡️")
         
         if 'month' in filtered_df.columns:
-            # Extract month number for seasonality
-            filtered_df['month_num'] = pd.to_datetime(filtered_df['transaction_date']).dt.month
+            # Month number for seasonality, from the yyyymm key
+            filtered_df['month_num'] = filtered_df['month'] % 100
             
             if time_metric == "Transactions":
                 seasonal_data = filtered_df.groupby('month_num')[metric_col].nunique().reset_index()
@@ -4272,7 +4494,7 @@ def render_time_analysis(sales_df):
             
             seasonal_data.columns = ['Month', 'Value']
             month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-            seasonal_data['Month_Name'] = seasonal_data['Month'].apply(lambda x: month_names[x-1] if x <= 12 else 'Unknown')
+            seasonal_data['Month_Name'] = seasonal_data['Month'].apply(lambda x: month_names[int(x) - 1] if x <= 12 else 'Unknown')
             
             # Calculate seasonal index
             avg_value = seasonal_data['Value'].mean()
@@ -4281,26 +4503,13 @@ def render_time_analysis(sales_df):
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.line(seasonal_data, x='Month_Name', y='Value', markers=True,
-                             color_discrete_sequence=['#6366f1'])
-                fig.update_traces(fill='tozeroy', fillcolor='rgba(99, 102, 241, 0.2)', line=dict(width=3))
-                fig.add_hline(y=avg_value, line_dash="dash", line_color="#71717a",
-                             annotation_text="Average")
-                fig = apply_chart_style(fig, height=380)
-                fig.update_layout(xaxis_title="", yaxis_title=time_metric)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = cached_figure(build_seasonal_line, seasonal_data, avg_value, time_metric)
+                render_plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Seasonal index chart
-                colors = ['#10b981' if x >= 100 else '#ef4444' for x in seasonal_data['Seasonal_Index']]
-                fig2 = px.bar(seasonal_data, x='Month_Name', y='Seasonal_Index',
-                             color_discrete_sequence=['#6366f1'])
-                fig2.update_traces(marker_color=colors)
-                fig2.add_hline(y=100, line_dash="dash", line_color="#71717a",
-                              annotation_text="Baseline (100)")
-                fig2 = apply_chart_style(fig2, height=380, show_legend=False)
-                fig2.update_layout(xaxis_title="", yaxis_title="Seasonal Index")
-                st.plotly_chart(fig2, use_container_width=True)
+                fig2 = cached_figure(build_seasonal_index_bar, seasonal_data)
+                render_plotly_chart(fig2, use_container_width=True)
             
             # Peak and low seasons
             peak_months = seasonal_data[seasonal_data['Seasonal_Index'] >= 110]['Month_Name'].tolist()
@@ -4313,390 +4522,148 @@ def render_time_analysis(sales_df):
 
 
 # =============================================================================
-# SIDEBAR CONFIGURATION
+# DATA CLEANING & QUALITY SECTION
 # =============================================================================
 
-def render_sidebar():
-    """Render sidebar with data upload and navigation."""
-    with st.sidebar:
-        # Logo/Brand
-        st.markdown('<div style="text-align: center; padding: 20px 0;"><span style="font-size: 2.5rem;">🚀</span><div style="font-size: 1.3rem; font-weight: 700; color: white; margin-top: 8px;">UAE Promo Pulse</div><div style="font-size: 0.8rem; color: #71717a;">Promotional Analytics Platform</div></div>', unsafe_allow_html=True)
-        
-        st.markdown("---")
-        
-        # Data source selection
-        st.markdown("### 📂 Data Source")
+@track_render
+def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None):
+    """Render comprehensive data cleaning and quality analysis."""
+    render_section_header("🧹", "Data Cleaning & Quality", "Analyze data quality, handle missing values, detect outliers, and clean your datasets")
+    
+    # =========================================================================
+    # DATA SOURCE SELECTOR
+    # =========================================================================
+    st.markdown("#### 🎛️ Select Dataset to Analyze")
+    
+    col1, col2, col3 = st.columns([2, 2, 2])
+    
+    with col1:
+        available_datasets = ["Sales Data", "Inventory Data", "Promotions Data"]
+        if products_df is not None:
+            available_datasets.append("Products Data")
         
-        data_source = st.radio(
-            "Select data source:",
-            ["📊 Sample Data (Demo)", "📁 Upload Your Files"],
-            label_visibility="collapsed",
-            key="sidebar_data_source_selector"
+        selected_dataset = st.selectbox(
+            "📊 Dataset",
+            available_datasets,
+            key="dc_dataset_selector"
+        )
+    
+    with col2:
+        cleaning_action = st.selectbox(
+            "🔧 Analysis Type",
+            ["Data Overview", "Missing Values", "Duplicates", "Outliers", "Data Types", "Value Distribution", "Auto Clean"],
+            key="dc_analysis_type"
         )
+    
+    with col3:
+        export_cleaned = st.checkbox("📥 Enable Export", key="dc_export_checkbox")
+    
+    st.markdown("")
+    
+    # Select the appropriate dataframe
+    if selected_dataset == "Sales Data":
+        df = sales_df.copy()
+        df_name = "sales"
+    elif selected_dataset == "Inventory Data":
+        df = inventory_df.copy()
+        df_name = "inventory"
+    elif selected_dataset == "Promotions Data":
+        df = promotions_df.copy()
+        df_name = "promotions"
+    elif products_df is not None:
+        df = products_df.copy()
+        df_name = "products"
+    else:
+        df = sales_df.copy()
+        df_name = "sales"
+    
+    if df.empty:
+        render_empty_state("📊", "No Data Available", "The selected dataset is empty.")
+        return
+    
+    # =========================================================================
+    # DATA QUALITY SCORE
+    # =========================================================================
+    
+    # Calculate quality metrics
+    quality = data_quality_metrics(df)
+    missing_cells = quality['missing_cells']
+    duplicate_rows = quality['duplicate_rows']
+    completeness = quality['completeness']
+    quality_score = quality['quality_score']
+    
+    # Quality KPIs
+    quality_kpis = [
+        {"icon": "📊", "value": f"{len(df):,}", "label": "Total Rows", "type": "primary"},
+        {"icon": "📋", "value": f"{len(df.columns)}", "label": "Columns", "type": "accent"},
+        {"icon": "❓", "value": f"{missing_cells:,}", "label": "Missing Values", "type": "warning" if missing_cells > 0 else "success"},
+        {"icon": "👥", "value": f"{duplicate_rows:,}", "label": "Duplicates", "type": "danger" if duplicate_rows > 0 else "success"},
+        {"icon": "✅", "value": f"{completeness:.1f}%", "label": "Completeness", "type": "success" if completeness > 95 else "warning"},
+        {"icon": "⭐", "value": f"{quality_score:.0f}/100", "label": "Quality Score", "type": "success" if quality_score > 80 else "warning"},
+    ]
+    render_kpi_row(quality_kpis)
+    
+    render_divider_subtle()
+    
+    # Store for cleaning operations
+    cleaned_df = df.copy()
+    cleaning_log = []
+    
+    # =========================================================================
+    # DATA OVERVIEW
+    # =========================================================================
+    if cleaning_action == "Data Overview":
+        render_chart_title("📋 Dataset Overview", "📊")
         
-        st.markdown("---")
+        col1, col2 = st.columns(2)
         
-        if data_source == "📁 Upload Your Files":
-            st.markdown("### 📤 Upload Data Files")
-            st.caption("Upload CSV files with the required columns")
+        with col1:
+            st.markdown("##### Column Information")
             
-            # 4 FILE UPLOADERS
-            sales_file = st.file_uploader(
-                "📈 Sales Data",
-                type=['csv'],
-                key='sidebar_sales_upload',
-                help="Required: transaction_id, sku_id, store_id, quantity_sold, unit_price, transaction_date"
-            )
+            col_info = pd.DataFrame({
+                'Column': df.columns,
+                'Type': df.dtypes.astype(str),
+                'Non-Null': df.count().values,
+                'Null': df.isnull().sum().values,
+                'Unique': df.nunique().values
+            })
+            col_info['Null %'] = (col_info['Null'] / len(df) * 100).round(2)
             
-            inventory_file = st.file_uploader(
-                "📦 Inventory Data",
-                type=['csv'],
-                key='sidebar_inventory_upload',
-                help="Required: record_id, sku_id, store_id, stock_level, reorder_point, reorder_quantity"
-            )
+            render_dataframe(col_info, use_container_width=True, hide_index=True, height=400)
+        
+        with col2:
+            st.markdown("##### Data Sample (First 10 Rows)")
+            render_dataframe(df.head(10), use_container_width=True, height=400)
+        
+        # Column type distribution
+        st.markdown("")
+        render_chart_title("Data Type Distribution", "📊")
+        
+        type_counts = df.dtypes.astype(str).value_counts().reset_index()
+        type_counts.columns = ['Data Type', 'Count']
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = px.pie(type_counts, values='Count', names='Data Type',
+                        color_discrete_sequence=get_chart_colors(), hole=0.5)
+            fig = apply_chart_style(fig, height=300)
+            render_plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            # Memory usage
+            memory_usage = df.memory_usage(deep=True)
+            total_memory = memory_usage.sum()
             
-            promotions_file = st.file_uploader(
-                "🎯 Promotions Data",
-                type=['csv'],
-                key='sidebar_promotions_upload',
-                help="Required: promotion_id, sku_id, store_id, promotion_type, discount_percentage, start_date, end_date"
-            )
+            st.markdown("##### Memory Usage")
+            st.markdown(f'<div style="background: rgba(99, 102, 241, 0.1); border: 1px solid rgba(99, 102, 241, 0.3); border-radius: 12px; padding: 16px; text-align: center;"><div style="color: #a1a1aa; font-size: 0.85rem;">Total Memory</div><div style="color: #6366f1; font-size: 1.5rem; font-weight: 700;">{total_memory / 1024 / 1024:.2f} MB</div></div>', unsafe_allow_html=True)
             
-            products_file = st.file_uploader(
-                "🏷️ Products/SKU Data",
-                type=['csv'],
-                key='sidebar_products_upload',
-                help="Required: sku_id, product_name, category, brand, unit_cost"
-            )
-            
-            # Check minimum required files (3 core + 1 optional)
-            if sales_file and inventory_file and promotions_file:
-                with st.spinner("Loading and validating data..."):
-                    sales_df, inventory_df, promotions_df, products_df, error = load_and_process_data(
-                        sales_file, inventory_file, promotions_file, products_file
-                    )
-                
-                if error:
-                    st.error(f"❌ Error: {error}")
-                    # Footer
-                    st.markdown("---")
-                    st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
-                    return None, None, None, None
-                
-                st.success("✅ All files loaded successfully!")
-                
-                # Data summary
-                with st.expander("📊 Data Summary", expanded=False):
-                    st.markdown(f"**Sales:** {len(sales_df):,} records")
-                    st.markdown(f"**Inventory:** {len(inventory_df):,} records")
-                    st.markdown(f"**Promotions:** {len(promotions_df):,} records")
-                    if products_df is not None:
-                        st.markdown(f"**Products:** {len(products_df):,} records")
-                
-                # Footer
-                st.markdown("---")
-                st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
-                
-                return sales_df, inventory_df, promotions_df, products_df
-            
-            else:
-                st.info("📌 Please upload at least Sales, Inventory, and Promotions files")
-                
-                with st.expander("📋 Expected Data Schema"):
-                    st.markdown("**Sales Data (Required):**")
-                    st.code("transaction_id, sku_id, store_id, quantity_sold, unit_price, transaction_date")
-                    
-                    st.markdown("**Inventory Data (Required):**")
-                    st.code("record_id, sku_id, store_id, stock_level, reorder_point, reorder_quantity, last_updated")
-                    
-                    st.markdown("**Promotions Data (Required):**")
-                    st.code("promotion_id, sku_id, store_id, promotion_type, discount_percentage, start_date, end_date")
-                    
-                    st.markdown("**Products Data (Optional):**")
-                    st.code("sku_id, product_name, category, brand, unit_cost, supplier_id")
-                
-                # Footer
-                st.markdown("---")
-                st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
-                
-                return None, None, None, None
-        
-        else:
-            # Use sample data
-            st.markdown("### ℹ️ Sample Data")
-            st.caption("Using demonstration dataset with synthetic UAE retail data")
-            
-            with st.spinner("Generating sample data..."):
-                sales_df, inventory_df, promotions_df = generate_sample_data()
-                products_df = None  # Sample data generates products info within sales_df
-            
-            # Data summary
-            with st.expander("📊 Sample Data Info", expanded=False):
-                st.markdown(f"**Sales:** {len(sales_df):,} transactions")
-                st.markdown(f"**Inventory:** {len(inventory_df):,} records")
-                st.markdown(f"**Promotions:** {len(promotions_df):,} campaigns")
-                st.markdown(f"**SKUs:** {sales_df['sku_id'].nunique():,}")
-                st.markdown(f"**Stores:** {sales_df['store_id'].nunique():,}")
-                st.markdown(f"**Categories:** {sales_df['category'].nunique()}")
-                st.markdown(f"**Regions:** {sales_df['region'].nunique()}")
-            
-            # Footer
-            st.markdown("---")
-            st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
-            
-            return sales_df, inventory_df, promotions_df, products_df
-# =============================================================================
-# MAIN APPLICATION
-# =============================================================================
-
-def main():
-    """Main application entry point."""
-    
-    # Initialize session state
-    if 'simulation_run' not in st.session_state:
-        st.session_state['simulation_run'] = False
-    
-    # Load premium CSS
-    load_premium_css()
-    
-    # Render sidebar and get data (now returns 4 values)
-    data = render_sidebar()
-    
-    # Check if data is available
-    if data is None or data[0] is None:
-        # Show welcome screen
-        render_hero_header()
-        
-        st.markdown("")
-        
-        render_insight_box(
-            "👋",
-            "Welcome to UAE Promo Pulse Simulator",
-            "This premium analytics dashboard helps you analyze sales performance, monitor inventory health, evaluate promotional effectiveness, and simulate what-if scenarios. Select 'Sample Data' in the sidebar to explore with demo data, or upload your own CSV files.",
-            "primary"
-        )
-        
-        # Feature highlights
-        st.markdown("")
-        st.markdown("### ✨ Key Features")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            render_insight_box("📈", "Sales Analytics", "Deep dive into revenue trends, category performance, and regional insights.", "success")
-        
-        with col2:
-            render_insight_box("📦", "Inventory Health", "Monitor stock levels, identify stockout risks, and optimize replenishment.", "warning")
-        
-        with col3:
-            render_insight_box("🧹", "Data Cleaning", "Clean, validate, and transform your data with automated tools.", "accent")
-        
-        with col4:
-            render_insight_box("🧪", "What-If Simulator", "Simulate promotions and predict outcomes with AI recommendations.", "primary")
-        
-        render_footer()
-        return
-    
-    # Unpack data (4 values now)
-    sales_df, inventory_df, promotions_df, products_df = data
-    
-    # Render main dashboard
-    render_hero_header()
-    
-    # Overview KPIs
-    render_overview_kpis(sales_df, inventory_df, promotions_df)
-    
-    render_divider()
-    
-    # Main navigation tabs - NOW INCLUDES DATA CLEANING
-    tabs = st.tabs([
-        "🧹 Data Cleaning",
-        "📈 Sales Analytics",
-        "📦 Inventory Health",
-        "🎯 Promotions",
-        "🧪 What-If Simulator",
-        "🏪 Store Performance",
-        "⏰ Time Analysis"
-    ])
-    
-    with tabs[0]:
-        render_data_cleaning(sales_df, inventory_df, promotions_df, products_df)
-    
-    with tabs[1]:
-        render_sales_analysis(sales_df)
-    
-    with tabs[2]:
-        render_inventory_analysis(inventory_df, sales_df)
-    
-    with tabs[3]:
-        render_promotions_analysis(promotions_df, sales_df)
-    
-    with tabs[4]:
-        render_promo_simulator(sales_df, inventory_df, promotions_df)
-    
-    with tabs[5]:
-        render_store_performance(sales_df, inventory_df)
-    
-    with tabs[6]:
-        render_time_analysis(sales_df)
-    
-    # Footer
-    render_footer()
-
-
-# =============================================================================
-# APPLICATION ENTRY POINT
-# =============================================================================
-
-if __name__ == "__main__":
-    main()
-
-# =============================================================================
-# DATA CLEANING & QUALITY SECTION
-# =============================================================================
-
-def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None):
-    """Render comprehensive data cleaning and quality analysis."""
-    render_section_header("🧹", "Data Cleaning & Quality", "Analyze data quality, handle missing values, detect outliers, and clean your datasets")
-    
-    # =========================================================================
-    # DATA SOURCE SELECTOR
-    # =========================================================================
-    st.markdown("#### 🎛️ Select Dataset to Analyze")
-    
-    col1, col2, col3 = st.columns([2, 2, 2])
-    
-    with col1:
-        available_datasets = ["Sales Data", "Inventory Data", "Promotions Data"]
-        if products_df is not None:
-            available_datasets.append("Products Data")
-        
-        selected_dataset = st.selectbox(
-            "📊 Dataset",
-            available_datasets,
-            key="dc_dataset_selector"
-        )
-    
-    with col2:
-        cleaning_action = st.selectbox(
-            "🔧 Analysis Type",
-            ["Data Overview", "Missing Values", "Duplicates", "Outliers", "Data Types", "Value Distribution", "Auto Clean"],
-            key="dc_analysis_type"
-        )
-    
-    with col3:
-        export_cleaned = st.checkbox("📥 Enable Export", key="dc_export_checkbox")
-    
-    st.markdown("")
-    
-    # Select the appropriate dataframe
-    if selected_dataset == "Sales Data":
-        df = sales_df.copy()
-        df_name = "sales"
-    elif selected_dataset == "Inventory Data":
-        df = inventory_df.copy()
-        df_name = "inventory"
-    elif selected_dataset == "Promotions Data":
-        df = promotions_df.copy()
-        df_name = "promotions"
-    elif products_df is not None:
-        df = products_df.copy()
-        df_name = "products"
-    else:
-        df = sales_df.copy()
-        df_name = "sales"
-    
-    if df.empty:
-        render_empty_state("📊", "No Data Available", "The selected dataset is empty.")
-        return
-    
-    # =========================================================================
-    # DATA QUALITY SCORE
-    # =========================================================================
-    
-    # Calculate quality metrics
-    total_cells = df.shape[0] * df.shape[1]
-    missing_cells = df.isnull().sum().sum()
-    duplicate_rows = df.duplicated().sum()
-    completeness = ((total_cells - missing_cells) / total_cells * 100) if total_cells > 0 else 0
-    uniqueness = ((len(df) - duplicate_rows) / len(df) * 100) if len(df) > 0 else 0
-    
-    # Overall quality score
-    quality_score = (completeness * 0.5 + uniqueness * 0.3 + 20)
-    quality_score = min(100, quality_score)
-    
-    # Quality KPIs
-    quality_kpis = [
-        {"icon": "📊", "value": f"{len(df):,}", "label": "Total Rows", "type": "primary"},
-        {"icon": "📋", "value": f"{len(df.columns)}", "label": "Columns", "type": "accent"},
-        {"icon": "❓", "value": f"{missing_cells:,}", "label": "Missing Values", "type": "warning" if missing_cells > 0 else "success"},
-        {"icon": "👥", "value": f"{duplicate_rows:,}", "label": "Duplicates", "type": "danger" if duplicate_rows > 0 else "success"},
-        {"icon": "✅", "value": f"{completeness:.1f}%", "label": "Completeness", "type": "success" if completeness > 95 else "warning"},
-        {"icon": "⭐", "value": f"{quality_score:.0f}/100", "label": "Quality Score", "type": "success" if quality_score > 80 else "warning"},
-    ]
-    render_kpi_row(quality_kpis)
-    
-    render_divider_subtle()
-    
-    # Store for cleaning operations
-    cleaned_df = df.copy()
-    cleaning_log = []
-    
-    # =========================================================================
-    # DATA OVERVIEW
-    # =========================================================================
-    if cleaning_action == "Data Overview":
-        render_chart_title("📋 Dataset Overview", "📊")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("##### Column Information")
-            
-            col_info = pd.DataFrame({
-                'Column': df.columns,
-                'Type': df.dtypes.astype(str),
-                'Non-Null': df.count().values,
-                'Null': df.isnull().sum().values,
-                'Unique': df.nunique().values
-            })
-            col_info['Null %'] = (col_info['Null'] / len(df) * 100).round(2)
-            
-            st.dataframe(col_info, use_container_width=True, hide_index=True, height=400)
-        
-        with col2:
-            st.markdown("##### Data Sample (First 10 Rows)")
-            st.dataframe(df.head(10), use_container_width=True, height=400)
-        
-        # Column type distribution
-        st.markdown("")
-        render_chart_title("Data Type Distribution", "📊")
-        
-        type_counts = df.dtypes.astype(str).value_counts().reset_index()
-        type_counts.columns = ['Data Type', 'Count']
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig = px.pie(type_counts, values='Count', names='Data Type',
-                        color_discrete_sequence=get_chart_colors(), hole=0.5)
-            fig = apply_chart_style(fig, height=300)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Memory usage
-            memory_usage = df.memory_usage(deep=True)
-            total_memory = memory_usage.sum()
-            
-            st.markdown("##### Memory Usage")
-            st.markdown(f'<div style="background: rgba(99, 102, 241, 0.1); border: 1px solid rgba(99, 102, 241, 0.3); border-radius: 12px; padding: 16px; text-align: center;"><div style="color: #a1a1aa; font-size: 0.85rem;">Total Memory</div><div style="color: #6366f1; font-size: 1.5rem; font-weight: 700;">{total_memory / 1024 / 1024:.2f} MB</div></div>', unsafe_allow_html=True)
-            
-            st.markdown("")
-            st.markdown("##### Quick Stats for Numeric Columns")
+            st.markdown("")
+            st.markdown("##### Quick Stats for Numeric Columns")
             
             numeric_cols = df.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) > 0:
-                st.dataframe(df[numeric_cols].describe().round(2), use_container_width=True)
+                render_dataframe(df[numeric_cols].describe().round(2), use_container_width=True)
             else:
                 st.info("No numeric columns in this dataset.")
     
@@ -4707,13 +4674,7 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         render_chart_title("❓ Missing Values Analysis", "🔍")
         
         # Missing values summary
-        missing_df = pd.DataFrame({
-            'Column': df.columns,
-            'Missing': df.isnull().sum().values,
-            'Present': df.count().values,
-            'Missing %': (df.isnull().sum().values / len(df) * 100).round(2)
-        })
-        missing_df = missing_df.sort_values('Missing', ascending=False)
+        missing_df = missing_value_summary(df)
         
         col1, col2 = st.columns(2)
         
@@ -4727,7 +4688,7 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
                             color_continuous_scale=['#10b981', '#f59e0b', '#ef4444'])
                 fig = apply_chart_style(fig, height=350, show_legend=False)
                 fig.update_layout(xaxis_title="", yaxis_title="Missing Count", coloraxis_showscale=False)
-                st.plotly_chart(fig, use_container_width=True)
+                render_plotly_chart(fig, use_container_width=True)
             else:
                 render_insight_box("✅", "No Missing Values", "All columns have complete data!", "success")
         
@@ -4745,14 +4706,14 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
                                aspect='auto')
                 fig2 = apply_chart_style(fig2, height=350)
                 fig2.update_layout(coloraxis_showscale=False)
-                st.plotly_chart(fig2, use_container_width=True)
+                render_plotly_chart(fig2, use_container_width=True)
             else:
                 st.markdown("")
                 render_insight_box("📊", "Missing Pattern", "No missing values to display in heatmap.", "primary")
         
         # Missing values table
         st.markdown("##### Missing Values by Column")
-        st.dataframe(missing_df, use_container_width=True, hide_index=True)
+        render_dataframe(missing_df, use_container_width=True, hide_index=True)
         
         render_divider_subtle()
         
@@ -4784,44 +4745,11 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
                     custom_value = st.text_input("Custom Value", key="dc_custom_fill_value")
             
             if st.button("🔄 Apply Fix", key="dc_apply_missing_fix"):
-                original_missing = cleaned_df[target_col].isnull().sum()
-                
-                if fill_method == "Drop Rows":
-                    cleaned_df = cleaned_df.dropna(subset=[target_col])
-                    cleaning_log.append(f"Dropped {original_missing} rows with missing {target_col}")
-                elif fill_method == "Fill with Mean":
-                    if pd.api.types.is_numeric_dtype(cleaned_df[target_col]):
-                        fill_val = cleaned_df[target_col].mean()
-                        cleaned_df[target_col] = cleaned_df[target_col].fillna(fill_val)
-                        cleaning_log.append(f"Filled {target_col} with mean: {fill_val:.2f}")
-                    else:
-                        st.error("Mean can only be calculated for numeric columns")
-                elif fill_method == "Fill with Median":
-                    if pd.api.types.is_numeric_dtype(cleaned_df[target_col]):
-                        fill_val = cleaned_df[target_col].median()
-                        cleaned_df[target_col] = cleaned_df[target_col].fillna(fill_val)
-                        cleaning_log.append(f"Filled {target_col} with median: {fill_val:.2f}")
-                    else:
-                        st.error("Median can only be calculated for numeric columns")
-                elif fill_method == "Fill with Mode":
-                    mode_series = cleaned_df[target_col].mode()
-                    if len(mode_series) > 0:
-                        fill_val = mode_series.iloc[0]
-                        cleaned_df[target_col] = cleaned_df[target_col].fillna(fill_val)
-                        cleaning_log.append(f"Filled {target_col} with mode: {fill_val}")
-                elif fill_method == "Fill with Zero":
-                    cleaned_df[target_col] = cleaned_df[target_col].fillna(0)
-                    cleaning_log.append(f"Filled {target_col} with 0")
-                elif fill_method == "Fill with Custom" and custom_value:
-                    cleaned_df[target_col] = cleaned_df[target_col].fillna(custom_value)
-                    cleaning_log.append(f"Filled {target_col} with: {custom_value}")
-                elif fill_method == "Forward Fill":
-                    cleaned_df[target_col] = cleaned_df[target_col].ffill()
-                    cleaning_log.append(f"Forward filled {target_col}")
-                elif fill_method == "Backward Fill":
-                    cleaned_df[target_col] = cleaned_df[target_col].bfill()
-                    cleaning_log.append(f"Backward filled {target_col}")
-                
+                cleaned_df, message, error = fill_missing(cleaned_df, target_col, fill_method, custom_value)
+                if error:
+                    st.error(error)
+                if message:
+                    cleaning_log.append(message)
                 if cleaning_log:
                     st.success(f"✅ {cleaning_log[-1]}")
         else:
@@ -4874,7 +4802,7 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         
         if duplicate_count > 0:
             st.markdown("##### Sample Duplicate Rows")
-            st.dataframe(duplicate_rows.head(20), use_container_width=True, height=300)
+            render_dataframe(duplicate_rows.head(20), use_container_width=True, height=300)
             
             render_divider_subtle()
             
@@ -4940,12 +4868,14 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         
         with col3:
             if outlier_method == "IQR (Interquartile Range)":
-                iqr_multiplier = st.slider("IQR Multiplier", 1.0, 3.0, 1.5, 0.1, key="dc_iqr_mult")
+                bound_params = {'iqr_multiplier': st.slider("IQR Multiplier", 1.0, 3.0, 1.5, 0.1, key="dc_iqr_mult")}
             elif outlier_method == "Z-Score":
-                z_threshold = st.slider("Z-Score Threshold", 1.0, 4.0, 3.0, 0.1, key="dc_z_thresh")
+                bound_params = {'z_threshold': st.slider("Z-Score Threshold", 1.0, 4.0, 3.0, 0.1, key="dc_z_thresh")}
             else:
-                lower_pct = st.slider("Lower Percentile", 0, 10, 1, key="dc_lower_pct")
-                upper_pct = st.slider("Upper Percentile", 90, 100, 99, key="dc_upper_pct")
+                bound_params = {
+                    'lower_pct': st.slider("Lower Percentile", 0, 10, 1, key="dc_lower_pct"),
+                    'upper_pct': st.slider("Upper Percentile", 90, 100, 99, key="dc_upper_pct")
+                }
         
         # Calculate outliers
         col_data = df[outlier_col].dropna()
@@ -4954,24 +4884,7 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
             st.warning("No valid data in selected column.")
             return
         
-        if outlier_method == "IQR (Interquartile Range)":
-            Q1 = col_data.quantile(0.25)
-            Q3 = col_data.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - iqr_multiplier * IQR
-            upper_bound = Q3 + iqr_multiplier * IQR
-        elif outlier_method == "Z-Score":
-            mean = col_data.mean()
-            std = col_data.std()
-            if std == 0:
-                lower_bound = mean
-                upper_bound = mean
-            else:
-                lower_bound = mean - z_threshold * std
-                upper_bound = mean + z_threshold * std
-        else:
-            lower_bound = col_data.quantile(lower_pct / 100)
-            upper_bound = col_data.quantile(upper_pct / 100)
+        lower_bound, upper_bound = outlier_bounds(col_data, outlier_method, **bound_params)
         
         outliers = df[(df[outlier_col] < lower_bound) | (df[outlier_col] > upper_bound)]
         outlier_count = len(outliers)
@@ -4981,21 +4894,21 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         
         with col1:
             # Box plot
-            fig = px.box(df, y=outlier_col, color_discrete_sequence=['#6366f1'])
+            fig = distribution_box(df, outlier_col)
             fig.add_hline(y=lower_bound, line_dash="dash", line_color="#ef4444",
                          annotation_text=f"Lower: {lower_bound:.2f}")
             fig.add_hline(y=upper_bound, line_dash="dash", line_color="#ef4444",
                          annotation_text=f"Upper: {upper_bound:.2f}")
             fig = apply_chart_style(fig, height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            render_plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Histogram with outlier bounds
-            fig2 = px.histogram(df, x=outlier_col, nbins=50, color_discrete_sequence=['#6366f1'])
+            fig2 = distribution_histogram(df, outlier_col, nbins=50)
             fig2.add_vline(x=lower_bound, line_dash="dash", line_color="#ef4444")
             fig2.add_vline(x=upper_bound, line_dash="dash", line_color="#ef4444")
             fig2 = apply_chart_style(fig2, height=350)
-            st.plotly_chart(fig2, use_container_width=True)
+            render_plotly_chart(fig2, use_container_width=True)
         
         # Outlier stats
         col1, col2, col3, col4 = st.columns(4)
@@ -5013,7 +4926,7 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         if outlier_count > 0:
             st.markdown("")
             st.markdown("##### Outlier Rows Sample")
-            st.dataframe(outliers.head(20), use_container_width=True, height=250)
+            render_dataframe(outliers.head(20), use_container_width=True, height=250)
             
             render_divider_subtle()
             
@@ -5027,24 +4940,8 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
             )
             
             if st.button("🔄 Apply Outlier Fix", key="dc_apply_outlier_fix"):
-                if outlier_action == "Remove Outliers":
-                    original_len = len(cleaned_df)
-                    cleaned_df = cleaned_df[(cleaned_df[outlier_col] >= lower_bound) & (cleaned_df[outlier_col] <= upper_bound)]
-                    removed = original_len - len(cleaned_df)
-                    cleaning_log.append(f"Removed {removed} outlier rows from {outlier_col}")
-                elif outlier_action == "Cap/Clip Values":
-                    cleaned_df[outlier_col] = cleaned_df[outlier_col].clip(lower_bound, upper_bound)
-                    cleaning_log.append(f"Capped {outlier_col} to [{lower_bound:.2f}, {upper_bound:.2f}]")
-                elif outlier_action == "Replace with Mean":
-                    mean_val = cleaned_df[outlier_col].mean()
-                    mask = (cleaned_df[outlier_col] < lower_bound) | (cleaned_df[outlier_col] > upper_bound)
-                    cleaned_df.loc[mask, outlier_col] = mean_val
-                    cleaning_log.append(f"Replaced outliers in {outlier_col} with mean: {mean_val:.2f}")
-                elif outlier_action == "Replace with Median":
-                    median_val = cleaned_df[outlier_col].median()
-                    mask = (cleaned_df[outlier_col] < lower_bound) | (cleaned_df[outlier_col] > upper_bound)
-                    cleaned_df.loc[mask, outlier_col] = median_val
-                    cleaning_log.append(f"Replaced outliers in {outlier_col} with median: {median_val:.2f}")
+                cleaned_df, message = treat_outliers(cleaned_df, outlier_col, lower_bound, upper_bound, outlier_action)
+                cleaning_log.append(message)
                 
                 st.success(f"✅ {cleaning_log[-1]}")
         else:
@@ -5065,7 +4962,7 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         })
         
         st.markdown("##### Current Data Types")
-        st.dataframe(type_info, use_container_width=True, hide_index=True)
+        render_dataframe(type_info, use_container_width=True, hide_index=True)
         
         render_divider_subtle()
         
@@ -5095,27 +4992,8 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         
         if st.button("🔄 Convert Type", key="dc_convert_type"):
             try:
-                if target_type == "string":
-                    cleaned_df[convert_col] = cleaned_df[convert_col].astype(str)
-                    cleaning_log.append(f"Converted {convert_col} to string")
-                elif target_type == "integer":
-                    cleaned_df[convert_col] = pd.to_numeric(cleaned_df[convert_col], errors='coerce').astype('Int64')
-                    cleaning_log.append(f"Converted {convert_col} to integer")
-                elif target_type == "float":
-                    cleaned_df[convert_col] = pd.to_numeric(cleaned_df[convert_col], errors='coerce')
-                    cleaning_log.append(f"Converted {convert_col} to float")
-                elif target_type == "datetime":
-                    if date_format:
-                        cleaned_df[convert_col] = pd.to_datetime(cleaned_df[convert_col], format=date_format, errors='coerce')
-                    else:
-                        cleaned_df[convert_col] = pd.to_datetime(cleaned_df[convert_col], errors='coerce')
-                    cleaning_log.append(f"Converted {convert_col} to datetime")
-                elif target_type == "category":
-                    cleaned_df[convert_col] = cleaned_df[convert_col].astype('category')
-                    cleaning_log.append(f"Converted {convert_col} to category")
-                elif target_type == "boolean":
-                    cleaned_df[convert_col] = cleaned_df[convert_col].astype(bool)
-                    cleaning_log.append(f"Converted {convert_col} to boolean")
+                cleaned_df, message = convert_column_type(cleaned_df, convert_col, target_type, date_format)
+                cleaning_log.append(message)
                 
                 st.success(f"✅ {cleaning_log[-1]}")
             except Exception as e:
@@ -5153,21 +5031,19 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         
         with col1:
             if pd.api.types.is_numeric_dtype(col_data):
-                if chart_type == "Histogram":
-                    fig = px.histogram(df, x=dist_col, nbins=30, color_discrete_sequence=['#6366f1'])
-                elif chart_type == "Box Plot":
-                    fig = px.box(df, y=dist_col, color_discrete_sequence=['#6366f1'])
+                if chart_type == "Box Plot":
+                    fig = distribution_box(df, dist_col)
                 elif chart_type == "Violin Plot":
-                    fig = px.violin(df, y=dist_col, color_discrete_sequence=['#6366f1'], box=True)
+                    fig = distribution_violin(df, dist_col)
                 else:
-                    fig = px.histogram(df, x=dist_col, nbins=30, color_discrete_sequence=['#6366f1'])
+                    fig = distribution_histogram(df, dist_col, nbins=30)
             else:
                 value_counts = col_data.value_counts().head(20).reset_index()
                 value_counts.columns = [dist_col, 'Count']
                 fig = px.bar(value_counts, x=dist_col, y='Count', color_discrete_sequence=['#6366f1'])
             
             fig = apply_chart_style(fig, height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            render_plotly_chart(fig, use_container_width=True)
         
         with col2:
             # Statistics
@@ -5179,12 +5055,12 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
                     'Statistic': stats.index,
                     'Value': stats.values.round(4)
                 })
-                st.dataframe(stats_df, use_container_width=True, hide_index=True)
+                render_dataframe(stats_df, use_container_width=True, hide_index=True)
             else:
                 value_counts = col_data.value_counts().head(15).reset_index()
                 value_counts.columns = ['Value', 'Count']
                 value_counts['Percentage'] = (value_counts['Count'] / len(col_data) * 100).round(2)
-                st.dataframe(value_counts, use_container_width=True, hide_index=True)
+                render_dataframe(value_counts, use_container_width=True, hide_index=True)
     
     # =========================================================================
     # AUTO CLEAN
@@ -5210,119 +5086,549 @@ def render_data_cleaning(sales_df, inventory_df, promotions_df, products_df=None
         
         if st.button("🚀 Run Auto Clean", type="primary", key="dc_run_auto_clean"):
             with st.spinner("Cleaning data..."):
-                operations = []
+                cleaned_df, operations = auto_clean(
+                    cleaned_df,
+                    remove_duplicates=auto_remove_dups,
+                    fill_numeric=auto_fill_numeric,
+                    fill_categorical=auto_fill_categorical,
+                    trim_strings=auto_trim_strings,
+                    lowercase_columns=auto_lowercase_cols,
+                    drop_sparse_columns=auto_remove_empty_cols
+                )
+                cleaning_log.extend(operations)
+            
+            # Show results
+            st.success("✅ Auto cleaning complete!")
+            
+            if operations:
+                st.markdown("##### Operations Performed")
+                for op in operations:
+                    st.markdown(f"• {op}")
+            
+            # Before/After comparison
+            st.markdown("")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("##### 📊 Before Cleaning")
+                st.metric("Rows", f"{len(df):,}")
+                st.metric("Columns", f"{len(df.columns)}")
+                st.metric("Missing Values", f"{df.isnull().sum().sum():,}")
+            
+            with col2:
+                st.markdown("##### ✨ After Cleaning")
+                rows_diff = len(cleaned_df) - len(df)
+                cols_diff = len(cleaned_df.columns) - len(df.columns)
+                missing_diff = cleaned_df.isnull().sum().sum() - df.isnull().sum().sum()
+                
+                st.metric("Rows", f"{len(cleaned_df):,}", delta=f"{rows_diff:,}" if rows_diff != 0 else None)
+                st.metric("Columns", f"{len(cleaned_df.columns)}", delta=f"{cols_diff}" if cols_diff != 0 else None)
+                st.metric("Missing Values", f"{cleaned_df.isnull().sum().sum():,}", delta=f"{missing_diff:,}" if missing_diff != 0 else None)
+    
+    # =========================================================================
+    # CLEANING LOG & EXPORT
+    # =========================================================================
+    render_divider_subtle()
+    
+    if cleaning_log:
+        st.markdown("### 📋 Cleaning Log")
+        for i, log in enumerate(cleaning_log, 1):
+            st.markdown(f"{i}. {log}")
+    
+    # Export option
+    if export_cleaned:
+        st.markdown("### 📥 Export Data")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            csv = cleaned_df.to_csv(index=False)
+            st.download_button(
+                label=f"📥 Download {df_name.title()} Data as CSV",
+                data=csv,
+                file_name=f"{df_name}_data_export.csv",
+                mime="text/csv",
+                key="dc_download_csv"
+            )
+        
+        with col2:
+            st.info(f"Dataset: {len(cleaned_df):,} rows × {len(cleaned_df.columns)} columns")
+    
+    # Return cleaned data
+    return cleaned_df, cleaning_log, None, None
+
+
+# =============================================================================
+# SIDEBAR CONFIGURATION
+# =============================================================================
+
+@track_render
+def render_sidebar():
+    """Render sidebar with data upload and navigation."""
+    with st.sidebar:
+        # Logo/Brand
+        st.markdown('<div style="text-align: center; padding: 20px 0;"><span style="font-size: 2.5rem;">🚀</span><div style="font-size: 1.3rem; font-weight: 700; color: white; margin-top: 8px;">UAE Promo Pulse</div><div style="font-size: 0.8rem; color: #71717a;">Promotional Analytics Platform</div></div>', unsafe_allow_html=True)
+        
+        st.markdown("---")
+        
+        # Data source selection
+        st.markdown("### 📂 Data Source")
+        
+        data_source = st.radio(
+            "Select data source:",
+            ["📊 Sample Data (Demo)", "📁 Upload Your Files"],
+            label_visibility="collapsed",
+            key="sidebar_data_source_selector"
+        )
+        
+        st.markdown("---")
+        
+        if data_source == "📁 Upload Your Files":
+            st.markdown("### 📤 Upload Data Files")
+            st.caption("Upload CSV files with the required columns")
+            
+            # 4 FILE UPLOADERS
+            sales_file = st.file_uploader(
+                "📈 Sales Data",
+                type=['csv'],
+                key='sidebar_sales_upload',
+                help="Required: transaction_id, sku_id, store_id, quantity_sold, unit_price, transaction_date"
+            )
+            
+            inventory_file = st.file_uploader(
+                "📦 Inventory Data",
+                type=['csv'],
+                key='sidebar_inventory_upload',
+                help="Required: record_id, sku_id, store_id, stock_level, reorder_point, reorder_quantity"
+            )
+            
+            promotions_file = st.file_uploader(
+                "🎯 Promotions Data",
+                type=['csv'],
+                key='sidebar_promotions_upload',
+                help="Required: promotion_id, sku_id, store_id, promotion_type, discount_percentage, start_date, end_date"
+            )
+            
+            products_file = st.file_uploader(
+                "🏷️ Products/SKU Data",
+                type=['csv'],
+                key='sidebar_products_upload',
+                help="Required: sku_id, product_name, category, brand, unit_cost"
+            )
+            
+            stores_file = st.file_uploader(
+                "🏬 Stores Data",
+                type=['csv'],
+                key='sidebar_stores_upload',
+                help="Required: store_id, region (or city), store_type (or channel)"
+            )
+            
+            # Check minimum required files (3 core + 2 optional)
+            if sales_file and inventory_file and promotions_file:
+                cache_key = upload_cache_key((sales_file, inventory_file, promotions_file, products_file, stores_file))
+                ingested, error = None, None
+                if not dataset_cache_exists(cache_key):
+                    progress_bar = st.progress(0.0, text="📥 Loading and validating data...")
+                    ingested, error = ingest_uploaded_data(
+                        cache_key, sales_file, inventory_file, promotions_file, products_file, stores_file,
+                        progress_callback=lambda fraction, rows: progress_bar.progress(
+                            fraction, text=f"📥 Ingested {rows:,} sales rows ({fraction:.0%})"
+                        )
+                    )
+                    progress_bar.empty()
                 
-                # Remove duplicates
-                if auto_remove_dups:
-                    original = len(cleaned_df)
-                    cleaned_df = cleaned_df.drop_duplicates()
-                    removed = original - len(cleaned_df)
-                    if removed > 0:
-                        operations.append(f"✓ Removed {removed} duplicate rows")
+                if not error:
+                    frames = load_cached_dataset(cache_key)
+                    if frames is None:
+                        frames = ingested
+                    if frames is not None:
+                        sales_df, inventory_df, promotions_df, products_df = dataset_views(frames, cache_key)
+                    else:
+                        error = "Processed data could not be read from the local cache"
                 
-                # Fill numeric missing
-                if auto_fill_numeric:
-                    numeric_cols = cleaned_df.select_dtypes(include=[np.number]).columns
-                    for col in numeric_cols:
-                        missing = cleaned_df[col].isnull().sum()
-                        if missing > 0:
-                            median_val = cleaned_df[col].median()
-                            cleaned_df[col] = cleaned_df[col].fillna(median_val)
-                            operations.append(f"✓ Filled {missing} missing in '{col}' with median ({median_val:.2f})")
+                if error:
+                    st.error(f"❌ Error: {error}")
+                    # Footer
+                    st.markdown("---")
+                    st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
+                    return None, None, None, None
                 
-                # Fill categorical missing
-                if auto_fill_categorical:
-                    cat_cols = cleaned_df.select_dtypes(include=['object', 'category']).columns
-                    for col in cat_cols:
-                        missing = cleaned_df[col].isnull().sum()
-                        if missing > 0:
-                            mode_series = cleaned_df[col].mode()
-                            if len(mode_series) > 0:
-                                mode_val = mode_series.iloc[0]
-                                cleaned_df[col] = cleaned_df[col].fillna(mode_val)
-                                operations.append(f"✓ Filled {missing} missing in '{col}' with mode ({mode_val})")
+                st.success("✅ All files loaded successfully!")
                 
-                # Trim whitespace
-                if auto_trim_strings:
-                    string_cols = cleaned_df.select_dtypes(include=['object']).columns
-                    for col in string_cols:
-                        cleaned_df[col] = cleaned_df[col].astype(str).str.strip()
-                    if len(string_cols) > 0:
-                        operations.append(f"✓ Trimmed whitespace from {len(string_cols)} string columns")
+                # Data summary
+                with st.expander("📊 Data Summary", expanded=False):
+                    st.markdown(f"**Sales:** {len(sales_df):,} records")
+                    st.markdown(f"**Inventory:** {len(inventory_df):,} records")
+                    st.markdown(f"**Promotions:** {len(promotions_df):,} records")
+                    if products_df is not None:
+                        st.markdown(f"**Products:** {len(products_df):,} records")
+                    
+                    date_issues = timestamp_issue_counts(sales_df)
+                    if len(date_issues) > 0:
+                        st.markdown("**Timestamp issues (set to empty):**")
+                        for issue, count in date_issues.items():
+                            st.caption(f"{issue.replace('_', ' ').title()}: {count:,} rows")
                 
-                # Lowercase column names
-                if auto_lowercase_cols:
-                    cleaned_df.columns = cleaned_df.columns.str.lower().str.replace(' ', '_')
-                    operations.append("✓ Standardized column names (lowercase, underscores)")
+                render_memory_report(cache_key, frames)
                 
-                # Remove empty columns
-                if auto_remove_empty_cols:
-                    empty_threshold = 0.5
-                    cols_to_drop = [col for col in cleaned_df.columns if cleaned_df[col].isnull().mean() > empty_threshold]
-                    if cols_to_drop:
-                        cleaned_df = cleaned_df.drop(columns=cols_to_drop)
-                        operations.append(f"✓ Removed {len(cols_to_drop)} columns with >50% missing")
+                # Footer
+                st.markdown("---")
+                st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
                 
-                cleaning_log.extend(operations)
+                return sales_df, inventory_df, promotions_df, products_df
             
-            # Show results
-            st.success("✅ Auto cleaning complete!")
+            else:
+                st.info("📌 Please upload at least Sales, Inventory, and Promotions files")
+                
+                with st.expander("📋 Expected Data Schema"):
+                    st.markdown("**Sales Data (Required):**")
+                    st.code("transaction_id, sku_id, store_id, quantity_sold, unit_price, transaction_date")
+                    
+                    st.markdown("**Inventory Data (Required):**")
+                    st.code("record_id, sku_id, store_id, stock_level, reorder_point, reorder_quantity, last_updated")
+                    
+                    st.markdown("**Promotions Data (Required):**")
+                    st.code("promotion_id, sku_id, store_id, promotion_type, discount_percentage, start_date, end_date")
+                    
+                    st.markdown("**Products Data (Optional):**")
+                    st.code("sku_id, product_name, category, brand, unit_cost, supplier_id")
+                    
+                    st.markdown("**Stores Data (Optional):**")
+                    st.code("store_id, region, store_type")
+                    
+                    st.caption("Raw exports are also accepted: sales_raw (order_id, order_time, product_id, qty, selling_price_aed), inventory_snapshot (snapshot_date, product_id, stock_on_hand), products (product_id), stores (city, channel) and campaign_plan (campaign_id, discount_pct, promo_budget_aed).")
+                
+                # Footer
+                st.markdown("---")
+                st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
+                
+                return None, None, None, None
+        
+        else:
+            # Use sample data
+            st.markdown("### ℹ️ Sample Data")
+            st.caption("Using demonstration dataset with synthetic UAE retail data")
             
-            if operations:
-                st.markdown("##### Operations Performed")
-                for op in operations:
-                    st.markdown(f"• {op}")
+            with st.spinner("Generating sample data..."):
+                frames = load_sample_data(as_of=datetime.now().date())
+                sample_id = dataset_cache_key("sample", 42, datetime.now().date())
+                sales_df, inventory_df, promotions_df, products_df = dataset_views(frames, sample_id)
             
-            # Before/After comparison
-            st.markdown("")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("##### 📊 Before Cleaning")
-                st.metric("Rows", f"{len(df):,}")
-                st.metric("Columns", f"{len(df.columns)}")
-                st.metric("Missing Values", f"{df.isnull().sum().sum():,}")
+            # Data summary
+            with st.expander("📊 Sample Data Info", expanded=False):
+                st.markdown(f"**Sales:** {len(sales_df):,} transactions")
+                st.markdown(f"**Inventory:** {len(inventory_df):,} records")
+                st.markdown(f"**Promotions:** {len(promotions_df):,} campaigns")
+                st.markdown(f"**SKUs:** {sales_df['sku_id'].nunique():,}")
+                st.markdown(f"**Stores:** {sales_df['store_id'].nunique():,}")
+                st.markdown(f"**Categories:** {sales_df['category'].nunique()}")
+                st.markdown(f"**Regions:** {sales_df['region'].nunique()}")
             
-            with col2:
-                st.markdown("##### ✨ After Cleaning")
-                rows_diff = len(cleaned_df) - len(df)
-                cols_diff = len(cleaned_df.columns) - len(df.columns)
-                missing_diff = cleaned_df.isnull().sum().sum() - df.isnull().sum().sum()
-                
-                st.metric("Rows", f"{len(cleaned_df):,}", delta=f"{rows_diff:,}" if rows_diff != 0 else None)
-                st.metric("Columns", f"{len(cleaned_df.columns)}", delta=f"{cols_diff}" if cols_diff != 0 else None)
-                st.metric("Missing Values", f"{cleaned_df.isnull().sum().sum():,}", delta=f"{missing_diff:,}" if missing_diff != 0 else None)
+            render_memory_report(sample_id, frames)
+            
+            # Footer
+            st.markdown("---")
+            st.markdown('<div style="text-align: center; color: #71717a; font-size: 0.75rem; padding: 10px 0;"><div>Version 2.0 Premium</div><div>© 2024 Data Rescue Team</div></div>', unsafe_allow_html=True)
+            
+            return sales_df, inventory_df, promotions_df, products_df
+
+
+# =============================================================================
+# SECTION NAVIGATION
+# =============================================================================
+
+# Dashboard sections and the key prefix shared by their widgets
+DASHBOARD_SECTIONS = {
+    "🧹 Data Cleaning": 'dc_',
+    "📈 Sales Analytics": 'sales_',
+    "📦 Inventory Health": 'inv_',
+    "🎯 Promotions": 'promo_',
+    "🧪 What-If Simulator": 'sim_',
+    "🏪 Store Performance": 'store_',
+    "⏰ Time Analysis": 'time_',
+}
+
+# Action widgets whose values cannot be written back through session state
+SECTION_BUTTON_KEYS = {
+    'dc_apply_missing_fix', 'dc_remove_dups', 'dc_apply_outlier_fix',
+    'dc_convert_type', 'dc_run_auto_clean', 'dc_download_csv',
+}
+
+
+def restore_section_state(section):
+    """Restore a section's widget values saved while it was not rendered."""
+    saved = st.session_state.get('section_state', {}).get(section, {})
+    for key, value in saved.items():
+        if key not in st.session_state:
+            st.session_state[key] = value
+
+
+def remember_section_state(section):
+    """Save a section's widget values; Streamlit drops them once it stops rendering."""
+    prefix = DASHBOARD_SECTIONS[section]
+    st.session_state.setdefault('section_state', {})[section] = {
+        key: st.session_state[key]
+        for key in st.session_state
+        if isinstance(key, str) and key.startswith(prefix) and key not in SECTION_BUTTON_KEYS
+    }
+
+
+# Fragments (Streamlit >= 1.37) rerun only the section whose widget changed
+@st.fragment
+def render_section(section, renderer):
+    """Render one dashboard section; its own widgets rerun only this function."""
+    started = time.perf_counter()
     
-    # =========================================================================
-    # CLEANING LOG & EXPORT
-    # =========================================================================
-    render_divider_subtle()
+    # main() bumps app_runs, so an unchanged counter means a fragment-only rerun
+    app_run = st.session_state.get('app_runs', 0)
+    section_only = st.session_state.get('section_app_run') == app_run
+    st.session_state['section_app_run'] = app_run
     
-    if cleaning_log:
-        st.markdown("### 📋 Cleaning Log")
-        for i, log in enumerate(cleaning_log, 1):
-            st.markdown(f"{i}. {log}")
+    if section_only:
+        start_profiled_run("section rerun")
+        st.session_state['render_counts'] = {}
     
-    # Export option
-    if export_cleaned:
-        st.markdown("### 📥 Export Data")
+    restore_section_state(section)
+    with profiling.span(section, 'section'):
+        renderer()
+    remember_section_state(section)
+    
+    if section_only:
+        check_render_once()
+        log_rerun('section', section, time.perf_counter() - started)
+        finish_profiled_run()
+    render_rerun_stats()
+
+
+# =============================================================================
+# RERUN INSTRUMENTATION
+# =============================================================================
+
+RERUN_LOG_SIZE = 50
+
+
+def log_rerun(scope, section, seconds):
+    """Record the scope ('app' or 'section') and duration of a rerun."""
+    log = st.session_state.setdefault('rerun_log', [])
+    log.append({
+        'time': datetime.now().strftime('%H:%M:%S'),
+        'scope': scope,
+        'section': section,
+        'seconds': round(seconds, 3)
+    })
+    del log[:-RERUN_LOG_SIZE]
+
+
+@profiled('render')
+def render_rerun_stats():
+    """Show the latest rerun scope/time and the recent rerun log."""
+    log = st.session_state.get('rerun_log', [])
+    if not log:
+        return
+    
+    last = log[-1]
+    scope = "section only" if last['scope'] == 'section' else "full app"
+    st.caption(f"⏱️ Last rerun: {scope} in {last['seconds']:.2f}s")
+    
+    with st.expander("⏱️ Rerun Log", expanded=False):
+        log_df = pd.DataFrame(log[::-1])
+        summary = log_df.groupby('scope')['seconds'].agg(['count', 'mean', 'max']).round(3)
+        render_dataframe(summary, use_container_width=True)
+        render_dataframe(log_df, use_container_width=True, hide_index=True)
+
+
+# =============================================================================
+# PERFORMANCE PROFILER
+# =============================================================================
+
+PROFILER_TRACE_LIMIT = 20
+
+
+def start_profiled_run(name):
+    """Start a profiler trace for this rerun when the sidebar profiler is on.
+
+    Called at the top of a full or fragment rerun, so a trace still open on this
+    thread was left by an interrupted rerun (e.g. st.rerun) and is dropped first,
+    which also releases its pandas instrumentation.
+    """
+    profiling.finish_trace()
+    if not st.session_state.get('profiler_enabled'):
+        return False
+    profiling.start_trace(name, instrument=True)
+    return True
+
+
+def finish_profiled_run():
+    """Store the finished trace (with its per-span summary) in the session."""
+    trace = profiling.finish_trace()
+    if trace is None:
+        return
+    trace['summary'] = profiling.span_summary(trace).to_dict('records')
+    traces = st.session_state.setdefault('profiler_traces', [])
+    traces.append(trace)
+    del traces[:-PROFILER_TRACE_LIMIT]
+
+
+def render_flame_chart(trace):
+    """Flame-style chart of a trace: one bar per span, stacked by call depth."""
+    spans = pd.DataFrame(trace['spans'])
+    fig = go.Figure(go.Bar(
+        base=spans['start_ms'],
+        x=spans['duration_ms'],
+        y=spans['depth'],
+        orientation='h',
+        text=spans['name'],
+        textposition='inside',
+        insidetextanchor='start',
+        customdata=spans[['kind', 'rows', 'bytes']].astype(object).where(spans[['kind', 'rows', 'bytes']].notna(), '-'),
+        hovertemplate='%{text}<br>%{x:.1f} ms from %{base:.1f} ms<br>kind %{customdata[0]} · rows %{customdata[1]} · bytes %{customdata[2]}<extra></extra>',
+        marker=dict(color=spans['depth'], colorscale=[[0, '#6366f1'], [1, '#ec4899']])
+    ))
+    fig = apply_chart_style(fig, height=max(200, 40 * (int(spans['depth'].max()) + 2)), show_legend=False)
+    fig.update_layout(xaxis_title="ms", yaxis_title="Depth", yaxis=dict(autorange='reversed', dtick=1), bargap=0.05)
+    return fig
+
+
+def render_profiler_panel():
+    """Sidebar toggle plus the breakdown of the last profiled rerun."""
+    st.markdown("---")
+    st.toggle("⏱️ Performance Profiler", key="profiler_enabled",
+              help="Time render calls, groupby aggregations and chart/table payloads on each rerun")
+    if not st.session_state.get('profiler_enabled'):
+        return
+    
+    cache_stats = chart_figure_cache().stats()
+    st.caption(
+        f"Figure cache: {cache_stats['entries']} figures, {cache_stats['bytes'] / 1024 ** 2:,.1f} MB, "
+        f"{cache_stats['hit_rate']:.0%} hits ({cache_stats['evictions']} evicted)"
+    )
+    
+    traces = st.session_state.get('profiler_traces', [])
+    if not traces:
+        st.caption("Interact with the dashboard to record a trace.")
+        return
+    
+    trace = traces[-1]
+    summary = pd.DataFrame(trace['summary'])
+    st.caption(f"Last profiled rerun ({trace['name']}): {trace['duration_ms']:,.0f} ms, {len(trace['spans'])} spans")
+    
+    if not summary.empty:
+        kinds = summary.groupby('kind')[['self_ms', 'rows', 'bytes']].sum()
+        for kind, row in kinds.iterrows():
+            st.markdown(f"**{kind}:** {row['self_ms']:,.1f} ms · {row['rows']:,.0f} rows · {row['bytes'] / 1024:,.1f} KB")
+    
+    with st.expander("🔥 Flame Breakdown", expanded=False):
+        if trace['spans']:
+            st.plotly_chart(render_flame_chart(trace), use_container_width=True)
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+    
+    st.download_button(
+        "📥 Export Traces (JSON)",
+        data=json.dumps(traces, default=str, indent=2),
+        file_name="promo_pulse_traces.json",
+        mime="application/json",
+        key="profiler_export"
+    )
+
+
+# =============================================================================
+# MAIN APPLICATION
+# =============================================================================
+
+def main():
+    """Main application entry point."""
+    run_started = time.perf_counter()
+    st.session_state['app_runs'] = st.session_state.get('app_runs', 0) + 1
+    start_profiled_run("app rerun")
+    st.session_state['render_counts'] = {}
+    
+    # Initialize session state
+    if 'simulation_run' not in st.session_state:
+        st.session_state['simulation_run'] = False
+    
+    # Load premium CSS
+    load_premium_css()
+    
+    # Render sidebar and get data (now returns 4 values)
+    data = render_sidebar()
+    
+    with st.sidebar:
+        render_profiler_panel()
+    
+    # Check if data is available
+    if data is None or data[0] is None:
+        # Show welcome screen
+        render_hero_header()
         
-        col1, col2 = st.columns(2)
+        st.markdown("")
+        
+        render_insight_box(
+            "👋",
+            "Welcome to UAE Promo Pulse Simulator",
+            "This premium analytics dashboard helps you analyze sales performance, monitor inventory health, evaluate promotional effectiveness, and simulate what-if scenarios. Select 'Sample Data' in the sidebar to explore with demo data, or upload your own CSV files.",
+            "primary"
+        )
+        
+        # Feature highlights
+        st.markdown("")
+        st.markdown("### ✨ Key Features")
+        
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            csv = cleaned_df.to_csv(index=False)
-            st.download_button(
-                label=f"📥 Download {df_name.title()} Data as CSV",
-                data=csv,
-                file_name=f"{df_name}_data_export.csv",
-                mime="text/csv",
-                key="dc_download_csv"
-            )
+            render_insight_box("📈", "Sales Analytics", "Deep dive into revenue trends, category performance, and regional insights.", "success")
         
         with col2:
-            st.info(f"Dataset: {len(cleaned_df):,} rows × {len(cleaned_df.columns)} columns")
+            render_insight_box("📦", "Inventory Health", "Monitor stock levels, identify stockout risks, and optimize replenishment.", "warning")
+        
+        with col3:
+            render_insight_box("🧹", "Data Cleaning", "Clean, validate, and transform your data with automated tools.", "accent")
+        
+        with col4:
+            render_insight_box("🧪", "What-If Simulator", "Simulate promotions and predict outcomes with AI recommendations.", "primary")
+        
+        render_footer()
+        finish_profiled_run()
+        return
     
-    # Return cleaned data
-    return cleaned_df, cleaning_log, None, None
+    # Unpack data (4 values now)
+    sales_df, inventory_df, promotions_df, products_df = data
+    
+    # Render main dashboard
+    render_hero_header()
+    
+    # Overview KPIs
+    render_overview_kpis(sales_df, inventory_df, promotions_df)
+    
+    render_divider()
+    
+    # Main navigation - only the selected section executes on a rerun
+    section = st.radio(
+        "Section",
+        list(DASHBOARD_SECTIONS),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="main_section"
+    )
+    
+    section_renderers = {
+        "🧹 Data Cleaning": lambda: render_data_cleaning(sales_df, inventory_df, promotions_df, products_df),
+        "📈 Sales Analytics": lambda: render_sales_analysis(sales_df),
+        "📦 Inventory Health": lambda: render_inventory_analysis(inventory_df, sales_df),
+        "🎯 Promotions": lambda: render_promotions_analysis(promotions_df, sales_df),
+        "🧪 What-If Simulator": lambda: render_promo_simulator(sales_df, inventory_df, promotions_df),
+        "🏪 Store Performance": lambda: render_store_performance(sales_df, inventory_df),
+        "⏰ Time Analysis": lambda: render_time_analysis(sales_df),
+    }
+    
+    render_section(section, section_renderers[section])
+    
+    # Footer
+    render_footer()
+    
+    check_render_once()
+    log_rerun('app', section, time.perf_counter() - run_started)
+    finish_profiled_run()
+
 
 # =============================================================================
 # APPLICATION ENTRY POINT
@@ -0,0 +1,16 @@
+"""Headless analytics for the UAE Promo Pulse dashboard.
+
+- ``data``: reading and typing the exports, star schema, streaming ingest,
+  sample generator and the on-disk dataset cache
+- ``analytics``: derived date parts, bitmap filters, the sales cube and KPIs
+- ``simulation``: the what-if promotion model
+- ``elasticity``: price elasticities fitted from history, cached on disk
+- ``cleaning``: data-quality metrics and cleaning fixes
+- ``distributions``: server-side histogram bins, box statistics and KDEs
+- ``downsampling``: LTTB point reduction for trend charts
+- ``figure_cache``: content fingerprints and the LRU figure cache
+- ``profiling``: span traces behind the in-app profiler
+- ``benchmarks``: timing/memory harness (``python -m promo_pulse.benchmarks``)
+
+None of these modules import Streamlit; ``app.py`` is the UI shell on top.
+"""
@@ -0,0 +1,249 @@
+"""Analytics engine: lazy derived columns, the bitmap filter engine, the sales cube
+and the headline KPIs computed from the dataset views.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .data import _dataset_memo
+from .profiling import profiled
+
+
+# =============================================================================
+# DERIVED SALES COLUMNS (LAZY, INTEGER-ENCODED)
+# =============================================================================
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _int_part(values, dtype):
+    """Cast a date part to a small int dtype (nullable only when dates are missing)."""
+    if values.isna().any():
+        return values.astype(dtype.capitalize())
+    return values.astype(dtype)
+
+
+# Date parts computed from transaction_date on first use. month is yyyymm and
+# day_of_week is 0=Monday; see format_month / DAY_NAMES for display labels.
+DERIVED_SALES_COLUMNS = {
+    'date': lambda ts: ts.dt.normalize(),
+    'month': lambda ts: _int_part(ts.dt.year * 100 + ts.dt.month, 'int32'),
+    'week': lambda ts: _int_part(ts.dt.isocalendar().week.astype('float64'), 'int8'),
+    'day_of_week': lambda ts: _int_part(ts.dt.dayofweek, 'int8'),
+    'hour': lambda ts: _int_part(ts.dt.hour, 'int8'),
+    'year': lambda ts: _int_part(ts.dt.year, 'int16'),
+    'quarter': lambda ts: _int_part(ts.dt.quarter, 'int8'),
+}
+
+
+def format_month(month):
+    """Label a yyyymm month key as 'YYYY-MM'."""
+    return f"{int(month) // 100}-{int(month) % 100:02d}"
+
+
+def month_labels(months):
+    """Vectorized format_month for a Series of yyyymm keys."""
+    months = months.astype('int64')
+    return (months // 100).astype(str) + '-' + (months % 100).astype(str).str.zfill(2)
+
+
+@profiled('engine')
+def with_derived_columns(sales_df, columns):
+    """Return sales with the requested derived date columns attached.
+
+    Columns are computed from transaction_date only when asked for. On the full
+    sales view each column is memoized for the session (see _dataset_memo), so it
+    is computed once per dataset; subsets compute their own.
+    """
+    missing = [col for col in columns if col in DERIVED_SALES_COLUMNS and col not in sales_df.columns]
+    if not missing or 'transaction_date' not in sales_df.columns:
+        return sales_df
+    
+    memo = _dataset_memo(sales_df)
+    view = sales_df.copy(deep=False)
+    for col in missing:
+        key = ('derived', col)
+        if memo is not None and key in memo:
+            values = memo[key]
+        else:
+            values = DERIVED_SALES_COLUMNS[col](view['transaction_date']).to_numpy()
+            if memo is not None:
+                memo[key] = values
+        view[col] = values
+    return view
+
+
+# =============================================================================
+# FILTER ENGINE (BITMAP INDEXES)
+# =============================================================================
+
+def _value_bitmap(df, column, value, memo):
+    """Packed bitmap of the rows where ``column == value`` (memoized when possible)."""
+    key = ('bitmap', column, value)
+    if memo is not None and key in memo:
+        return memo[key]
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        code = series.cat.categories.get_indexer([value])[0]
+        matches = series.cat.codes.to_numpy() == code if code >= 0 else np.zeros(len(series), dtype=bool)
+    else:
+        matches = (series == value).to_numpy(dtype=bool, na_value=False)
+    bits = np.packbits(matches)
+    if memo is not None:
+        memo[key] = bits
+    return bits
+
+
+@profiled('engine')
+def filter_rows(df, selections, ranges=None):
+    """Rows of ``df`` matching every selection and numeric range.
+
+    ``selections`` maps a column to a value or list of values (None = no filter).
+    Each (column, value) pair is answered by a packed bitmap built once per dataset
+    and session; bitmaps are OR-ed within a column and AND-ed across columns.
+    ``ranges`` maps numeric columns to inclusive ``(low, high)`` bounds. Returns the
+    matching rows with a single take, or a shallow copy when nothing is filtered.
+    """
+    memo = _dataset_memo(df)
+    n_rows = len(df)
+    combined = None
+    for column, values in selections.items():
+        if values is None or column not in df.columns:
+            continue
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        column_bits = np.zeros((n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            column_bits |= _value_bitmap(df, column, value, memo)
+        combined = column_bits if combined is None else combined & column_bits
+    
+    keep = None if combined is None else np.unpackbits(combined, count=n_rows).view(bool)
+    for column, (low, high) in (ranges or {}).items():
+        if column not in df.columns:
+            continue
+        in_range = df[column].between(low, high).to_numpy(dtype=bool, na_value=False)
+        keep = in_range if keep is None else keep & in_range
+    
+    if keep is None:
+        return df.copy(deep=False)
+    return df.iloc[np.flatnonzero(keep)]
+
+
+# =============================================================================
+# SALES CUBE (PRE-AGGREGATED)
+# =============================================================================
+
+CUBE_ATTRIBUTES = ['sku_id', 'store_id', 'category', 'brand', 'region', 'store_type']
+CUBE_DATE_PARTS = ['month', 'week', 'quarter', 'day_of_week']
+
+
+@profiled('engine')
+def build_sales_cube(sales_df):
+    """Aggregate sales to one row per (date, product, store) with sums and counts.
+
+    Dimension ids/attributes are copied from each cell's first row and date parts
+    are derived per cell, so the cube can be filtered like the sales view.
+    ``attrs['transactions_additive']`` is True when no transaction spans two cells;
+    then summing the per-cell distinct counts is exact for any rollup.
+    """
+    view = with_derived_columns(sales_df, ['date'])
+    keys = [col for col in ('date', 'product_key', 'store_key') if col in view.columns]
+    grouped = view.groupby(keys, sort=False, dropna=False, observed=True)
+    cube = grouped.agg(
+        revenue=('revenue', 'sum'),
+        quantity_sold=('quantity_sold', 'sum'),
+        lines=('revenue', 'size')
+    )
+    has_transactions = 'transaction_id' in view.columns
+    if has_transactions:
+        cube['transactions'] = grouped['transaction_id'].nunique()
+    cube = cube.reset_index()
+    
+    # With sort=False cells come out in order of first appearance, which is also
+    # the order of the rows whose cumcount is 0
+    first_rows = view.loc[grouped.cumcount().to_numpy() == 0]
+    for col in CUBE_ATTRIBUTES:
+        if col in first_rows.columns:
+            cube[col] = first_rows[col].array
+    for col in CUBE_DATE_PARTS:
+        cube[col] = DERIVED_SALES_COLUMNS[col](cube['date']).to_numpy()
+    
+    cube.attrs = {
+        'dataset_id': sales_df.attrs.get('dataset_id'),
+        'table': 'sales_cube',
+        'rows': len(cube),
+        'transactions_additive': has_transactions and int(cube['transactions'].sum()) == view['transaction_id'].nunique()
+    }
+    return cube
+
+
+def sales_cube(sales_df):
+    """The sales cube for a full sales view, built once per dataset and session."""
+    memo = _dataset_memo(sales_df)
+    if memo is None:
+        return build_sales_cube(sales_df)
+    if 'cube' not in memo:
+        memo['cube'] = build_sales_cube(sales_df)
+    return memo['cube']
+
+
+@profiled('engine')
+def cube_rollup(cube, by, raw_rows=None):
+    """Roll the cube up to ``by`` with revenue, quantity_sold and transactions.
+
+    Transactions come from summing the cube when that is exact; otherwise they are
+    counted distinct on ``raw_rows()`` (the matching sales rows), or left NaN when
+    no fallback is given.
+    """
+    rollup = cube.groupby(by, observed=True).agg(
+        revenue=('revenue', 'sum'),
+        quantity_sold=('quantity_sold', 'sum'),
+        lines=('lines', 'sum')
+    )
+    if cube.attrs.get('transactions_additive'):
+        rollup['transactions'] = cube.groupby(by, observed=True)['transactions'].sum()
+    elif raw_rows is not None:
+        rows = raw_rows()
+        if 'transaction_id' in rows.columns:
+            rollup['transactions'] = rows.groupby(by, observed=True)['transaction_id'].nunique().reindex(rollup.index)
+        else:
+            rollup['transactions'] = rollup['lines']
+    else:
+        rollup['transactions'] = np.nan
+    return rollup.reset_index()
+
+
+def cube_distinct_transactions(cube, raw_rows):
+    """Distinct transactions in the filtered cube (raw scan when not additive)."""
+    if cube.attrs.get('transactions_additive'):
+        return int(cube['transactions'].sum())
+    rows = raw_rows()
+    return rows['transaction_id'].nunique() if 'transaction_id' in rows.columns else len(rows)
+
+
+# =============================================================================
+# HEADLINE KPIs
+# =============================================================================
+
+@profiled('engine')
+def overview_metrics(sales_df, inventory_df, promotions_df):
+    """Dataset-wide sales, stock-health and promotion figures for the overview row."""
+    total_revenue = sales_df['revenue'].sum()
+    total_transactions = sales_df['transaction_id'].nunique()
+    status_counts = inventory_df['stock_status'].value_counts()
+    healthy_stock = int(status_counts.get('Healthy', 0))
+
+    return {
+        'total_revenue': total_revenue,
+        'total_transactions': total_transactions,
+        'total_units': sales_df['quantity_sold'].sum(),
+        'total_skus': sales_df['sku_id'].nunique(),
+        'total_stores': sales_df['store_id'].nunique(),
+        'avg_order_value': total_revenue / total_transactions if total_transactions > 0 else 0,
+        'critical_stock': int(status_counts.get('Critical', 0)),
+        'low_stock': int(status_counts.get('Low', 0)),
+        'healthy_stock': healthy_stock,
+        'stock_health_pct': (healthy_stock / len(inventory_df) * 100) if len(inventory_df) > 0 else 0,
+        'active_promos': len(promotions_df[promotions_df['is_active']]) if 'is_active' in promotions_df.columns else len(promotions_df),
+        'avg_discount': promotions_df['discount_percentage'].mean()
+    }
@@ -0,0 +1,409 @@
+"""Benchmark harness for the headless engines.
+
+Generates synthetic datasets with ``generate_sample_data`` at several sizes and
+times the loader, each dashboard section's filter + aggregate path, the simulator
+and the data-cleaning actions. Wall time and peak traced memory go to a JSON
+history file, and a run is compared against a stored baseline.
+
+Usage::
+
+    python -m promo_pulse.benchmarks --scales 10k,1m
+    python -m promo_pulse.benchmarks --scales 10k,1m --save-baseline
+    python -m promo_pulse.benchmarks --scales 10k,1m,10m --cases sales,sim
+"""
+
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import analytics, cleaning, data, elasticity, simulation
+
+
+# Anchored to the repository root so results land in one place whatever the cwd;
+# --history/--baseline override the files
+BENCHMARK_DIR = Path(__file__).resolve().parents[1] / "benchmarks"
+HISTORY_PATH = BENCHMARK_DIR / "history.json"
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+
+# A case is slower/hungrier than baseline when it exceeds it by this ratio
+REGRESSION_THRESHOLD = 1.25
+# Cases faster than this are too noisy to flag
+MIN_SECONDS = 0.005
+
+
+# =============================================================================
+# DATASETS
+# =============================================================================
+
+def parse_scale(text):
+    """'10k' -> 10_000, '1m' -> 1_000_000, '250000' -> 250_000."""
+    text = text.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def _csv_bytes(df):
+    """A DataFrame as an in-memory CSV upload."""
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def build_context(n_sales, seed=42):
+    """Synthetic raw CSV uploads plus the processed frames and views for one scale."""
+    tables = data.generate_sample_data(n_sales=n_sales, seed=seed)
+    uploads = [_csv_bytes(df) for df in tables]
+    frames, error = data.load_and_process_data(*uploads)
+    if error:
+        raise RuntimeError(f"Could not load the {n_sales:,}-row dataset: {error}")
+    sales_df, inventory_df, promotions_df, _ = data.dataset_views(frames, f"bench-{n_sales}-{seed}")
+    return {
+        'uploads': uploads,
+        'sales': sales_df,
+        'inventory': inventory_df,
+        'promotions': promotions_df,
+    }
+
+
+# =============================================================================
+# CASES
+# =============================================================================
+
+def _first(df, column):
+    """First value of a column, used as a representative filter selection."""
+    return df[column].dropna().iloc[0]
+
+
+def bench_load(ctx):
+    for upload in ctx['uploads']:
+        upload.seek(0)
+    data.load_and_process_data(*ctx['uploads'])
+
+
+def bench_overview(ctx):
+    analytics.overview_metrics(ctx['sales'], ctx['inventory'], ctx['promotions'])
+
+
+def bench_sales(ctx):
+    sales_df = analytics.with_derived_columns(ctx['sales'], ['month'])
+    selections = {'region': _first(sales_df, 'region')}
+    cube = analytics.filter_rows(analytics.sales_cube(sales_df), selections)
+    raw_rows = lambda: analytics.filter_rows(sales_df, selections)
+    analytics.cube_distinct_transactions(cube, raw_rows)
+    for by in ('month', 'category', 'sku_id'):
+        analytics.cube_rollup(cube, by)
+    for by in ('store_id', 'region'):
+        analytics.cube_rollup(cube, by, raw_rows)
+
+
+def bench_inventory(ctx):
+    inventory_df = ctx['inventory']
+    filtered = analytics.filter_rows(
+        inventory_df,
+        {'stock_status': ['Critical', 'Low'], 'region': _first(inventory_df, 'region')},
+        ranges={'days_of_stock': (0, 60)} if 'days_of_stock' in inventory_df.columns else None
+    )
+    filtered.groupby(['category', 'stock_status'], observed=True).size()
+
+
+def bench_promotions(ctx):
+    promotions_df = ctx['promotions']
+    filtered = analytics.filter_rows(
+        promotions_df,
+        {'category': _first(promotions_df, 'category')},
+        ranges={'discount_percentage': (0, 100)}
+    )
+    filtered.groupby('category', observed=True)['budget'].sum()
+    filtered.groupby('promotion_type', observed=True)['actual_sales_lift'].mean()
+
+
+def bench_stores(ctx):
+    filtered = analytics.filter_rows(ctx['sales'], {'category': _first(ctx['sales'], 'category')})
+    filtered.groupby('store_id', observed=True).agg({
+        'revenue': 'sum',
+        'quantity_sold': 'sum',
+        'transaction_id': 'nunique',
+        'unit_price': 'mean'
+    })
+
+
+def bench_time(ctx):
+    sales_df = analytics.with_derived_columns(ctx['sales'], ['day_of_week', 'hour', 'month', 'quarter'])
+    filtered = analytics.filter_rows(sales_df, {'region': _first(sales_df, 'region')})
+    for part in ('day_of_week', 'hour', 'month', 'quarter'):
+        filtered.groupby(part)['revenue'].sum()
+
+
+def bench_simulator(ctx):
+    sales_df = ctx['sales']
+    category = _first(sales_df, 'category')
+    sim_sales = analytics.filter_rows(sales_df, {'category': category})
+    baseline = simulation.simulation_baseline(sim_sales)
+    result = simulation.simulate_promotion(baseline, category, 20, 7, "Percentage Off", ["All Customers"], 50000)
+    simulation.discount_sensitivity(baseline, result, 7, 50000)
+
+
+def bench_simulator_grid(ctx):
+    sales_df = ctx['sales']
+    category = _first(sales_df, 'category')
+    grid = simulation.simulate_grid(
+        analytics.filter_rows(sales_df, {'category': category}), category, 50000,
+        durations=range(1, 31),
+        regions=[simulation.ALL_LABEL] + sorted(sales_df['region'].dropna().unique().tolist()),
+        store_types=[simulation.ALL_LABEL] + sorted(sales_df['store_type'].dropna().unique().tolist())
+    )
+    simulation.best_scenario(grid, 'roi')
+
+
+def bench_simulator_monte_carlo(ctx):
+    sales_df = ctx['sales']
+    category = _first(sales_df, 'category')
+    simulation.simulate_monte_carlo(
+        analytics.filter_rows(sales_df, {'category': category}), category, 20, 14,
+        "Percentage Off", ["All Customers"], 50000, draws=100_000, time_budget=float('inf')
+    )
+
+
+def bench_simulator_monte_carlo_capped(ctx):
+    sales_df = ctx['sales']
+    category = _first(sales_df, 'category')
+    sim_sales = analytics.filter_rows(sales_df, {'category': category})
+    availability = simulation.simulate_inventory(sim_sales, ctx['inventory'], 0.4, 14)
+    simulation.simulate_monte_carlo(
+        sim_sales, category, 20, 14, "Percentage Off", ["All Customers"], 50000,
+        draws=100_000, time_budget=float('inf'), availability=availability
+    )
+
+
+def bench_simulator_optimizer(ctx):
+    sales_df = ctx['sales']
+    category = _first(sales_df, 'category')
+    simulation.optimize_promotion(
+        analytics.filter_rows(sales_df, {'category': category}), category, 50000, margin_floor=0.1
+    )
+
+
+def bench_simulator_inventory(ctx):
+    sales_df = ctx['sales']
+    simulation.simulate_inventory(sales_df, ctx['inventory'], 0.4, 30)
+
+
+def bench_elasticity(ctx):
+    # The fit itself, bypassing the memo and disk cache
+    elasticity.fit_elasticities(elasticity.demand_observations(ctx['sales']))
+
+
+def bench_clean_overview(ctx):
+    df = ctx['sales'].copy()
+    cleaning.data_quality_metrics(df)
+    df.nunique()
+
+
+def bench_clean_missing(ctx):
+    df = ctx['sales'].copy()
+    cleaning.missing_value_summary(df)
+    cleaning.fill_missing(df, 'unit_price', "Fill with Median")
+
+
+def bench_clean_duplicates(ctx):
+    df = ctx['sales'].copy()
+    df.duplicated().sum()
+    df.drop_duplicates()
+
+
+def bench_clean_outliers(ctx):
+    df = ctx['sales'].copy()
+    values = df['revenue'].dropna()
+    lower, upper = cleaning.outlier_bounds(values, "IQR (Interquartile Range)")
+    cleaning.treat_outliers(df, 'revenue', lower, upper, "Cap/Clip Values")
+
+
+def bench_clean_types(ctx):
+    cleaning.convert_column_type(ctx['sales'].copy(), 'quantity_sold', "float")
+
+
+def bench_clean_auto(ctx):
+    cleaning.auto_clean(ctx['sales'].copy())
+
+
+BENCHMARK_CASES = {
+    'load': bench_load,
+    'overview': bench_overview,
+    'sales': bench_sales,
+    'inventory': bench_inventory,
+    'promotions': bench_promotions,
+    'stores': bench_stores,
+    'time': bench_time,
+    'simulator': bench_simulator,
+    'simulator_grid': bench_simulator_grid,
+    'simulator_monte_carlo': bench_simulator_monte_carlo,
+    'simulator_monte_carlo_capped': bench_simulator_monte_carlo_capped,
+    'simulator_optimizer': bench_simulator_optimizer,
+    'simulator_inventory': bench_simulator_inventory,
+    'elasticity': bench_elasticity,
+    'clean_overview': bench_clean_overview,
+    'clean_missing': bench_clean_missing,
+    'clean_duplicates': bench_clean_duplicates,
+    'clean_outliers': bench_clean_outliers,
+    'clean_types': bench_clean_types,
+    'clean_auto': bench_clean_auto,
+}
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def measure(case, ctx, repeat=3):
+    """Best wall time over ``repeat`` cold runs, then peak traced memory of one more.
+
+    Each run starts from a cleared dataset memo so memoized columns, bitmaps and
+    cubes are rebuilt, matching the first interaction after a dataset loads.
+    """
+    timings = []
+    for _ in range(repeat):
+        data.clear_dataset_memo()
+        started = time.perf_counter()
+        case(ctx)
+        timings.append(time.perf_counter() - started)
+
+    data.clear_dataset_memo()
+    tracemalloc.start()
+    try:
+        case(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    data.clear_dataset_memo()
+
+    return {
+        'seconds': round(min(timings), 6),
+        'median_seconds': round(float(np.median(timings)), 6),
+        'peak_mb': round(peak / 1024 ** 2, 3)
+    }
+
+
+def run_benchmarks(scales, case_names=None, repeat=3, seed=42, progress=print):
+    """Run the selected cases at each scale; returns a list of result dicts."""
+    selected = {
+        name: case for name, case in BENCHMARK_CASES.items()
+        if not case_names or any(part in name for part in case_names)
+    }
+    results = []
+    for n_sales in scales:
+        progress(f"Building {n_sales:,}-row dataset...")
+        ctx = build_context(n_sales, seed)
+        for name, case in selected.items():
+            result = {'case': name, 'rows': n_sales, **measure(case, ctx, repeat)}
+            results.append(result)
+            progress(f"  {name:<18} {result['seconds']:>9.4f}s  peak {result['peak_mb']:>9.1f} MB")
+        del ctx
+    return results
+
+
+def _git_commit():
+    """Short commit hash of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _result_key(result):
+    return f"{result['case']}@{result['rows']}"
+
+
+# =============================================================================
+# HISTORY & BASELINE
+# =============================================================================
+
+def append_history(results, path=HISTORY_PATH):
+    """Append a run (results plus environment) to the JSON history file."""
+    path = Path(path)
+    history = json.loads(path.read_text()) if path.exists() else []
+    history.append({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'results': results
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=2))
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Store these results as the baseline later runs are compared against."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({_result_key(r): r for r in results}, indent=2))
+
+
+def find_regressions(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Cases whose time or peak memory exceed the baseline by ``threshold``.
+
+    Returns a list of ``(key, metric, baseline_value, current_value)``.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(_result_key(result))
+        if reference is None:
+            continue
+        if result['seconds'] >= MIN_SECONDS and result['seconds'] > reference['seconds'] * threshold:
+            regressions.append((_result_key(result), 'seconds', reference['seconds'], result['seconds']))
+        if result['peak_mb'] > reference['peak_mb'] * threshold and result['peak_mb'] - reference['peak_mb'] > 1:
+            regressions.append((_result_key(result), 'peak_mb', reference['peak_mb'], result['peak_mb']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the promo_pulse engines.")
+    parser.add_argument('--scales', default='10k,1m', help="comma-separated sales row counts, e.g. 10k,1m,10m")
+    parser.add_argument('--cases', default='', help="comma-separated substrings selecting cases (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--history', default=str(HISTORY_PATH))
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    scales = [parse_scale(s) for s in args.scales.split(',') if s.strip()]
+    case_names = [c.strip() for c in args.cases.split(',') if c.strip()]
+    results = run_benchmarks(scales, case_names, args.repeat, args.seed)
+    append_history(results, args.history)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline_path = Path(args.baseline)
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+        return 0
+
+    regressions = find_regressions(results, json.loads(baseline_path.read_text()), args.threshold)
+    for key, metric, before, after in regressions:
+        print(f"REGRESSION {key}: {metric} {before} -> {after} ({after / before:.2f}x)")
+    if not regressions:
+        print("No regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
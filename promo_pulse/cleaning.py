@@ -0,0 +1,191 @@
+"""Cleaning engine: data-quality metrics and the fixes offered by the data-cleaning
+section. Each fix returns the new frame and a log message instead of writing to
+the page.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .data import _with_fill_category
+
+
+# =============================================================================
+# DATA QUALITY
+# =============================================================================
+
+def data_quality_metrics(df):
+    """Missing cells, duplicate rows, completeness/uniqueness % and a 0-100 score."""
+    total_cells = df.shape[0] * df.shape[1]
+    missing_cells = df.isnull().sum().sum()
+    duplicate_rows = df.duplicated().sum()
+    completeness = ((total_cells - missing_cells) / total_cells * 100) if total_cells > 0 else 0
+    uniqueness = ((len(df) - duplicate_rows) / len(df) * 100) if len(df) > 0 else 0
+
+    return {
+        'missing_cells': missing_cells,
+        'duplicate_rows': duplicate_rows,
+        'completeness': completeness,
+        'uniqueness': uniqueness,
+        'quality_score': min(100, completeness * 0.5 + uniqueness * 0.3 + 20)
+    }
+
+
+def missing_value_summary(df):
+    """Missing/present counts and missing % per column, most missing first."""
+    missing = df.isnull().sum().values
+    summary = pd.DataFrame({
+        'Column': df.columns,
+        'Missing': missing,
+        'Present': df.count().values,
+        'Missing %': (missing / len(df) * 100).round(2)
+    })
+    return summary.sort_values('Missing', ascending=False)
+
+
+# =============================================================================
+# FIXES
+# =============================================================================
+
+def fill_missing(df, column, method, custom_value=""):
+    """Apply a missing-value fix to ``column``.
+
+    Returns ``(df, message, error)``; ``message`` is None when nothing was done.
+    """
+    if method == "Drop Rows":
+        original_missing = df[column].isnull().sum()
+        return df.dropna(subset=[column]), f"Dropped {original_missing} rows with missing {column}", None
+
+    df = df.copy()
+    if method in ("Fill with Mean", "Fill with Median"):
+        stat = method.split()[-1].lower()
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            return df, None, f"{stat.title()} can only be calculated for numeric columns"
+        fill_val = getattr(df[column], stat)()
+        df[column] = df[column].fillna(fill_val)
+        return df, f"Filled {column} with {stat}: {fill_val:.2f}", None
+    if method == "Fill with Mode":
+        mode_series = df[column].mode()
+        if len(mode_series) == 0:
+            return df, None, None
+        fill_val = mode_series.iloc[0]
+        df[column] = df[column].fillna(fill_val)
+        return df, f"Filled {column} with mode: {fill_val}", None
+    if method == "Fill with Zero":
+        df[column] = _with_fill_category(df[column], 0).fillna(0)
+        return df, f"Filled {column} with 0", None
+    if method == "Fill with Custom" and custom_value:
+        df[column] = _with_fill_category(df[column], custom_value).fillna(custom_value)
+        return df, f"Filled {column} with: {custom_value}", None
+    if method == "Forward Fill":
+        df[column] = df[column].ffill()
+        return df, f"Forward filled {column}", None
+    if method == "Backward Fill":
+        df[column] = df[column].bfill()
+        return df, f"Backward filled {column}", None
+    return df, None, None
+
+
+def outlier_bounds(values, method, iqr_multiplier=1.5, z_threshold=3.0, lower_pct=1, upper_pct=99):
+    """``(lower, upper)`` bounds for the IQR, Z-Score or Percentile method."""
+    if method == "IQR (Interquartile Range)":
+        q1 = values.quantile(0.25)
+        q3 = values.quantile(0.75)
+        iqr = q3 - q1
+        return q1 - iqr_multiplier * iqr, q3 + iqr_multiplier * iqr
+    if method == "Z-Score":
+        mean = values.mean()
+        std = values.std()
+        if std == 0:
+            return mean, mean
+        return mean - z_threshold * std, mean + z_threshold * std
+    return values.quantile(lower_pct / 100), values.quantile(upper_pct / 100)
+
+
+def treat_outliers(df, column, lower_bound, upper_bound, action):
+    """Remove, cap or replace values of ``column`` outside the bounds; returns ``(df, message)``."""
+    outside = (df[column] < lower_bound) | (df[column] > upper_bound)
+    if action == "Remove Outliers":
+        kept = df[(df[column] >= lower_bound) & (df[column] <= upper_bound)]
+        return kept, f"Removed {len(df) - len(kept)} outlier rows from {column}"
+
+    df = df.copy()
+    if action == "Cap/Clip Values":
+        df[column] = df[column].clip(lower_bound, upper_bound)
+        return df, f"Capped {column} to [{lower_bound:.2f}, {upper_bound:.2f}]"
+    stat = "mean" if action == "Replace with Mean" else "median"
+    fill_val = getattr(df[column], stat)()
+    df.loc[outside, column] = fill_val
+    return df, f"Replaced outliers in {column} with {stat}: {fill_val:.2f}"
+
+
+def convert_column_type(df, column, target_type, date_format=""):
+    """Convert ``column`` to ``target_type``; returns ``(df, message)``, raising on failure."""
+    df = df.copy()
+    if target_type == "string":
+        df[column] = df[column].astype(str)
+    elif target_type == "integer":
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    elif target_type == "float":
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    elif target_type == "datetime":
+        if date_format:
+            df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce')
+        else:
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+    elif target_type == "category":
+        df[column] = df[column].astype('category')
+    elif target_type == "boolean":
+        df[column] = df[column].astype(bool)
+    return df, f"Converted {column} to {target_type}"
+
+
+def auto_clean(df, remove_duplicates=True, fill_numeric=True, fill_categorical=True,
+               trim_strings=True, lowercase_columns=True, drop_sparse_columns=False):
+    """Run the selected automatic cleaning steps; returns ``(df, operations)``."""
+    operations = []
+
+    if remove_duplicates:
+        original = len(df)
+        df = df.drop_duplicates()
+        removed = original - len(df)
+        if removed > 0:
+            operations.append(f"✓ Removed {removed} duplicate rows")
+
+    df = df.copy()
+    if fill_numeric:
+        for col in df.select_dtypes(include=[np.number]).columns:
+            missing = df[col].isnull().sum()
+            if missing > 0:
+                median_val = df[col].median()
+                df[col] = df[col].fillna(median_val)
+                operations.append(f"✓ Filled {missing} missing in '{col}' with median ({median_val:.2f})")
+
+    if fill_categorical:
+        for col in df.select_dtypes(include=['object', 'category']).columns:
+            missing = df[col].isnull().sum()
+            if missing > 0:
+                mode_series = df[col].mode()
+                if len(mode_series) > 0:
+                    mode_val = mode_series.iloc[0]
+                    df[col] = df[col].fillna(mode_val)
+                    operations.append(f"✓ Filled {missing} missing in '{col}' with mode ({mode_val})")
+
+    if trim_strings:
+        string_cols = df.select_dtypes(include=['object']).columns
+        for col in string_cols:
+            df[col] = df[col].astype(str).str.strip()
+        if len(string_cols) > 0:
+            operations.append(f"✓ Trimmed whitespace from {len(string_cols)} string columns")
+
+    if lowercase_columns:
+        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        operations.append("✓ Standardized column names (lowercase, underscores)")
+
+    if drop_sparse_columns:
+        empty_threshold = 0.5
+        cols_to_drop = [col for col in df.columns if df[col].isnull().mean() > empty_threshold]
+        if cols_to_drop:
+            df = df.drop(columns=cols_to_drop)
+            operations.append(f"✓ Removed {len(cols_to_drop)} columns with >50% missing")
+
+    return df, operations
@@ -0,0 +1,1083 @@
+"""Data layer: reading, validating and typing the exports, the star schema, the
+streaming sales ingest, the sample generator and the on-disk dataset cache.
+
+Nothing here imports Streamlit, so loading can be profiled or run from batch jobs.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .profiling import profiled
+
+
+# =============================================================================
+# DATA VALIDATION & LOADING
+# =============================================================================
+
+EXPECTED_COLUMNS = {
+    'sales': ['transaction_id', 'sku_id', 'store_id', 'quantity_sold', 'unit_price', 'transaction_date'],
+    'inventory': ['record_id', 'sku_id', 'store_id', 'stock_level', 'reorder_point', 'reorder_quantity', 'last_updated'],
+    'promotions': ['promotion_id', 'sku_id', 'store_id', 'promotion_type', 'discount_percentage', 'start_date', 'end_date'],
+    'products': ['sku_id', 'product_name', 'category', 'brand', 'unit_cost', 'supplier_id'],
+    'stores': ['store_id', 'region', 'store_type']
+}
+
+# Raw export layouts (sales_raw.csv, inventory_snapshot.csv, products.csv, stores.csv,
+# campaign_plan.csv) mapped onto the internal column names after normalization.
+RAW_COLUMN_ALIASES = {
+    'sales': {
+        'order_id': 'transaction_id', 'order_time': 'transaction_date', 'product_id': 'sku_id',
+        'qty': 'quantity_sold', 'selling_price_aed': 'unit_price', 'discount_pct': 'discount_percentage'
+    },
+    'inventory': {
+        'snapshot_date': 'last_updated', 'product_id': 'sku_id', 'stock_on_hand': 'stock_level'
+    },
+    'promotions': {
+        'campaign_id': 'promotion_id', 'product_id': 'sku_id', 'discount_pct': 'discount_percentage',
+        'promo_budget_aed': 'budget', 'city': 'region'
+    },
+    'products': {
+        'product_id': 'sku_id', 'base_price_aed': 'base_price', 'unit_cost_aed': 'unit_cost'
+    },
+    'stores': {
+        'city': 'region', 'channel': 'store_type'
+    }
+}
+
+
+# Compact dtypes applied when a table is read: IDs and low-cardinality dimensions
+# become pandas categoricals (read directly as such by read_csv) and measures are
+# downcast. Integer types fall back to float32 when a column has NaNs or fractions.
+COLUMN_SCHEMA = {
+    'sales': {
+        'sku_id': 'category', 'store_id': 'category', 'customer_id': 'category',
+        'payment_method': 'category', 'category': 'category', 'brand': 'category',
+        'region': 'category', 'store_type': 'category',
+        'payment_status': 'category', 'quantity_sold': 'int32', 'unit_price': 'float32',
+        'discount_percentage': 'float32', 'return_flag': 'int8'
+    },
+    'inventory': {
+        'sku_id': 'category', 'store_id': 'category', 'warehouse_location': 'category',
+        'supplier_id': 'category', 'category': 'category', 'brand': 'category',
+        'region': 'category', 'store_type': 'category',
+        'stock_level': 'int32', 'reorder_point': 'int32', 'reorder_quantity': 'int32',
+        'lead_time_days': 'int32'
+    },
+    'promotions': {
+        'sku_id': 'category', 'store_id': 'category', 'promotion_type': 'category',
+        'promotion_name': 'category', 'category': 'category', 'brand': 'category',
+        'region': 'category', 'channel': 'category',
+        'discount_percentage': 'int32', 'budget': 'float32'
+    },
+    'products': {
+        'sku_id': 'category', 'category': 'category', 'brand': 'category', 'supplier_id': 'category',
+        'launch_flag': 'category', 'unit_cost': 'float32', 'base_price': 'float32', 'tax_rate': 'float32'
+    },
+    'stores': {
+        'store_id': 'category', 'region': 'category', 'store_type': 'category', 'fulfillment_type': 'category'
+    }
+}
+
+
+def validate_dataframe(df, file_type):
+    """Validate DataFrame has required columns."""
+    if df is None or df.empty:
+        return False, "Empty dataframe"
+    
+    expected = set(EXPECTED_COLUMNS.get(file_type, []))
+    df.columns = df.columns.str.lower().str.strip()
+    actual = set(df.columns)
+    
+    missing = expected - actual
+    if missing:
+        return False, f"Missing columns: {', '.join(missing)}"
+    
+    return True, "Valid"
+
+
+SALES_DATE_COLUMNS = ['transaction_date', 'date', 'sale_date', 'order_date']
+
+# Timestamp layouts tried in order as (full-match pattern, strptime format or epoch unit)
+TIMESTAMP_FORMATS = [
+    (r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', '%Y-%m-%d %H:%M:%S'),
+    (r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}', '%Y-%m-%dT%H:%M:%S'),
+    (r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}', '%Y-%m-%d %H:%M'),
+    (r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d'),
+    (r'\d{4}/\d{2}/\d{2}', '%Y/%m/%d'),
+    (r'\d{1,2}/\d{1,2}/\d{4} \d{2}:\d{2}', '%d/%m/%Y %H:%M'),
+    (r'\d{1,2}/\d{1,2}/\d{4}', '%d/%m/%Y'),
+    (r'\d{9,10}', 's'),
+    (r'\d{12,13}', 'ms'),
+]
+TIMESTAMP_NULL_TOKENS = ['', 'NAT', 'NULL', 'NONE', 'NAN', 'NA', 'N/A', '-']
+TIMESTAMP_SENTINELS = pd.to_datetime(['1970-01-01', '1900-01-01'])
+TIMESTAMP_WINDOW_START = pd.Timestamp('2000-01-01')
+TIMESTAMP_ISSUES = ['ok', 'missing', 'unparseable', 'invalid_date', 'epoch_sentinel', 'out_of_window']
+REQUIRED_COLUMNS = {
+    'sales': ['sku_id', 'store_id', 'quantity_sold'],
+    'inventory': ['sku_id', 'store_id', 'stock_level'],
+    'promotions': ['discount_percentage'],
+    'products': ['sku_id'],
+    'stores': ['store_id'],
+}
+
+
+def canonical_column_names(columns, file_type=None):
+    """Normalize column names to lowercase snake_case and map raw aliases.
+
+    An alias is only applied when the internal name is not already present.
+    """
+    normalized = pd.Index(columns).str.lower().str.strip().str.replace(' ', '_')
+    aliases = RAW_COLUMN_ALIASES.get(file_type, {})
+    present = set(normalized)
+    return pd.Index([
+        aliases[name] if name in aliases and aliases[name] not in present else name
+        for name in normalized
+    ])
+
+
+def normalize_columns(df, file_type=None):
+    """Normalize column names to lowercase snake_case (and internal names for file_type)."""
+    df.columns = canonical_column_names(df.columns, file_type)
+    return df
+
+
+def check_required_columns(df, file_type):
+    """Return an error message if required columns are missing, else None."""
+    missing = set(REQUIRED_COLUMNS[file_type]) - set(df.columns)
+    if missing:
+        return f"Missing columns: {', '.join(missing)}"
+    return None
+
+
+def read_csv_with_schema(file, file_type, **kwargs):
+    """Read a CSV with the categorical columns of COLUMN_SCHEMA parsed as categories.
+
+    Headers are matched after normalization and aliasing, so 'SKU ID' and
+    'product_id' still read as category. Extra keyword arguments (e.g.
+    ``chunksize``) are passed to ``pd.read_csv``.
+    """
+    header = pd.read_csv(file, nrows=0).columns
+    if hasattr(file, 'seek'):
+        file.seek(0)
+    normalized = canonical_column_names(header, file_type)
+    table_schema = COLUMN_SCHEMA.get(file_type, {})
+    dtypes = {
+        raw: 'category' for raw, name in zip(header, normalized)
+        if table_schema.get(name) == 'category'
+    }
+    return pd.read_csv(file, dtype=dtypes, **kwargs)
+
+
+def _downcast_numeric(series, dtype):
+    """Downcast a numeric column to a smaller int/float32 without losing values."""
+    values = series.to_numpy()
+    if dtype.startswith('int'):
+        bounds = np.iinfo(dtype)
+        in_range = len(values) == 0 or (values.min() >= bounds.min and values.max() <= bounds.max)
+        if pd.api.types.is_integer_dtype(values.dtype):
+            return series.astype(dtype) if in_range else series
+        if pd.api.types.is_float_dtype(values.dtype):
+            if np.isfinite(values).all() and (values % 1 == 0).all() and in_range:
+                return series.astype(dtype)
+            return series.astype(np.float32)
+    elif dtype == 'float32' and pd.api.types.is_numeric_dtype(values.dtype):
+        return series.astype(np.float32)
+    return series
+
+
+def apply_column_schema(df, file_type):
+    """Cast a processed frame's columns to the compact dtypes in COLUMN_SCHEMA."""
+    for col, dtype in COLUMN_SCHEMA.get(file_type, {}).items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if dtype == 'category':
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[col] = series.astype('category')
+        elif isinstance(series.dtype, np.dtype) and pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            df[col] = _downcast_numeric(series, dtype)
+    return df
+
+
+def _with_fill_category(series, value):
+    """Register a fill value as a category so fillna accepts it on categorical columns."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        return series.cat.add_categories([value])
+    return series
+
+
+def _object_column_bytes(series):
+    """Bytes a column would take as Python objects (how untyped CSV strings load)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        sizes = np.array([sys.getsizeof(str(c)) for c in series.cat.categories], dtype=np.int64)
+        return 8 * len(series) + int((counts * sizes).sum())
+    return 8 * len(series)
+
+
+def memory_report(frames):
+    """Per-table memory with the compact schema vs. the default object/64-bit dtypes."""
+    rows = []
+    for name, df in frames.items():
+        if df is None:
+            continue
+        usage = df.memory_usage(deep=True, index=False)
+        table_schema = COLUMN_SCHEMA.get(name, {})
+        baseline = 0
+        for col in df.columns:
+            if col in table_schema and (isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype.itemsize < 8):
+                baseline += _object_column_bytes(df[col])
+            else:
+                baseline += int(usage[col])
+        current = int(usage.sum())
+        rows.append({
+            'Table': name.title(),
+            'Rows': len(df),
+            'Memory (MB)': round(current / 1024 ** 2, 2),
+            'Unoptimized (MB)': round(baseline / 1024 ** 2, 2),
+            'Saved %': round((1 - current / baseline) * 100, 1) if baseline else 0.0
+        })
+    return pd.DataFrame(rows)
+
+
+def rescue_timestamps(values, window_start=TIMESTAMP_WINDOW_START, window_end=None):
+    """Parse mixed-format timestamps one format group at a time and flag bad values.
+
+    Values are classified by full-match pattern and each group is parsed with an
+    explicit ``format=``, so nothing falls back to per-element inference. Returns
+    ``(parsed, issues)``: datetimes with every flagged value set to NaT, and a
+    categorical of TIMESTAMP_ISSUES per row. ``window_end`` defaults to tomorrow.
+    """
+    issues = np.zeros(len(values), dtype=np.int8)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values.to_numpy(dtype='datetime64[us]').copy()
+        issues[np.isnat(parsed)] = TIMESTAMP_ISSUES.index('missing')
+    else:
+        text = values.astype('str').str.strip()
+        parsed = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[us]')
+        pending = text.notna().to_numpy(dtype=bool, copy=True)
+        issues[~pending] = TIMESTAMP_ISSUES.index('missing')
+        for pattern, fmt in TIMESTAMP_FORMATS:
+            if not pending.any():
+                break
+            candidates = text[pending]
+            matched = candidates.str.fullmatch(pattern).to_numpy(dtype=bool, na_value=False)
+            if not matched.any():
+                continue
+            rows = np.flatnonzero(pending)[matched]
+            group = candidates[matched]
+            if fmt in ('s', 'ms'):
+                group_parsed = pd.to_datetime(group.astype(np.int64), unit=fmt, errors='coerce')
+            else:
+                group_parsed = pd.to_datetime(group, format=fmt, errors='coerce')
+            parsed[rows] = group_parsed.to_numpy(dtype='datetime64[us]')
+            issues[rows[np.isnat(parsed[rows])]] = TIMESTAMP_ISSUES.index('invalid_date')
+            pending[rows] = False
+        # Only the leftovers are checked for null tokens, which keeps the common path short
+        leftover = np.flatnonzero(pending)
+        null_token = text.iloc[leftover].str.upper().isin(TIMESTAMP_NULL_TOKENS).to_numpy(dtype=bool)
+        issues[leftover[null_token]] = TIMESTAMP_ISSUES.index('missing')
+        issues[leftover[~null_token]] = TIMESTAMP_ISSUES.index('unparseable')
+    
+    if window_end is None:
+        window_end = pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+    valid = ~np.isnat(parsed)
+    days = parsed.astype('datetime64[D]')
+    sentinel = valid & np.isin(days, TIMESTAMP_SENTINELS.to_numpy(dtype='datetime64[D]'))
+    outside = valid & ~sentinel & (
+        (parsed < np.datetime64(window_start, 'us')) | (parsed >= np.datetime64(window_end, 'us'))
+    )
+    issues[sentinel] = TIMESTAMP_ISSUES.index('epoch_sentinel')
+    issues[outside] = TIMESTAMP_ISSUES.index('out_of_window')
+    parsed[sentinel | outside] = np.datetime64('NaT')
+    
+    return (
+        pd.Series(parsed, index=values.index, name=values.name),
+        pd.Series(pd.Categorical.from_codes(issues, TIMESTAMP_ISSUES), index=values.index)
+    )
+
+
+def timestamp_issue_counts(sales_df):
+    """Count rows per timestamp issue (excluding 'ok') recorded by rescue_timestamps."""
+    if 'date_issue' not in sales_df.columns:
+        return pd.Series(dtype='int64')
+    counts = sales_df['date_issue'].value_counts()
+    return counts[(counts > 0) & (counts.index != 'ok')]
+
+
+def process_sales_frame(sales_df):
+    """Parse the transaction date and derive revenue for sales (or one chunk of it)."""
+    # Process sales dates
+    for col in SALES_DATE_COLUMNS:
+        if col in sales_df.columns:
+            sales_df['transaction_date'], sales_df['date_issue'] = rescue_timestamps(sales_df[col])
+            break
+    
+    # Date parts (date, month, week, ...) are derived lazily, see with_derived_columns
+    
+    # Calculate revenue
+    if 'quantity_sold' in sales_df.columns and 'unit_price' in sales_df.columns:
+        sales_df['revenue'] = sales_df['quantity_sold'] * sales_df['unit_price']
+    elif 'quantity_sold' in sales_df.columns:
+        sales_df['revenue'] = sales_df['quantity_sold'] * 10  # Default price
+    
+    return apply_column_schema(sales_df, 'sales')
+
+
+def process_inventory_frame(inventory_df):
+    """Parse the snapshot date and derive stock status and ratio for inventory."""
+    if 'last_updated' in inventory_df.columns:
+        inventory_df['last_updated'], _ = rescue_timestamps(inventory_df['last_updated'])
+    
+    if 'stock_level' in inventory_df.columns:
+        if 'reorder_point' not in inventory_df.columns:
+            inventory_df['reorder_point'] = inventory_df['stock_level'] * 0.3
+        
+        inventory_df['stock_status'] = np.select(
+            [inventory_df['stock_level'] <= inventory_df['reorder_point'] * 0.5,
+             inventory_df['stock_level'] <= inventory_df['reorder_point']],
+            ['Critical', 'Low'],
+            default='Healthy'
+        )
+        inventory_df['stock_ratio'] = inventory_df['stock_level'] / inventory_df['reorder_point'].replace(0, 1)
+    
+    return apply_column_schema(inventory_df, 'inventory')
+
+
+def process_promotions_frame(promotions_df):
+    """Parse promotion dates."""
+    if 'start_date' in promotions_df.columns:
+        promotions_df['start_date'] = pd.to_datetime(promotions_df['start_date'], errors='coerce')
+    if 'end_date' in promotions_df.columns:
+        promotions_df['end_date'] = pd.to_datetime(promotions_df['end_date'], errors='coerce')
+    
+    return apply_column_schema(promotions_df, 'promotions')
+
+
+def load_dimension_files(inventory_file, promotions_file, products_file=None, stores_file=None):
+    """Load and process the inventory, promotions, products and stores files."""
+    inventory_df = normalize_columns(read_csv_with_schema(inventory_file, 'inventory'), 'inventory')
+    promotions_df = normalize_columns(read_csv_with_schema(promotions_file, 'promotions'), 'promotions')
+    products_df = stores_df = None
+    if products_file:
+        products_df = apply_column_schema(normalize_columns(read_csv_with_schema(products_file, 'products'), 'products'), 'products')
+    if stores_file:
+        stores_df = apply_column_schema(normalize_columns(read_csv_with_schema(stores_file, 'stores'), 'stores'), 'stores')
+    
+    inv_error = check_required_columns(inventory_df, 'inventory')
+    if inv_error:
+        return None, None, None, None, f"Inventory: {inv_error}"
+    promo_error = check_required_columns(promotions_df, 'promotions')
+    if promo_error:
+        return None, None, None, None, f"Promotions: {promo_error}"
+    for name, dimension_df in (('products', products_df), ('stores', stores_df)):
+        dimension_error = check_required_columns(dimension_df, name) if dimension_df is not None else None
+        if dimension_error:
+            return None, None, None, None, f"{name.title()}: {dimension_error}"
+    
+    inventory_df = process_inventory_frame(inventory_df)
+    promotions_df = process_promotions_frame(promotions_df)
+    return inventory_df, promotions_df, products_df, stores_df, None
+
+
+def load_and_process_data(sales_file, inventory_file, promotions_file, products_file=None, stores_file=None):
+    """Load and process all data files in memory into a star-schema frames dict.
+
+    Returns ``(frames, error)``.
+    """
+    try:
+        sales_df = normalize_columns(read_csv_with_schema(sales_file, 'sales'), 'sales')
+        sales_error = check_required_columns(sales_df, 'sales')
+        if sales_error:
+            return None, f"Sales: {sales_error}"
+        
+        inventory_df, promotions_df, products_df, stores_df, error = load_dimension_files(
+            inventory_file, promotions_file, products_file, stores_file
+        )
+        if error:
+            return None, error
+        
+        sales_df = process_sales_frame(sales_df)
+        return build_star_schema(sales_df, inventory_df, promotions_df, products_df, stores_df), None
+        
+    except Exception as e:
+        return None, str(e)
+
+
+# =============================================================================
+# STAR SCHEMA (INT32 SURROGATE KEYS)
+# =============================================================================
+
+# Fact tables keep only an int32 key per dimension: (id column, key column, attributes).
+# A key is the row position in the dimension table, so resolving an attribute is
+# an array take; -1 marks ids missing from the data and resolves to NaN.
+STAR_DIMENSIONS = {
+    'products': ('sku_id', 'product_key', ['category', 'brand']),
+    'stores': ('store_id', 'store_key', ['region', 'store_type']),
+}
+
+
+def start_dimensions(products_df=None, stores_df=None):
+    """Seed the dimension tables from the products/stores files, if any."""
+    dimensions = {}
+    for name, dimension_df in (('products', products_df), ('stores', stores_df)):
+        id_col, _, attributes = STAR_DIMENSIONS[name]
+        if dimension_df is None:
+            dimension_df = pd.DataFrame(columns=[id_col] + attributes, dtype=object)
+        else:
+            dimension_df = dimension_df.dropna(subset=[id_col]).drop_duplicates(id_col).reset_index(drop=True)
+            dimension_df[id_col] = dimension_df[id_col].astype(str)
+        dimensions[name] = dimension_df
+    return dimensions
+
+
+def _key_codes(ids, values):
+    """Positions of ``values`` in ``ids`` (-1 when absent), computed per category."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        category_keys = ids.get_indexer(values.cat.categories.astype(str))
+        codes = values.cat.codes.to_numpy()
+        return np.where(codes >= 0, category_keys[codes], -1).astype(np.int32)
+    keys = ids.get_indexer(values.astype(str))
+    return np.where(values.notna().to_numpy(), keys, -1).astype(np.int32)
+
+
+def add_fact_table(fact_df, dimensions):
+    """Register a fact's ids in ``dimensions`` (in place) and return it keyed by int32.
+
+    Ids not yet in a dimension are appended with the attributes found on the fact,
+    so existing keys never move and chunks can be added one at a time. The id and
+    attribute columns are dropped from the fact once its key column is set.
+    """
+    for name, (id_col, key_col, attributes) in STAR_DIMENSIONS.items():
+        if id_col not in fact_df.columns:
+            continue
+        dimension_df = dimensions[name]
+        present = [col for col in attributes if col in fact_df.columns]
+        seen = fact_df[[id_col] + present].dropna(subset=[id_col]).drop_duplicates(id_col)
+        seen = seen.astype({col: object for col in seen.columns})
+        seen[id_col] = seen[id_col].astype(str)
+        new = seen[~seen[id_col].isin(dimension_df[id_col].astype(str))]
+        if len(new) > 0:
+            dimension_df = pd.concat([dimension_df.astype({col: object for col in present if col in dimension_df.columns}), new], ignore_index=True)
+            dimensions[name] = dimension_df
+        
+        keys = _key_codes(pd.Index(dimension_df[id_col].astype(str)), fact_df[id_col])
+        fact_df = fact_df.drop(columns=present)
+        fact_df.insert(fact_df.columns.get_loc(id_col), key_col, keys)
+        fact_df = fact_df.drop(columns=[id_col])
+    return fact_df
+
+
+def finalize_dimensions(dimensions):
+    """Cast the dimension tables to their compact dtypes."""
+    return {name: apply_column_schema(dimension_df.reset_index(drop=True), name) for name, dimension_df in dimensions.items()}
+
+
+def build_star_schema(sales_df, inventory_df, promotions_df, products_df=None, stores_df=None):
+    """Split processed tables into int32-keyed facts plus products/stores dimensions."""
+    dimensions = start_dimensions(products_df, stores_df)
+    frames = {
+        'inventory': add_fact_table(inventory_df, dimensions),
+        'promotions': add_fact_table(promotions_df, dimensions),
+        'sales': add_fact_table(sales_df, dimensions),
+    }
+    frames.update(finalize_dimensions(dimensions))
+    return frames
+
+
+def resolve_dimensions(fact_df, frames):
+    """Return a fact table with its dimension ids and attributes attached.
+
+    Attributes are gathered by key with ``take`` over the (categorical) dimension
+    columns, so this is array indexing rather than a join.
+    """
+    view = fact_df.copy(deep=False)
+    for name, (id_col, key_col, attributes) in STAR_DIMENSIONS.items():
+        dimension_df = frames.get(name)
+        if key_col not in view.columns or dimension_df is None:
+            continue
+        keys = view[key_col].to_numpy()
+        for col in [id_col] + attributes:
+            if col not in dimension_df.columns or col in view.columns:
+                continue
+            values = pd.api.extensions.take(dimension_df[col].array, keys, allow_fill=True)
+            if col == id_col:
+                view.insert(view.columns.get_loc(key_col), col, values)
+            else:
+                view[col] = values
+    return view
+
+
+@profiled('engine')
+def dataset_views(frames, dataset_id=None):
+    """Wide sales/inventory/promotions views plus the products table for the dashboard.
+
+    With a ``dataset_id`` the views are built once and kept in the dataset memo, so
+    reruns reuse them, and only these exact view objects get memoized derived
+    columns and filter bitmaps (see _dataset_memo).
+    """
+    memo = _memo_for(dataset_id) if dataset_id is not None else None
+    if memo is not None and 'views' in memo:
+        return memo['views']
+    views = []
+    for name in ('sales', 'inventory', 'promotions'):
+        view = resolve_dimensions(frames[name], frames)
+        view.attrs.update({'dataset_id': dataset_id, 'table': name})
+        views.append(view)
+    result = (*views, frames.get('products'))
+    if memo is not None:
+        memo['views'] = result
+    return result
+
+
+# Mapping that holds the dataset memo. Headless callers share this module-level dict;
+# the Streamlit shell swaps in st.session_state so memos are per browser session.
+_memo_store = {}
+
+
+def set_memo_store(store):
+    """Keep dataset memos in ``store`` (any mutable mapping, e.g. st.session_state)."""
+    global _memo_store
+    _memo_store = store
+
+
+def _memo_for(dataset_id):
+    """Memo dict for ``dataset_id``, dropping the previous dataset's memo."""
+    memo = _memo_store.get('dataset_memo')
+    if memo is None or memo['dataset_id'] != dataset_id:
+        memo = {'dataset_id': dataset_id, 'tables': {}}
+        _memo_store['dataset_memo'] = memo
+    return memo
+
+
+def clear_dataset_memo():
+    """Drop memoized columns, bitmaps and cubes but keep the memoized views."""
+    memo = _memo_store.get('dataset_memo')
+    if memo is not None:
+        memo['tables'] = {}
+
+
+def _dataset_memo(df):
+    """Memo dict for a view returned by dataset_views, else None.
+
+    Matched by identity: pandas carries ``attrs`` through copies, sorts and subsets,
+    so a tag alone would hand a same-length but reordered frame stale memos.
+    """
+    memo = _memo_store.get('dataset_memo')
+    if memo is None or 'views' not in memo:
+        return None
+    for name, view in zip(('sales', 'inventory', 'promotions'), memo['views']):
+        if df is view:
+            return memo['tables'].setdefault(name, {})
+    return None
+
+
+# =============================================================================
+# STREAMING SALES INGEST (CHUNKED -> PARQUET)
+# =============================================================================
+
+SALES_CHUNK_ROWS = 250_000
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+
+def _file_size(file):
+    """Size in bytes of an uploaded file or path."""
+    if hasattr(file, 'size'):
+        return file.size
+    if hasattr(file, 'getbuffer'):
+        return file.getbuffer().nbytes
+    return os.path.getsize(file)
+
+
+def _chunk_to_arrow(chunk, schema):
+    """Convert a processed chunk to Arrow, pinning it to the first chunk's schema."""
+    if schema is None:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        # An all-null column in the first chunk has no type yet; assume text. Category
+        # codes are widened to int32 so later chunks with more categories still fit.
+        fields = []
+        for field in table.schema:
+            if pa.types.is_null(field.type):
+                field = pa.field(field.name, pa.string())
+            elif pa.types.is_dictionary(field.type):
+                field = pa.field(field.name, pa.dictionary(pa.int32(), field.type.value_type))
+            fields.append(field)
+        schema = pa.schema(fields, metadata=table.schema.metadata)
+        return table.cast(schema), schema
+    chunk = chunk.reindex(columns=schema.names)
+    return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False), schema
+
+
+def stream_sales_to_parquet(sales_file, path, dimensions, chunksize=SALES_CHUNK_ROWS, progress_callback=None):
+    """Read sales in fixed-size chunks, derive columns per chunk and append to Parquet.
+
+    Only one raw chunk is held in memory at a time. Each chunk is keyed against
+    ``dimensions`` (see add_fact_table), which is extended in place.
+    ``progress_callback(fraction, rows)`` is called after each chunk. Returns
+    ``(rows_written, error)``.
+    """
+    total_bytes = max(_file_size(sales_file), 1)
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for chunk in read_csv_with_schema(sales_file, 'sales', chunksize=chunksize):
+            chunk = normalize_columns(chunk, 'sales')
+            if writer is None:
+                sales_error = check_required_columns(chunk, 'sales')
+                if sales_error:
+                    return 0, f"Sales: {sales_error}"
+            chunk = add_fact_table(process_sales_frame(chunk), dimensions)
+            table, schema = _chunk_to_arrow(chunk, schema)
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table)
+            rows += len(chunk)
+            if progress_callback is not None and hasattr(sales_file, 'tell'):
+                progress_callback(min(sales_file.tell() / total_bytes, 1.0), rows)
+    except Exception as e:
+        return rows, f"Sales: {e}"
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        return 0, "Sales: Empty dataframe"
+    return rows, None
+
+# =============================================================================
+# SAMPLE DATA GENERATOR (COMPREHENSIVE) - FIXED
+# =============================================================================
+
+def _format_ids(prefix, numbers, width):
+    """Format an integer array as an Index of zero-padded string IDs (e.g. SKU_0001).
+
+    Every ID has the same length, so the digits are written straight into one byte
+    matrix that becomes the data buffer of an Arrow string array, skipping the
+    per-element Python strings that ``np.char`` would build.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if len(numbers):
+        width = max(width, len(str(numbers.max())))
+    head = np.frombuffer(prefix.encode(), dtype=np.uint8)
+    chars = np.empty((len(numbers), len(head) + width), dtype=np.uint8)
+    chars[:, :len(head)] = head
+    rest = numbers.copy()
+    for position in range(chars.shape[1] - 1, len(head) - 1, -1):
+        chars[:, position] = ord('0') + rest % 10
+        rest //= 10
+    offsets = np.arange(0, chars.size + 1, chars.shape[1], dtype=np.int32)
+    ids = pa.StringArray.from_buffers(len(numbers), pa.py_buffer(offsets), pa.py_buffer(chars))
+    return pd.Index(pd.array(ids, dtype='str'))
+
+
+def generate_sample_data(n_sales=75000, n_skus=150, n_stores=25, n_days=365, n_promos=300, seed=42):
+    """Generate comprehensive sample data for demonstration.
+
+    Returns sales, inventory and promotions fact tables plus the products and
+    stores dimension tables they reference by sku_id/store_id. Every column is
+    drawn in bulk from a seeded ``np.random.Generator`` and all seasonal, weekday
+    and store-type factors are applied with array ops, so the generator scales
+    to millions of sales rows without Python-level loops.
+    """
+    rng = np.random.default_rng(seed)
+    
+    # Generate date range
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=n_days)
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    n_dates = len(dates)
+    
+    # Generate SKUs with categories and brands
+    categories = pd.Index(['Electronics', 'Clothing', 'Food & Beverage', 'Home & Garden', 'Health & Beauty', 'Sports & Outdoors', 'Toys & Games', 'Automotive'])
+    brands = pd.Index(['Brand A', 'Brand B', 'Brand C', 'Brand D', 'Brand E', 'Premium Brand', 'Value Brand', 'Local Brand'])
+    # Price varies by category (same order as `categories`)
+    category_base_price = np.array([200, 80, 25, 100, 50, 120, 40, 150], dtype=float)
+    # Category affects reorder points: Electronics, Clothing, Food & Beverage
+    category_reorder_factor = np.array([0.7, 0.9, 1.5, 1.0, 1.0, 1.0, 1.0, 1.0])
+    
+    skus = _format_ids('SKU_', np.arange(1, n_skus + 1), 4)
+    sku_cat_idx = rng.integers(0, len(categories), n_skus)
+    sku_brand_idx = rng.integers(0, len(brands), n_skus)
+    sku_base = category_base_price[sku_cat_idx]
+    sku_prices = np.round(rng.uniform(sku_base * 0.5, sku_base * 2), 2)
+    sku_categories = categories.take(sku_cat_idx)
+    sku_brands = brands.take(sku_brand_idx)
+    
+    # Generate stores with regions
+    regions = pd.Index(['Dubai', 'Abu Dhabi', 'Sharjah', 'Ajman', 'RAK'])
+    store_types = pd.Index(['Hypermarket', 'Supermarket', 'Express', 'Online'])
+    store_type_sales_factor = np.array([1.3, 1.0, 0.7, 1.1])
+    store_type_base_stock = np.array([300, 150, 50, 200])
+    
+    stores = _format_ids('STORE_', np.arange(1, n_stores + 1), 3)
+    store_region_idx = rng.choice(len(regions), n_stores, p=[0.35, 0.25, 0.2, 0.1, 0.1])
+    store_type_idx = rng.choice(len(store_types), n_stores, p=[0.2, 0.4, 0.3, 0.1])
+    store_regions = regions.take(store_region_idx)
+    store_types_map = store_types.take(store_type_idx)
+    
+    # Generate promotion types
+    promo_types = pd.Index(['BOGO', 'Percentage Off', 'Bundle Deal', 'Flash Sale', 'Clearance', 'Seasonal', 'Member Exclusive', 'Buy More Save More'])
+    
+    # ==========================================================================
+    # SALES DATA
+    # ==========================================================================
+    
+    # Per-date factors and dimension strings live in small lookup tables that are
+    # gathered by each row's index (Index.take) instead of derived row by row.
+    date_month = dates.month.to_numpy()
+    # Seasonal patterns indexed by month number (index 0 unused): Ramadan/Eid (Mar-Apr),
+    # summer (Jul-Aug), back to school (Sep), year-end shopping (Nov-Dec)
+    month_seasonal = np.array([1.0, 1.0, 1.0, 1.4, 1.4, 1.0, 1.0, 0.85, 0.85, 1.15, 1.0, 1.3, 1.3])
+    date_seasonal = month_seasonal[date_month]
+    # Weekday effect: Friday-Sunday weekend boost
+    date_weekday_factor = np.where(dates.weekday.to_numpy() >= 4, 1.2, 1.0)
+    
+    payment_methods = pd.Index(['Cash', 'Credit Card', 'Debit Card', 'Mobile Payment', 'Online'])
+    
+    sku_idx = rng.integers(0, n_skus, n_sales)
+    store_idx = rng.integers(0, n_stores, n_sales)
+    date_idx = rng.integers(0, n_dates, n_sales)
+    
+    demand_factor = (
+        date_seasonal[date_idx]
+        * date_weekday_factor[date_idx]
+        * store_type_sales_factor[store_type_idx][store_idx]
+    )
+    quantity = np.maximum(1, (rng.exponential(3, n_sales) * demand_factor).astype(np.int64))
+    unit_price = sku_prices[sku_idx]
+    
+    sales_df = pd.DataFrame({
+        'transaction_id': _format_ids('TXN_', np.arange(1, n_sales + 1), 7),
+        'sku_id': skus.take(sku_idx),
+        'store_id': stores.take(store_idx),
+        'quantity_sold': quantity,
+        'unit_price': unit_price,
+        # Store hours 8-22; date parts are derived from this on demand
+        'transaction_date': pd.DatetimeIndex(dates.normalize().to_numpy()[date_idx] + rng.integers(8, 23, n_sales).astype('timedelta64[h]')),
+        'customer_id': _format_ids('CUST_', np.arange(10000), 5).take(rng.integers(1, 10000, n_sales)),
+        'payment_method': payment_methods.take(rng.choice(len(payment_methods), n_sales, p=[0.15, 0.35, 0.25, 0.15, 0.1])),
+    })
+    sales_df['revenue'] = quantity * unit_price
+    
+    # ==========================================================================
+    # INVENTORY DATA
+    # ==========================================================================
+    
+    warehouses = pd.Index(['WH-Dubai-1', 'WH-Dubai-2', 'WH-AbuDhabi', 'WH-Sharjah', 'WH-Central'])
+    
+    # One record per (sku, store) pair, SKU-major like the original nested loop
+    n_records = n_skus * n_stores
+    inv_sku_idx = np.repeat(np.arange(n_skus), n_stores)
+    inv_store_idx = np.tile(np.arange(n_stores), n_skus)
+    
+    # Base stock varies by store type
+    base_stock = store_type_base_stock[store_type_idx][inv_store_idx]
+    cat_factor = category_reorder_factor[sku_cat_idx][inv_sku_idx]
+    
+    stock = np.maximum(0, rng.normal(base_stock, base_stock * 0.4).astype(np.int64))
+    reorder_pt = (base_stock * 0.3 * cat_factor).astype(np.int64)
+    reorder_qty = (base_stock * 0.6).astype(np.int64)
+    
+    # Last 30 dates for inventory updates
+    recent_dates = dates[-30:]
+    
+    inventory_df = pd.DataFrame({
+        'record_id': _format_ids('INV_', np.arange(1, n_records + 1), 6),
+        'sku_id': skus.take(inv_sku_idx),
+        'store_id': stores.take(inv_store_idx),
+        'stock_level': stock,
+        'reorder_point': reorder_pt,
+        'reorder_quantity': reorder_qty,
+        'last_updated': recent_dates[rng.integers(0, len(recent_dates), n_records)],
+        'warehouse_location': warehouses.take(rng.integers(0, len(warehouses), n_records)),
+        'supplier_id': _format_ids('SUP_', np.arange(50), 3).take(rng.integers(1, 50, n_records)),
+    })
+    inventory_df['stock_status'] = np.select(
+        [stock <= reorder_pt * 0.5, stock <= reorder_pt],
+        ['Critical', 'Low'],
+        default='Healthy'
+    )
+    inventory_df['stock_ratio'] = inventory_df['stock_level'] / inventory_df['reorder_point'].replace(0, 1)
+    
+    # Calculate days of stock (based on average daily sales). Inventory rows are
+    # laid out as sku * n_stores + store, so a bincount over the same key gives
+    # each record's sales total without a join; pairs with no sales default to 1.
+    pair_key = sku_idx * n_stores + store_idx
+    pair_units = np.bincount(pair_key, weights=quantity, minlength=n_records)
+    pair_has_sales = np.bincount(pair_key, minlength=n_records) > 0
+    inventory_df['avg_daily_sales'] = np.where(pair_has_sales, pair_units / n_days, 1)
+    inventory_df['days_of_stock'] = (inventory_df['stock_level'] / inventory_df['avg_daily_sales'].replace(0, 0.1)).round(1)
+    inventory_df['days_of_stock'] = inventory_df['days_of_stock'].clip(0, 365)
+    
+    # ==========================================================================
+    # PROMOTIONS DATA
+    # ==========================================================================
+    
+    promo_names = pd.Index(['Summer Sale', 'Ramadan Special', 'Eid Offer', 'Back to School', 'Weekend Deal', 
+                            'Flash Friday', 'Member Exclusive', 'Clearance Event', 'New Arrival Promo', 'Bundle Bonanza'])
+    
+    promo_sku_idx = rng.integers(0, n_skus, n_promos)
+    # Some promos are store-wide
+    promo_stores = stores.append(pd.Index(['ALL'])).take(rng.integers(0, n_stores + 1, n_promos))
+    promo_type = promo_types.take(rng.integers(0, len(promo_types), n_promos))
+    
+    # Discount varies by type
+    discount = np.select(
+        [promo_type == 'BOGO', promo_type == 'Clearance', promo_type == 'Flash Sale'],
+        [
+            np.full(n_promos, 50),
+            rng.choice([40, 50, 60, 70], n_promos),
+            rng.choice([20, 25, 30, 35], n_promos),
+        ],
+        default=rng.choice([5, 10, 15, 20, 25, 30], n_promos)
+    )
+    
+    # Use dates excluding last 30 days for promotion start dates
+    promo_start_dates = dates[:-30]
+    start = promo_start_dates[rng.integers(0, len(promo_start_dates), n_promos)]
+    duration = rng.integers(3, 21, n_promos)
+    end = start + pd.to_timedelta(duration, unit='D')
+    
+    # Budget based on discount and duration
+    budget = discount * duration * rng.integers(100, 500, n_promos)
+    
+    # Target and actual lift
+    target_lift = discount * 0.8 + rng.uniform(-5, 10, n_promos)
+    actual_lift = target_lift * rng.uniform(0.7, 1.3, n_promos)
+    
+    promotions_df = pd.DataFrame({
+        'promotion_id': _format_ids('PROMO_', np.arange(1, n_promos + 1), 4),
+        'sku_id': skus.take(promo_sku_idx),
+        'store_id': promo_stores,
+        'promotion_type': promo_type,
+        'discount_percentage': discount,
+        'start_date': start,
+        'end_date': end,
+        'budget': budget,
+        'target_sales_lift': np.round(target_lift, 1),
+        'actual_sales_lift': np.round(actual_lift, 1),
+        'promotion_name': promo_names.take(rng.integers(0, len(promo_names), n_promos)),
+    })
+    promotions_df['duration_days'] = (promotions_df['end_date'] - promotions_df['start_date']).dt.days
+    promotions_df['is_active'] = (promotions_df['start_date'] <= pd.Timestamp.now()) & (promotions_df['end_date'] >= pd.Timestamp.now())
+    promotions_df['roi'] = ((promotions_df['actual_sales_lift'] / 100) * promotions_df['budget'] * 2 - promotions_df['budget']) / promotions_df['budget'] * 100
+    
+    # ==========================================================================
+    # DIMENSION TABLES
+    # ==========================================================================
+    
+    products_df = pd.DataFrame({
+        'sku_id': skus,
+        'category': sku_categories,
+        'brand': sku_brands,
+        'unit_price': sku_prices,
+    })
+    stores_df = pd.DataFrame({
+        'store_id': stores,
+        'region': store_regions,
+        'store_type': store_types_map,
+    })
+    
+    return sales_df, inventory_df, promotions_df, products_df, stores_df
+
+# =============================================================================
+# PERSISTENT DATASET CACHE (CONTENT-ADDRESSED PARQUET)
+# =============================================================================
+
+# Bump when the processed-frame layout changes in a way the source hash cannot see
+DATA_CACHE_VERSION = "3"
+DATA_CACHE_DIR = Path(os.environ.get("PROMO_PULSE_CACHE_DIR", ".promo_pulse_cache"))
+DATA_CACHE_MAX_ENTRIES = 20
+DATASET_FRAMES = ('sales', 'inventory', 'promotions', 'products', 'stores')
+
+
+# Everything that shapes the cached frames; its source and values are hashed into
+# every cache key. Names are resolved when the hash is first taken, so functions
+# defined further down the module can be listed.
+CACHE_SHAPING_NAMES = (
+    # Constants
+    'DATA_CACHE_VERSION', 'COLUMN_SCHEMA', 'RAW_COLUMN_ALIASES', 'REQUIRED_COLUMNS',
+    'SALES_DATE_COLUMNS', 'TIMESTAMP_FORMATS', 'TIMESTAMP_NULL_TOKENS', 'TIMESTAMP_SENTINELS',
+    'TIMESTAMP_WINDOW_START', 'TIMESTAMP_ISSUES', 'STAR_DIMENSIONS', 'DATASET_FRAMES',
+    # Reading and typing
+    'canonical_column_names', 'normalize_columns', 'read_csv_with_schema', '_downcast_numeric',
+    'apply_column_schema', 'rescue_timestamps',
+    # Processing
+    'process_sales_frame', 'process_inventory_frame', 'process_promotions_frame',
+    'load_dimension_files', 'load_and_process_data',
+    # Star schema
+    'start_dimensions', '_key_codes', 'add_fact_table', 'finalize_dimensions', 'build_star_schema',
+    # Streaming ingest
+    '_chunk_to_arrow', 'stream_sales_to_parquet', 'ingest_uploaded_data',
+    # Sample data and the cache layout
+    '_format_ids', 'generate_sample_data', 'load_sample_frames', 'write_dataset_cache',
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _processing_code_version():
+    """Hash CACHE_SHAPING_NAMES (function source, constant values) so changes invalidate the cache."""
+    module = sys.modules[__name__]
+    parts = []
+    for name in CACHE_SHAPING_NAMES:
+        value = getattr(module, name)
+        parts.append(inspect.getsource(value) if callable(value) else f"{name}={value!r}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:12]
+
+
+def dataset_cache_key(kind, *parts):
+    """Build a cache key from the input bytes/parameters plus the processing-code version."""
+    digest = hashlib.sha256()
+    digest.update(f"{kind}|{_processing_code_version()}".encode())
+    for part in parts:
+        if part is None:
+            part = b""
+        elif not isinstance(part, bytes):
+            part = repr(part).encode()
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return f"{kind}-{digest.hexdigest()[:24]}"
+
+
+def dataset_cache_exists(cache_key):
+    """Whether a complete cache entry exists for a key."""
+    return (DATA_CACHE_DIR / cache_key / "_complete").exists()
+
+
+def read_dataset_cache(cache_key):
+    """Return the cached frames dict for a key, or None on a miss."""
+    if not dataset_cache_exists(cache_key):
+        return None
+    entry_dir = DATA_CACHE_DIR / cache_key
+    try:
+        frames = {}
+        for name in DATASET_FRAMES:
+            path = entry_dir / f"{name}.parquet"
+            frames[name] = pd.read_parquet(path) if path.exists() else None
+        os.utime(entry_dir)  # Mark as recently used for pruning
+        return frames
+    except Exception:
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return None
+
+
+def write_dataset_cache(cache_key, frames, staged_files=None):
+    """Persist processed frames under a key; failures only cost a cache miss.
+
+    ``staged_files`` maps frame names to Parquet files already written inside
+    DATA_CACHE_DIR (e.g. by the streaming ingest); they are moved, not rewritten.
+    """
+    staged_files = staged_files or {}
+    entry_dir = DATA_CACHE_DIR / cache_key
+    tmp_dir = DATA_CACHE_DIR / f".{cache_key}.{os.getpid()}.tmp"
+    try:
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        for name in DATASET_FRAMES:
+            df = frames.get(name)
+            if name in staged_files:
+                os.replace(staged_files[name], tmp_dir / f"{name}.parquet")
+            elif df is not None:
+                df.to_parquet(tmp_dir / f"{name}.parquet", index=False)
+        (tmp_dir / "_complete").touch()
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        _prune_dataset_cache()
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _prune_dataset_cache():
+    """Keep only the most recently used cache entries."""
+    entries = sorted(
+        (p for p in DATA_CACHE_DIR.iterdir() if p.is_dir() and not p.name.startswith(".")),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for stale in entries[DATA_CACHE_MAX_ENTRIES:]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def load_sample_frames(seed=42, as_of=None):
+    """Load the sample star-schema frames from the disk cache, generating them on a miss.
+
+    ``as_of`` (today's date) is part of the key because the sample window ends today.
+    """
+    cache_key = dataset_cache_key("sample", seed, as_of or datetime.now().date())
+    frames = read_dataset_cache(cache_key)
+    if frames is None:
+        sales_df, inventory_df, promotions_df, products_df, stores_df = generate_sample_data(seed=seed)
+        frames = build_star_schema(
+            apply_column_schema(sales_df, 'sales'),
+            apply_column_schema(inventory_df, 'inventory'),
+            apply_column_schema(promotions_df, 'promotions'),
+            products_df, stores_df
+        )
+        write_dataset_cache(cache_key, frames)
+    return frames
+
+
+def ingest_uploaded_data(cache_key, sales_file, inventory_file, promotions_file, products_file=None, stores_file=None, progress_callback=None):
+    """Process uploads into the disk cache unless an entry for their content exists.
+
+    Sales files above STREAMING_THRESHOLD_BYTES are ingested in chunks straight to
+    Parquet so peak memory stays bounded. Returns ``(frames, error)``; ``frames`` is
+    None when the result only lives on disk (cache hit or streamed ingest).
+    """
+    if dataset_cache_exists(cache_key):
+        return None, None
+    
+    for uploaded in (sales_file, inventory_file, promotions_file, products_file, stores_file):
+        if uploaded is not None and hasattr(uploaded, 'seek'):
+            uploaded.seek(0)
+    
+    if _file_size(sales_file) < STREAMING_THRESHOLD_BYTES:
+        frames, error = load_and_process_data(
+            sales_file, inventory_file, promotions_file, products_file, stores_file
+        )
+        if error:
+            return None, error
+        write_dataset_cache(cache_key, frames)
+        return frames, None
+    
+    try:
+        inventory_df, promotions_df, products_df, stores_df, error = load_dimension_files(
+            inventory_file, promotions_file, products_file, stores_file
+        )
+        if not error:
+            dimensions = start_dimensions(products_df, stores_df)
+            inventory_df = add_fact_table(inventory_df, dimensions)
+            promotions_df = add_fact_table(promotions_df, dimensions)
+    except Exception as e:
+        error = str(e)
+    if error:
+        return None, error
+    
+    DATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    staged_sales = DATA_CACHE_DIR / f".ingest-{cache_key}.{os.getpid()}.parquet"
+    _, error = stream_sales_to_parquet(sales_file, staged_sales, dimensions, progress_callback=progress_callback)
+    if error:
+        staged_sales.unlink(missing_ok=True)
+        return None, error
+    
+    write_dataset_cache(
+        cache_key,
+        {'inventory': inventory_df, 'promotions': promotions_df, **finalize_dimensions(dimensions)},
+        staged_files={'sales': staged_sales}
+    )
+    if not dataset_cache_exists(cache_key):
+        staged_sales.unlink(missing_ok=True)
+        return None, "Could not write the ingested sales data to the local cache"
+    return None, None
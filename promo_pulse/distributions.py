@@ -0,0 +1,156 @@
+"""Distribution summaries for histogram, box, violin and scatter charts.
+
+Large columns are summarized with numpy (bin counts, quartiles and fences, a
+binned Gaussian KDE, 2D density grids) so a chart ships a few hundred numbers
+instead of every raw value. Below ``RAW_POINTS_THRESHOLD`` rows the charts keep
+plotting raw values. Scatter plots pick SVG, WebGL or a density grid by point
+count and overlay a deterministic stratified sample.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Columns with more values than this are summarized server-side
+RAW_POINTS_THRESHOLD = 5_000
+
+# Outlier markers kept per box (evenly spread over the sorted outliers)
+MAX_OUTLIER_POINTS = 300
+
+# Scatter rendering tiers: SVG up to the first limit, WebGL up to the second,
+# a 2D density grid plus a stratified WebGL sample beyond
+SVG_POINTS_LIMIT = 2_000
+WEBGL_POINTS_LIMIT = 25_000
+SCATTER_SAMPLE_SIZE = 2_000
+DENSITY_BINS = 60
+
+# Evaluation grid of the KDE curve
+KDE_POINTS = 200
+KDE_GRID_BINS = 1024
+
+
+def use_raw_points(n_values, threshold=None):
+    """Whether a column of ``n_values`` is small enough to plot raw."""
+    return n_values <= (RAW_POINTS_THRESHOLD if threshold is None else threshold)
+
+
+def finite_values(values):
+    """Non-missing, finite float values of a Series or array."""
+    if isinstance(values, pd.Series):
+        values = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    values = np.asarray(values, dtype='float64')
+    return values[np.isfinite(values)]
+
+
+def histogram_bins(values, nbins=30):
+    """Equal-width ``(counts, edges)`` over the value range."""
+    values = finite_values(values)
+    if len(values) == 0:
+        return np.zeros(0, dtype='int64'), np.zeros(1)
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.histogram(values, bins=nbins, range=(lo, hi))
+
+
+def box_stats(values, whisker=1.5, max_outliers=MAX_OUTLIER_POINTS):
+    """Quartiles, Tukey fences, mean and a capped sample of outliers.
+
+    Quartiles use linear interpolation, matching Plotly's default box method.
+    Returns None when there are no values.
+    """
+    values = finite_values(values)
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - whisker * iqr) & (values <= q3 + whisker * iqr)]
+    outliers = np.sort(values[(values < q1 - whisker * iqr) | (values > q3 + whisker * iqr)])
+    if len(outliers) > max_outliers:
+        outliers = outliers[np.linspace(0, len(outliers) - 1, max_outliers).round().astype(int)]
+    return {
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'lowerfence': float(inside.min()) if len(inside) else float(q1),
+        'upperfence': float(inside.max()) if len(inside) else float(q3),
+        'mean': float(values.mean()),
+        'outliers': outliers,
+        'count': len(values)
+    }
+
+
+def kde_curve(values, points=KDE_POINTS, grid_bins=KDE_GRID_BINS):
+    """Gaussian KDE ``(x, density)`` with Silverman's bandwidth.
+
+    Values are first binned onto a fine grid and the kernel is convolved over the
+    bin counts, so the cost is linear in rows rather than rows x grid points.
+    """
+    values = finite_values(values)
+    n = len(values)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+
+    std = values.std(ddof=1) if n > 1 else 0.0
+    iqr = np.subtract(*np.quantile(values, [0.75, 0.25]))
+    spread = min(std, iqr / 1.34) if iqr > 0 else std
+    bandwidth = 0.9 * spread * n ** -0.2 if spread > 0 else max(abs(values[0]) * 0.01, 0.5)
+
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=grid_bins, range=(lo, hi))
+    centers = (edges[:-1] + edges[1:]) / 2
+    step = edges[1] - edges[0]
+
+    half_width = int(np.ceil(4 * bandwidth / step))
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    smoothed = np.convolve(counts, kernel)[half_width:half_width + grid_bins]
+    density = smoothed / (n * bandwidth * np.sqrt(2 * np.pi))
+
+    x = np.linspace(centers[0], centers[-1], points)
+    return x, np.interp(x, centers, density)
+
+
+def scatter_mode(n_points):
+    """'svg', 'webgl' or 'density' for a scatter of ``n_points``."""
+    if n_points <= SVG_POINTS_LIMIT:
+        return 'svg'
+    if n_points <= WEBGL_POINTS_LIMIT:
+        return 'webgl'
+    return 'density'
+
+
+def stratified_sample(df, n, by=None):
+    """Up to ``n`` rows with each ``by`` group kept in proportion (at least one row each).
+
+    Rows are ranked by a hash of their index rather than a random draw, so the
+    same rows are picked on every rerun and a row that survives a filter change
+    stays in the sample.
+    """
+    if len(df) <= n:
+        return df
+    rank = pd.util.hash_pandas_object(df.index, index=False).to_numpy()
+    if by is None or by not in df.columns:
+        return df.iloc[np.sort(np.argpartition(rank, n)[:n])]
+
+    positions = []
+    for idx in df.groupby(by, observed=True).indices.values():
+        quota = min(len(idx), max(1, int(n * len(idx) / len(df))))
+        if quota < len(idx):
+            idx = idx[np.argpartition(rank[idx], quota)[:quota]]
+        positions.append(idx)
+    return df.iloc[np.sort(np.concatenate(positions))]
+
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    """2D histogram of the finite ``(x, y)`` pairs: ``(x_centers, y_centers, counts)``.
+
+    ``counts`` is indexed ``[y, x]`` as a heatmap expects.
+    """
+    x = pd.to_numeric(pd.Series(x), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    y = pd.to_numeric(pd.Series(y), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    keep = np.isfinite(x) & np.isfinite(y)
+    if not keep.any():
+        return np.zeros(0), np.zeros(0), np.zeros((0, 0), dtype='int64')
+    counts, x_edges, y_edges = np.histogram2d(x[keep], y[keep], bins=bins)
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, counts.T
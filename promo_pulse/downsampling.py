@@ -0,0 +1,66 @@
+"""Largest-Triangle-Three-Buckets (LTTB) downsampling for trend charts.
+
+A trend with more points than its chart has room for is cut to a point budget
+while keeping its shape: the series is split into equal buckets and each bucket
+keeps the point forming the largest triangle with the previously kept point and
+the next bucket's average, so peaks and troughs survive.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Rendered pixels per kept point
+PIXELS_PER_POINT = 2
+MIN_POINTS = 50
+
+
+def point_budget(width_px, pixels_per_point=PIXELS_PER_POINT):
+    """Points worth drawing on a chart ``width_px`` wide."""
+    return max(MIN_POINTS, int(width_px // pixels_per_point))
+
+
+def _numeric_axis(x):
+    """Dates as epoch numbers, numbers as-is, anything else by position."""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.to_numpy('datetime64[ns]').astype('int64').astype('float64')
+    if pd.api.types.is_numeric_dtype(x):
+        return x.to_numpy(dtype='float64', na_value=np.nan)
+    return np.arange(len(x), dtype='float64')
+
+
+def lttb_indices(x, y, n_out):
+    """Positions of the ``n_out`` points LTTB keeps (first and last always kept)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.nan_to_num(np.asarray(x, dtype='float64'))
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))
+    # n_out - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype='int64')
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def downsample(df, x, y, n_out):
+    """Rows of ``df`` (sorted by ``x``) that LTTB keeps for the ``y`` column."""
+    if len(df) <= n_out:
+        return df
+    return df.iloc[lttb_indices(_numeric_axis(df[x]), df[y], n_out)]
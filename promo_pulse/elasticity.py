@@ -0,0 +1,244 @@
+"""Price elasticity estimated from the sales history.
+
+Demand is modelled per (SKU, day) as ``log(units) = a_sku + b * log(net price)``.
+The SKU intercepts are removed by demeaning within SKU, and the slopes come from
+grouped least squares (``np.bincount`` sums), per category and per SKU. Each
+category fit is combined with the CATEGORY_ELASTICITY prior by precision
+weighting, so a noisy fit barely moves the prior and a tight one dominates it.
+SKU slopes are shrunk toward their category (empirical Bayes). Fitted tables are
+cached to disk under the dataset id and the filter they were fitted on.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .analytics import filter_rows
+from .data import DATA_CACHE_DIR, _dataset_memo
+from .simulation import CATEGORY_ELASTICITY, DEFAULT_ELASTICITY
+
+
+ELASTICITY_MODEL_VERSION = "2"
+# Dot-prefixed so the dataset cache's pruning skips it; bounded separately
+ELASTICITY_CACHE_DIR = DATA_CACHE_DIR / ".elasticity"
+ELASTICITY_CACHE_MAX_ENTRIES = 64
+ELASTICITY_CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+# A category fit needs this many (SKU, day) observations; otherwise the prior is used
+MIN_OBSERVATIONS = 30
+# Mean squared within-SKU log-price deviation below which prices count as constant
+# (demeaning a constant price leaves float noise, not variation)
+MIN_PRICE_VARIANCE = 1e-12
+# Standard deviation of the category prior
+PRIOR_SD = 0.5
+ELASTICITY_BOUNDS = (-5.0, -0.1)
+
+ESTIMATE_COLUMNS = [
+    'level', 'category', 'sku_id', 'elasticity', 'std_error', 'raw_estimate',
+    'observations', 'weight', 'source'
+]
+
+
+def demand_observations(sales_df):
+    """Units and quantity-weighted net price per (SKU, day), with the SKU's category."""
+    columns = ['sku_id', 'transaction_date', 'quantity_sold', 'unit_price']
+    if any(column not in sales_df.columns for column in columns):
+        return pd.DataFrame(columns=['sku_id', 'category', 'units', 'price'])
+
+    rows = sales_df[columns + (['category'] if 'category' in sales_df.columns else [])]
+    rows = rows[(rows['quantity_sold'] > 0) & (rows['unit_price'] > 0) & rows['transaction_date'].notna()]
+    revenue = rows['quantity_sold'].astype('float64') * rows['unit_price'].astype('float64')
+    grouped = rows.assign(revenue=revenue, day=rows['transaction_date'].dt.normalize()).groupby(
+        ['sku_id', 'day'], observed=True, sort=False
+    )
+    observations = grouped.agg(units=('quantity_sold', 'sum'), revenue=('revenue', 'sum'))
+    if 'category' in rows.columns:
+        observations['category'] = grouped['category'].first()
+    else:
+        observations['category'] = 'All'
+    observations = observations.reset_index()
+    observations['price'] = observations['revenue'] / observations['units']
+    return observations[['sku_id', 'category', 'units', 'price']]
+
+
+def _group_sums(codes, values, n_groups):
+    return np.bincount(codes, weights=values, minlength=n_groups)
+
+
+def _prior(category):
+    """``(elasticity, source)`` used when the data cannot identify a category."""
+    if category in CATEGORY_ELASTICITY:
+        return CATEGORY_ELASTICITY[category], 'prior'
+    return DEFAULT_ELASTICITY, 'default'
+
+
+def fit_elasticities(observations):
+    """Category and SKU elasticities from demand_observations; see the module docstring.
+
+    Returns a DataFrame with ESTIMATE_COLUMNS: one 'category' row per category and
+    one 'sku' row per SKU.
+    """
+    if observations.empty:
+        return pd.DataFrame(columns=ESTIMATE_COLUMNS)
+
+    sku_codes, skus = pd.factorize(observations['sku_id'].astype(str))
+    cat_codes, categories = pd.factorize(observations['category'].astype(str))
+    n_skus, n_cats = len(skus), len(categories)
+    x = np.log(observations['price'].to_numpy(dtype='float64'))
+    y = np.log(observations['units'].to_numpy(dtype='float64'))
+
+    # Remove SKU intercepts
+    sku_n = _group_sums(sku_codes, None, n_skus)
+    xd = x - (_group_sums(sku_codes, x, n_skus) / sku_n)[sku_codes]
+    yd = y - (_group_sums(sku_codes, y, n_skus) / sku_n)[sku_codes]
+    sku_sxx = _group_sums(sku_codes, xd * xd, n_skus)
+    sku_sxy = _group_sums(sku_codes, xd * yd, n_skus)
+    sku_category = np.zeros(n_skus, dtype='int64')
+    sku_category[sku_codes] = cat_codes
+
+    # Pooled within-SKU slope and its standard error per category
+    cat_sxx = _group_sums(sku_category, sku_sxx, n_cats)
+    cat_sxy = _group_sums(sku_category, sku_sxy, n_cats)
+    cat_n = _group_sums(cat_codes, None, n_cats)
+    cat_skus = _group_sums(sku_category, None, n_cats)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cat_slope = np.where(cat_sxx > MIN_PRICE_VARIANCE * cat_n, cat_sxy / cat_sxx, np.nan)
+        residuals = yd - np.nan_to_num(cat_slope)[cat_codes] * xd
+        dof = np.maximum(cat_n - cat_skus - 1, 1)
+        cat_sigma2 = _group_sums(cat_codes, residuals * residuals, n_cats) / dof
+        cat_se = np.sqrt(cat_sigma2 / cat_sxx)
+
+    low, high = ELASTICITY_BOUNDS
+    rows = []
+    cat_final = np.empty(n_cats)
+    cat_fitted = np.zeros(n_cats, dtype=bool)
+    for c, category in enumerate(categories):
+        prior, prior_source = _prior(category)
+        slope, se = cat_slope[c], cat_se[c]
+        fitted = cat_n[c] >= MIN_OBSERVATIONS and np.isfinite(slope) and np.isfinite(se) and se > 0
+        if fitted:
+            # Precision-weighted combination of the prior and the fit
+            data_precision = 1 / se ** 2
+            prior_precision = 1 / PRIOR_SD ** 2
+            estimate = (prior * prior_precision + slope * data_precision) / (prior_precision + data_precision)
+            std_error = 1 / np.sqrt(prior_precision + data_precision)
+            weight = data_precision / (prior_precision + data_precision)
+            source = 'fitted'
+        else:
+            estimate, std_error, weight, source = prior, PRIOR_SD, 0.0, prior_source
+        cat_final[c] = np.clip(estimate, low, high)
+        cat_fitted[c] = fitted
+        rows.append(('category', category, None, cat_final[c], std_error,
+                     slope if np.isfinite(slope) else np.nan, int(cat_n[c]), weight, source))
+
+    # SKU slopes shrunk toward the category (empirical Bayes, per category)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sku_slope = np.where(sku_sxx > MIN_PRICE_VARIANCE * sku_n, sku_sxy / sku_sxx, np.nan)
+        sku_var = cat_sigma2[sku_category] / sku_sxx
+    for c in range(n_cats):
+        members = (sku_category == c) & np.isfinite(sku_slope) & np.isfinite(sku_var)
+        if not cat_fitted[c] or members.sum() < 2:
+            tau2 = 0.0
+        else:
+            tau2 = max(np.var(sku_slope[members]) - np.mean(sku_var[members]), 0.0)
+        weights = np.where(members, tau2 / (tau2 + sku_var), 0.0) if tau2 > 0 else np.zeros(n_skus)
+        for s in np.flatnonzero(sku_category == c):
+            w = float(np.nan_to_num(weights[s]))
+            estimate = w * sku_slope[s] + (1 - w) * cat_final[c] if w > 0 else cat_final[c]
+            std_error = np.sqrt(w * sku_var[s]) if w > 0 else rows[c][4]
+            # Data share of the estimate: the SKU's own plus its part of the category's
+            weight = w + (1 - w) * rows[c][7]
+            rows.append(('sku', categories[c], skus[s], float(np.clip(estimate, low, high)), float(std_error),
+                         sku_slope[s], int(sku_n[s]), weight, 'fitted (shrunk)' if w > 0 else rows[c][8]))
+
+    return pd.DataFrame(rows, columns=ESTIMATE_COLUMNS)
+
+
+def _selection_key(selections):
+    """Canonical, hashable form of filter_rows selections (None values dropped)."""
+    return tuple(sorted(
+        (column, tuple(sorted(map(str, values))) if isinstance(values, (list, tuple, set)) else (str(values),))
+        for column, values in (selections or {}).items() if values is not None
+    ))
+
+
+def _cache_key(dataset_id, selection_key):
+    """Key from the dataset id, the filter, the priors and the model version."""
+    digest = hashlib.sha256()
+    digest.update(
+        f"{ELASTICITY_MODEL_VERSION}|{sorted(CATEGORY_ELASTICITY.items())}|{DEFAULT_ELASTICITY}|"
+        f"{PRIOR_SD}|{dataset_id}|{selection_key}".encode()
+    )
+    return digest.hexdigest()[:24]
+
+
+def _prune_elasticity_cache():
+    """Keep the most recently used tables within the entry and byte caps."""
+    tables = sorted(ELASTICITY_CACHE_DIR.glob("*.parquet"), key=lambda p: p.stat().st_mtime, reverse=True)
+    total_bytes = 0
+    for position, table in enumerate(tables):
+        total_bytes += table.stat().st_size
+        if position >= ELASTICITY_CACHE_MAX_ENTRIES or total_bytes > ELASTICITY_CACHE_MAX_BYTES:
+            table.unlink(missing_ok=True)
+
+
+def estimate_elasticities(sales_df, selections=None):
+    """Fitted elasticity table for a dataset's sales view, filtered by ``selections``.
+
+    ``selections`` are filter_rows selections. Tables are memoized per dataset and
+    filter, and cached on disk under the dataset id and filter, so a cache hit
+    skips the sales scan entirely. Views without a dataset id are fitted directly.
+    A failed cache write only costs a refit on the next cold start.
+    """
+    memo = _dataset_memo(sales_df)
+    selection_key = _selection_key(selections)
+    if memo is not None and ('elasticities', selection_key) in memo:
+        return memo[('elasticities', selection_key)]
+
+    path = None
+    estimates = None
+    if memo is not None:
+        path = ELASTICITY_CACHE_DIR / f"{_cache_key(sales_df.attrs['dataset_id'], selection_key)}.parquet"
+        if path.exists():
+            try:
+                estimates = pd.read_parquet(path)
+                os.utime(path)  # Mark as recently used for pruning
+            except Exception:
+                estimates = None
+    if estimates is None:
+        estimates = fit_elasticities(demand_observations(filter_rows(sales_df, selections or {})))
+        if path is not None:
+            try:
+                ELASTICITY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                estimates.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+                _prune_elasticity_cache()
+            except Exception:
+                pass
+
+    if memo is not None:
+        memo[('elasticities', selection_key)] = estimates
+    return estimates
+
+
+def lookup_elasticity(estimates, category, sku_id=None):
+    """Elasticity for a SKU (if given and fitted) or its category, falling back to the prior.
+
+    Returns a dict with ``elasticity``, ``std_error``, ``source``, ``observations``,
+    ``weight`` (the data's share of the estimate; 0 for the prior) and ``level``.
+    """
+    fields = ['elasticity', 'std_error', 'source', 'observations', 'weight', 'level']
+    rows = estimates
+    if sku_id is not None:
+        match = rows[(rows['level'] == 'sku') & (rows['sku_id'] == str(sku_id))]
+        if len(match):
+            return match.iloc[0][fields].to_dict()
+    match = rows[(rows['level'] == 'category') & (rows['category'] == str(category))]
+    if len(match):
+        return match.iloc[0][fields].to_dict()
+    prior, source = _prior(category)
+    return {'elasticity': prior, 'std_error': PRIOR_SD, 'source': source, 'observations': 0,
+            'weight': 0.0, 'level': 'category'}
@@ -0,0 +1,107 @@
+"""Memo cache for built chart figures.
+
+Figures are keyed by a fingerprint of the aggregated frames they plot plus the
+chart options, so a rerun that does not change a chart's data reuses the figure
+instead of rebuilding and restyling it. Entries are the figures' serialized JSON,
+so a caller holding a figure rebuilt from an entry cannot change the entry. The
+cache is LRU with caps on both the entry count and the total serialized size.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+FIGURE_CACHE_MAX_ENTRIES = 128
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+
+def _digest_part(digest, part):
+    if isinstance(part, (pd.DataFrame, pd.Series)):
+        if isinstance(part, pd.DataFrame):
+            digest.update(repr((list(part.columns), list(part.dtypes))).encode())
+        else:
+            digest.update(repr((part.name, part.dtype)).encode())
+        digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+    elif isinstance(part, np.ndarray) and part.dtype != object:
+        # repr() elides the middle of large arrays
+        digest.update(repr((part.dtype, part.shape)).encode())
+        digest.update(np.ascontiguousarray(part).tobytes())
+    elif isinstance(part, (list, tuple, dict)):
+        items = sorted(part.items(), key=repr) if isinstance(part, dict) else enumerate(part)
+        digest.update(type(part).__name__.encode())
+        for label, item in items:
+            digest.update(repr(label).encode())
+            _digest_part(digest, item)
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b'\x1f')
+
+
+def fingerprint(*parts):
+    """Stable hex digest: frames and arrays by content, containers by item, the rest by repr."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _digest_part(digest, part)
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU of ``key -> figure JSON`` bounded by entries and bytes."""
+
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES, max_bytes=FIGURE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """The cached figure JSON for ``key`` (marked most recent), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, figure_json):
+        """Store a figure's serialized JSON, evicting least recent entries."""
+        size = len(figure_json)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (figure_json, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        """Entry count, bytes held and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,205 @@
+"""Lightweight span profiler for dashboard reruns.
+
+A trace is started per rerun (per thread, so concurrent sessions do not mix) and
+nested spans record wall time, rows scanned and bytes produced. Instrumented code
+pays a single thread-local lookup when no trace is active.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+_local = threading.local()
+
+# Groupby methods timed by instrument_pandas()
+GROUPBY_METHODS = (
+    'agg', 'aggregate', 'apply', 'count', 'first', 'idxmax', 'max', 'mean',
+    'median', 'min', 'nunique', 'size', 'sum',
+)
+
+# Patched (class, method, original) entries and the number of runs using them
+_instrument_lock = threading.Lock()
+_instrument_users = 0
+_pandas_originals = []
+
+
+def active_trace():
+    """The trace being recorded on this thread, or None."""
+    return getattr(_local, 'trace', None)
+
+
+def start_trace(name, instrument=False):
+    """Start recording spans on this thread; returns the trace dict.
+
+    With ``instrument`` pandas groupby methods are patched for the life of the trace
+    (see instrument_pandas) and restored by finish_trace.
+    """
+    if instrument:
+        instrument_pandas()
+    trace = {
+        'name': name,
+        'started_at': time.time(),
+        'origin': time.perf_counter(),
+        'spans': [],
+        'stack': [],
+        'instrumented': instrument
+    }
+    _local.trace = trace
+    return trace
+
+
+def finish_trace():
+    """Stop recording on this thread; returns the finished trace (or None).
+
+    The result is JSON-serializable: span times are ms from the trace start.
+    """
+    trace = active_trace()
+    if trace is None:
+        return None
+    _local.trace = None
+    if trace['instrumented']:
+        restore_pandas()
+    duration_ms = (time.perf_counter() - trace['origin']) * 1000
+    return {
+        'name': trace['name'],
+        'started_at': trace['started_at'],
+        'duration_ms': round(duration_ms, 3),
+        'spans': trace['spans']
+    }
+
+
+@contextmanager
+def span(name, kind='code', rows=None):
+    """Record a nested span on the active trace; yields the span dict (or None).
+
+    Callers may set ``span['rows']`` / ``span['bytes']`` inside the block.
+    """
+    trace = active_trace()
+    if trace is None:
+        yield None
+        return
+
+    record = {
+        'name': name,
+        'kind': kind,
+        'depth': len(trace['stack']),
+        'start_ms': round((time.perf_counter() - trace['origin']) * 1000, 3),
+        'duration_ms': None,
+        'rows': rows,
+        'bytes': None
+    }
+    trace['spans'].append(record)
+    trace['stack'].append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        trace['stack'].pop()
+
+
+def profiled(kind='code'):
+    """Decorator that records each call as a span named after the function.
+
+    When the first argument is a DataFrame its length is recorded as rows scanned.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if active_trace() is None:
+                return func(*args, **kwargs)
+            rows = len(args[0]) if args and isinstance(args[0], pd.DataFrame) else None
+            with span(func.__name__, kind, rows):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _groupby_wrapper(method, original):
+    """Time a groupby method; nested groupby calls fold into the outermost one."""
+    @functools.wraps(original)
+    def wrapper(self, *args, **kwargs):
+        trace = active_trace()
+        if trace is None or getattr(_local, 'in_groupby', False):
+            return original(self, *args, **kwargs)
+        keys = self.keys if isinstance(self.keys, (list, tuple)) else [self.keys]
+        label = ", ".join(str(key) if isinstance(key, str) else type(key).__name__ for key in keys)
+        _local.in_groupby = True
+        try:
+            with span(f"groupby({label}).{method}", 'groupby', len(self.obj)):
+                return original(self, *args, **kwargs)
+        finally:
+            _local.in_groupby = False
+    return wrapper
+
+
+def instrument_pandas():
+    """Wrap the common groupby aggregations so they appear as spans.
+
+    Calls are counted across threads: the patches go in on the first call and the
+    original methods come back once every call is matched by restore_pandas().
+    """
+    global _instrument_users
+    from pandas.core.groupby.generic import DataFrameGroupBy, SeriesGroupBy
+
+    with _instrument_lock:
+        _instrument_users += 1
+        if _instrument_users > 1:
+            return
+        for cls in (DataFrameGroupBy, SeriesGroupBy):
+            for method in GROUPBY_METHODS:
+                original = getattr(cls, method, None)
+                if original is None:
+                    continue
+                # Methods inherited from GroupBy are restored by deleting the override
+                _pandas_originals.append((cls, method, cls.__dict__.get(method)))
+                setattr(cls, method, _groupby_wrapper(method, original))
+
+
+def restore_pandas():
+    """Undo one instrument_pandas() call; the last one puts the originals back."""
+    global _instrument_users
+    with _instrument_lock:
+        if _instrument_users == 0:
+            return
+        _instrument_users -= 1
+        if _instrument_users:
+            return
+        for cls, method, original in reversed(_pandas_originals):
+            if original is None:
+                delattr(cls, method)
+            else:
+                setattr(cls, method, original)
+        _pandas_originals.clear()
+
+
+def span_summary(trace):
+    """Per-name totals for a finished trace: calls, total/self ms, rows and bytes."""
+    spans = trace['spans']
+    if not spans:
+        return pd.DataFrame(columns=['name', 'kind', 'calls', 'total_ms', 'self_ms', 'rows', 'bytes'])
+
+    df = pd.DataFrame(spans)
+    # Self time = own duration minus the direct children's durations
+    child_ms = [0.0] * len(spans)
+    open_spans = []
+    for i, record in enumerate(spans):
+        while open_spans and spans[open_spans[-1]]['depth'] >= record['depth']:
+            open_spans.pop()
+        if open_spans:
+            child_ms[open_spans[-1]] += record['duration_ms'] or 0
+        open_spans.append(i)
+    df['self_ms'] = df['duration_ms'].fillna(0) - child_ms
+
+    summary = df.groupby(['name', 'kind'], sort=False).agg(
+        calls=('name', 'size'),
+        total_ms=('duration_ms', 'sum'),
+        self_ms=('self_ms', 'sum'),
+        rows=('rows', 'sum'),
+        bytes=('bytes', 'sum')
+    ).reset_index()
+    return summary.sort_values('self_ms', ascending=False).round(3)
@@ -0,0 +1,808 @@
+"""Simulation engine: the what-if promotion model behind the simulator section.
+
+Inputs are plain values and a filtered sales frame, outputs are dicts/DataFrames,
+so scenarios can be scored without Streamlit.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# MODEL PARAMETERS
+# =============================================================================
+
+# Price elasticity by category (fallback DEFAULT_ELASTICITY). These are also the
+# priors the fitted estimates in promo_pulse.elasticity are shrunk toward.
+CATEGORY_ELASTICITY = {
+    'Electronics': -1.8,
+    'Clothing': -2.2,
+    'Food & Beverage': -1.2,
+    'Home & Garden': -1.5,
+    'Health & Beauty': -1.6,
+    'Sports & Outdoors': -1.7,
+    'Toys & Games': -2.0,
+    'Automotive': -1.3
+}
+DEFAULT_ELASTICITY = -1.5
+
+# Elasticity adjustment by promotion type
+PROMO_TYPE_MULTIPLIERS = {
+    "Percentage Off": 1.0,
+    "BOGO": 1.4,
+    "Bundle Deal": 1.2,
+    "Flash Sale": 1.5,
+    "Clearance": 1.1,
+    "Member Exclusive": 0.9
+}
+
+SENSITIVITY_DISCOUNTS = list(range(5, 75, 5))
+
+# Share of revenue assumed to be cost of goods (40% margin)
+COGS_RATIO = 0.6
+
+
+# =============================================================================
+# SCENARIO MODEL
+# =============================================================================
+
+def simulation_baseline(sim_sales):
+    """Daily revenue/units and average price of the matching sales history.
+
+    Falls back to fixed defaults when no history matches the scenario.
+    """
+    if len(sim_sales) > 0:
+        total_days = (sim_sales['transaction_date'].max() - sim_sales['transaction_date'].min()).days
+        total_days = max(total_days, 1)
+        return {
+            'daily_revenue': sim_sales['revenue'].sum() / total_days,
+            'daily_units': sim_sales['quantity_sold'].sum() / total_days,
+            'avg_price': sim_sales['unit_price'].mean(),
+            'rows': len(sim_sales)
+        }
+    return {'daily_revenue': 10000, 'daily_units': 100, 'avg_price': 100, 'rows': 0}
+
+
+def duration_factor(duration):
+    """Lift multiplier for campaign length: urgency for short, fatigue for long."""
+    if duration <= 3:
+        return 1.3  # Urgency boost
+    elif duration <= 7:
+        return 1.0
+    elif duration <= 14:
+        return 0.9  # Some fatigue
+    return 0.8  # Promotion fatigue
+
+
+def audience_factor(audience):
+    """Lift multiplier for the targeted customer segments."""
+    factor = 1.0
+    if "Premium Members" in audience:
+        factor *= 1.15
+    if "High-Value Customers" in audience:
+        factor *= 1.1
+    if len(audience) > 2:
+        factor *= 1.05
+    return factor
+
+
+def category_elasticity(category, elasticity=None):
+    """``elasticity`` when given (e.g. fitted from history), else the category prior."""
+    if elasticity is not None:
+        return elasticity
+    return CATEGORY_ELASTICITY.get(category, DEFAULT_ELASTICITY)
+
+
+def simulate_promotion(baseline, category, discount, duration, promo_type, audience, budget,
+                       elasticity=None):
+    """Project one promotion scenario against ``baseline`` (see simulation_baseline).
+
+    ``elasticity`` overrides the category prior (see category_elasticity).
+    Returns a dict with the lift, projected/incremental units and revenue, costs
+    and ROI.
+    """
+    base_elasticity = category_elasticity(category, elasticity)
+    adjusted_elasticity = base_elasticity * PROMO_TYPE_MULTIPLIERS.get(promo_type, 1.0)
+    duration_mult = duration_factor(duration)
+    audience_mult = audience_factor(audience)
+
+    # Lift from elasticity, then duration and audience effects
+    volume_lift = abs(adjusted_elasticity) * discount / 100
+    final_lift = volume_lift * duration_mult * audience_mult
+
+    # Projected metrics
+    projected_daily_units = baseline['daily_units'] * (1 + final_lift)
+    discounted_price = baseline['avg_price'] * (1 - discount / 100)
+    projected_daily_revenue = projected_daily_units * discounted_price
+
+    # Campaign totals
+    projected_total_units = projected_daily_units * duration
+    projected_total_revenue = projected_daily_revenue * duration
+    baseline_revenue = baseline['daily_revenue'] * duration
+    baseline_units = baseline['daily_units'] * duration
+
+    # Cost and ROI
+    discount_cost = (baseline['avg_price'] * discount / 100) * projected_total_units
+    gross_profit = projected_total_revenue - projected_total_revenue * COGS_RATIO
+
+    return {
+        'adjusted_elasticity': adjusted_elasticity,
+        'duration_factor': duration_mult,
+        'audience_factor': audience_mult,
+        'final_lift': final_lift,
+        'projected_daily_units': projected_daily_units,
+        'projected_daily_revenue': projected_daily_revenue,
+        'projected_total_units': projected_total_units,
+        'projected_total_revenue': projected_total_revenue,
+        'baseline_revenue': baseline_revenue,
+        'baseline_units': baseline_units,
+        'incremental_units': projected_total_units - baseline_units,
+        'incremental_revenue': projected_total_revenue - baseline_revenue,
+        'discount_cost': discount_cost,
+        'gross_profit': gross_profit,
+        'net_impact': gross_profit - discount_cost,
+        'roi': ((projected_total_revenue - baseline_revenue) / budget * 100) if budget > 0 else 0
+    }
+
+
+def discount_sensitivity(baseline, result, duration, budget, discounts=SENSITIVITY_DISCOUNTS):
+    """Revenue impact and ROI of the scenario in ``result`` across discount levels."""
+    disc = np.asarray(discounts, dtype='float64') / 100
+    lift = abs(result['adjusted_elasticity']) * disc * result['duration_factor'] * result['audience_factor']
+    units = baseline['daily_units'] * (1 + lift) * duration
+    revenue_impacts = units * baseline['avg_price'] * (1 - disc) - result['baseline_revenue']
+
+    return pd.DataFrame({
+        'Discount': list(discounts),
+        'Revenue Impact': revenue_impacts,
+        'ROI': revenue_impacts / budget * 100 if budget > 0 else np.zeros(len(disc))
+    })
+
+
+# =============================================================================
+# INVENTORY
+# =============================================================================
+
+# Used when the snapshot has no lead_time_days column or a pair has no value
+DEFAULT_LEAD_TIME_DAYS = 7
+
+
+def stock_positions(inventory_df):
+    """Latest stock, reorder point/quantity and lead time per (SKU, store).
+
+    Accepts ``stock_level`` or ``stock_on_hand``. Returns None when the snapshot
+    has no stock column or no SKU/store keys.
+    """
+    stock_column = next((c for c in ('stock_level', 'stock_on_hand') if c in inventory_df.columns), None)
+    if stock_column is None or not {'sku_id', 'store_id'} <= set(inventory_df.columns) or inventory_df.empty:
+        return None
+
+    snapshot = inventory_df
+    if 'last_updated' in snapshot.columns:
+        snapshot = snapshot.sort_values('last_updated', kind='stable', na_position='first')
+    snapshot = snapshot.drop_duplicates(['sku_id', 'store_id'], keep='last')
+
+    def column(name, default):
+        if name not in snapshot.columns:
+            return np.full(len(snapshot), default, dtype='float64')
+        return pd.to_numeric(snapshot[name], errors='coerce').fillna(default).to_numpy(dtype='float64')
+
+    return pd.DataFrame({
+        'sku_id': snapshot['sku_id'].astype(str).to_numpy(),
+        'store_id': snapshot['store_id'].astype(str).to_numpy(),
+        'stock': np.maximum(column(stock_column, 0), 0),
+        'reorder_point': column('reorder_point', 0),
+        'reorder_quantity': column('reorder_quantity', np.nan),
+        'lead_time': np.maximum(column('lead_time_days', DEFAULT_LEAD_TIME_DAYS), 1)
+    })
+
+
+def _sell_through(demand, opening, reorder_point, reorder_quantity, lead_time):
+    """Units sold from ``demand`` (days x ... x pairs) against each pair's stock.
+
+    Sales are capped at the stock on hand. When stock reaches the reorder point,
+    an order of ``reorder_quantity`` lands ``lead_time`` days later; a pair with no
+    reorder quantity orders back up to its ``opening`` level. Dimensions between
+    the first and last are independent scenarios sharing the stock positions.
+    Returns the sold units, shaped like ``demand``.
+    """
+    shape = demand.shape[1:]
+    never = np.iinfo('int64').max
+    opening = np.broadcast_to(opening, shape)
+    reorder_point = np.broadcast_to(reorder_point, shape)
+    reorder_quantity = np.broadcast_to(reorder_quantity, shape)
+    lead_time = np.broadcast_to(lead_time, shape)
+
+    order_up_to_opening = np.isnan(reorder_quantity)
+
+    # Masked ufuncs instead of fancy indexing: the masks span every draw x pair
+    stock = opening.astype(demand.dtype)
+    arrival_day = np.full(shape, never)
+    arrival_quantity = np.zeros(shape, dtype=demand.dtype)
+    sold = np.empty_like(demand)
+    for day in range(len(demand)):
+        arriving = arrival_day == day
+        np.add(stock, arrival_quantity, out=stock, where=arriving)
+        arrival_day[arriving] = never
+
+        np.minimum(demand[day], stock, out=sold[day])
+        stock -= sold[day]
+
+        ordering = (stock <= reorder_point) & (arrival_day == never)
+        np.copyto(arrival_day, day + lead_time, where=ordering)
+        np.copyto(
+            arrival_quantity,
+            np.where(order_up_to_opening, np.maximum(opening - stock, 0), reorder_quantity),
+            where=ordering
+        )
+    return sold
+
+
+def _stock_arrays(pairs):
+    """``(opening, reorder_point, reorder_quantity, lead_time)`` arrays of stock positions."""
+    return (
+        pairs['stock'].to_numpy(dtype='float64'),
+        pairs['reorder_point'].to_numpy(dtype='float64'),
+        pairs['reorder_quantity'].to_numpy(dtype='float64'),
+        pairs['lead_time'].to_numpy().astype('int64')
+    )
+
+
+def simulate_inventory(sim_sales, inventory_df, lift, duration):
+    """Sell the promotion's uplifted demand against stock on hand for every (SKU, store).
+
+    Each pair's daily demand is its historical rate (units over the history's
+    span, as in simulation_baseline) times ``1 + lift``, sold day by day against
+    stock and reorders (see _sell_through) with all pairs updated at once as
+    arrays. Demand from pairs missing from the snapshot is left uncapped.
+
+    Returns None without history or stock positions. Otherwise returns a dict with:
+    - ``pairs``: one row per tracked pair, with ``stockout_day`` 1-based and NaN
+      when the pair never runs out
+    - per-day ``daily_demand`` / ``daily_sold`` / ``daily_lost`` arrays
+    - totals
+    """
+    positions = stock_positions(inventory_df)
+    if positions is None or len(sim_sales) == 0 or not {'sku_id', 'store_id'} <= set(sim_sales.columns):
+        return None
+    started = time.perf_counter()
+
+    total_days = max((sim_sales['transaction_date'].max() - sim_sales['transaction_date'].min()).days, 1)
+    demand = sim_sales.groupby(['sku_id', 'store_id'], observed=True)['quantity_sold'].sum().reset_index()
+    demand['sku_id'] = demand['sku_id'].astype(str)
+    demand['store_id'] = demand['store_id'].astype(str)
+    demand['daily_demand'] = demand['quantity_sold'].to_numpy(dtype='float64') / total_days * (1 + lift)
+    pairs = demand[['sku_id', 'store_id', 'daily_demand']].merge(
+        positions, on=['sku_id', 'store_id'], how='left', indicator=True
+    )
+    tracked = (pairs['_merge'] == 'both').to_numpy()
+    untracked_daily = float(pairs.loc[~tracked, 'daily_demand'].sum())
+    pairs = pairs.loc[tracked].drop(columns='_merge').reset_index(drop=True)
+
+    rate = pairs['daily_demand'].to_numpy()
+    demand = np.broadcast_to(rate, (duration, len(rate)))
+    sold = _sell_through(demand, *_stock_arrays(pairs))
+    lost = demand - sold
+    short = lost > 1e-9
+    stockout_day = np.where(short.any(axis=0), short.argmax(axis=0) + 1.0, np.nan)
+    sold_total = sold.sum(axis=0)
+    daily_sold = sold.sum(axis=1)
+    daily_lost = lost.sum(axis=1)
+
+    pairs['demand'] = rate * duration
+    pairs['sold'] = sold_total
+    pairs['lost'] = pairs['demand'] - sold_total
+    pairs['stockout_day'] = stockout_day
+    total_demand = float(pairs['demand'].sum()) + untracked_daily * duration
+    lost_units = float(daily_lost.sum())
+    return {
+        'pairs': pairs,
+        'daily_demand': np.full(duration, rate.sum() + untracked_daily),
+        'daily_sold': daily_sold + untracked_daily,
+        'daily_lost': daily_lost,
+        'demand': total_demand,
+        'lost_units': lost_units,
+        'untracked_units': untracked_daily * duration,
+        'fill_rate': 1 - lost_units / total_demand if total_demand > 0 else 1.0,
+        'tracked_pairs': len(pairs),
+        'stockout_pairs': int(np.isfinite(stockout_day).sum()),
+        'first_stockout_day': float(np.nanmin(stockout_day)) if np.isfinite(stockout_day).any() else None,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def cap_to_availability(result, availability, baseline, discount, duration, budget):
+    """simulate_promotion ``result`` with the units availability lost taken out.
+
+    Revenue, discount cost, profit and ROI are recomputed from the capped units;
+    the baseline is left as history recorded it.
+    """
+    units = max(result['projected_total_units'] - availability['lost_units'], 0.0)
+    revenue = units * baseline['avg_price'] * (1 - discount / 100)
+    discount_cost = baseline['avg_price'] * discount / 100 * units
+    gross_profit = revenue * (1 - COGS_RATIO)
+    incremental_revenue = revenue - result['baseline_revenue']
+    return dict(
+        result,
+        projected_daily_units=units / duration,
+        projected_daily_revenue=revenue / duration,
+        projected_total_units=units,
+        projected_total_revenue=revenue,
+        incremental_units=units - result['baseline_units'],
+        incremental_revenue=incremental_revenue,
+        discount_cost=discount_cost,
+        gross_profit=gross_profit,
+        net_impact=gross_profit - discount_cost,
+        roi=incremental_revenue / budget * 100 if budget > 0 else 0,
+        lost_units=availability['lost_units']
+    )
+
+
+# =============================================================================
+# RESPONSE SURFACE
+# =============================================================================
+
+GRID_DIMS = ('discount', 'duration', 'promo_type', 'audience', 'region', 'store_type')
+GRID_METRICS = (
+    'lift', 'projected_units', 'projected_revenue', 'baseline_revenue',
+    'incremental_revenue', 'discount_cost', 'net_impact', 'roi'
+)
+# Coordinate label of the aggregate (unfiltered) region/store-type level
+ALL_LABEL = 'All'
+
+
+def _along(values, axis, ndim=len(GRID_DIMS)):
+    """``values`` as an array broadcastable along ``axis`` of the grid."""
+    shape = [1] * ndim
+    shape[axis] = -1
+    return np.asarray(values, dtype='float64').reshape(shape)
+
+
+def _duration_factors(durations):
+    """Vectorized duration_factor."""
+    durations = np.asarray(durations)
+    return np.select([durations <= 3, durations <= 7, durations <= 14], [1.3, 1.0, 0.9], 0.8)
+
+
+def baseline_grid(sim_sales, regions, store_types):
+    """Daily units/revenue, average price and row counts per (region, store type).
+
+    ``regions``/``store_types`` may include ALL_LABEL for the aggregate level.
+    Each cell matches simulation_baseline on the correspondingly filtered rows.
+    """
+    shape = (len(regions), len(store_types))
+    daily_units = np.full(shape, 100.0)
+    daily_revenue = np.full(shape, 10000.0)
+    avg_price = np.full(shape, 100.0)
+
+    has_region = 'region' in sim_sales.columns
+    has_store_type = 'store_type' in sim_sales.columns
+    for i, region in enumerate(regions):
+        if region != ALL_LABEL and not has_region:
+            continue
+        region_rows = sim_sales if region == ALL_LABEL else sim_sales[sim_sales['region'] == region]
+        cells = {ALL_LABEL: region_rows}
+        if has_store_type:
+            cells.update(dict(tuple(region_rows.groupby('store_type', observed=True))))
+        for j, store_type in enumerate(store_types):
+            cell = cells.get(store_type)
+            if cell is None or len(cell) == 0:
+                continue
+            baseline = simulation_baseline(cell)
+            daily_units[i, j] = baseline['daily_units']
+            daily_revenue[i, j] = baseline['daily_revenue']
+            avg_price[i, j] = baseline['avg_price']
+
+    return {
+        'daily_units': daily_units,
+        'daily_revenue': daily_revenue,
+        'avg_price': avg_price
+    }
+
+
+def simulate_grid(sim_sales, category, budget, discounts=SENSITIVITY_DISCOUNTS, durations=(7,),
+                  promo_types=tuple(PROMO_TYPE_MULTIPLIERS), audiences=(("All Customers",),),
+                  regions=(ALL_LABEL,), store_types=(ALL_LABEL,), elasticity=None):
+    """Evaluate simulate_promotion over the full scenario grid in one broadcast.
+
+    ``sim_sales`` is the sales history for the product scope (not yet filtered by
+    region or store type); ``elasticity`` overrides the category prior. Returns
+    ``{'dims', 'coords', 'metrics'}`` where each
+    metric is an array shaped by GRID_DIMS and ``coords`` labels each axis.
+    """
+    coords = {
+        'discount': list(discounts),
+        'duration': list(durations),
+        'promo_type': list(promo_types),
+        'audience': [tuple(audience) for audience in audiences],
+        'region': list(regions),
+        'store_type': list(store_types)
+    }
+    base = baseline_grid(sim_sales, coords['region'], coords['store_type'])
+    region_axis = GRID_DIMS.index('region')
+
+    discount = _along(coords['discount'], 0) / 100
+    duration = _along(coords['duration'], 1)
+    elasticity = abs(category_elasticity(category, elasticity)) * _along(
+        [PROMO_TYPE_MULTIPLIERS.get(t, 1.0) for t in coords['promo_type']], 2
+    )
+    audience = _along([audience_factor(a) for a in coords['audience']], 3)
+    cell = {
+        name: values.reshape((1,) * region_axis + values.shape)
+        for name, values in base.items()
+    }
+
+    lift = elasticity * discount * _along(_duration_factors(coords['duration']), 1) * audience
+    projected_units = cell['daily_units'] * (1 + lift) * duration
+    projected_revenue = projected_units * cell['avg_price'] * (1 - discount)
+    baseline_revenue = cell['daily_revenue'] * duration
+    incremental_revenue = projected_revenue - baseline_revenue
+    discount_cost = cell['avg_price'] * discount * projected_units
+    gross_profit = projected_revenue * (1 - COGS_RATIO)
+    roi = incremental_revenue / budget * 100 if budget > 0 else np.zeros_like(incremental_revenue)
+
+    shape = tuple(len(coords[dim]) for dim in GRID_DIMS)
+    metrics = {
+        'lift': lift,
+        'projected_units': projected_units,
+        'projected_revenue': projected_revenue,
+        'baseline_revenue': baseline_revenue,
+        'incremental_revenue': incremental_revenue,
+        'discount_cost': discount_cost,
+        'net_impact': gross_profit - discount_cost,
+        'roi': roi
+    }
+    return {
+        'dims': GRID_DIMS,
+        'coords': coords,
+        'metrics': {name: np.broadcast_to(values, shape) for name, values in metrics.items()}
+    }
+
+
+def grid_slice(grid, **fixed):
+    """Sub-grid with the given dimensions fixed to one coordinate each."""
+    index = []
+    dims = []
+    coords = {}
+    for dim in grid['dims']:
+        if dim in fixed:
+            value = tuple(fixed[dim]) if dim == 'audience' else fixed[dim]
+            index.append(grid['coords'][dim].index(value))
+        else:
+            index.append(slice(None))
+            dims.append(dim)
+            coords[dim] = grid['coords'][dim]
+    index = tuple(index)
+    return {
+        'dims': tuple(dims),
+        'coords': coords,
+        'metrics': {name: values[index] for name, values in grid['metrics'].items()}
+    }
+
+
+def grid_frame(grid, metrics=None):
+    """Long DataFrame of the grid: one row per scenario, one column per coordinate/metric."""
+    metrics = metrics or list(grid['metrics'])
+    index = pd.MultiIndex.from_product([grid['coords'][dim] for dim in grid['dims']], names=grid['dims'])
+    frame = pd.DataFrame({name: grid['metrics'][name].ravel() for name in metrics}, index=index)
+    return frame.reset_index()
+
+
+def best_scenario(grid, metric='incremental_revenue', mask=None):
+    """Coordinates and metrics of the scenario maximizing ``metric`` (optionally within ``mask``).
+
+    Returns None when no scenario is allowed.
+    """
+    values = np.asarray(grid['metrics'][metric], dtype='float64')
+    if mask is not None:
+        values = np.where(mask, values, np.nan)
+    if np.isnan(values).all():
+        return None
+    position = np.unravel_index(np.nanargmax(values), values.shape)
+    scenario = {dim: grid['coords'][dim][i] for dim, i in zip(grid['dims'], position)}
+    scenario.update({name: float(array[position]) for name, array in grid['metrics'].items()})
+    return scenario
+
+
+# =============================================================================
+# OPTIMIZER
+# =============================================================================
+
+# Discount search bounds (%) and the coarse/fine steps of the grid refinement
+OPTIMIZER_BOUNDS = (1, 70)
+OPTIMIZER_COARSE_STEP = 1.0
+OPTIMIZER_FINE_STEP = 0.1
+
+OPTIMIZER_COLUMNS = [
+    'discount', 'duration', 'promo_type', 'incremental_revenue', 'net_impact', 'margin',
+    'discount_cost', 'projected_units', 'projected_revenue', 'roi'
+]
+
+
+def scenario_margin(metrics):
+    """Net impact as a share of projected revenue (-inf where there is no revenue)."""
+    revenue = metrics['projected_revenue']
+    return np.divide(metrics['net_impact'], revenue, out=np.full(np.shape(revenue), -np.inf),
+                     where=revenue > 0)
+
+
+def pareto_frontier(revenue, margin):
+    """Positions of the points no other point beats on both ``revenue`` and ``margin``.
+
+    Ordered by descending revenue (so ascending margin along the frontier).
+    """
+    revenue = np.asarray(revenue, dtype='float64')
+    margin = np.asarray(margin, dtype='float64')
+    if len(revenue) == 0:
+        return np.zeros(0, dtype='int64')
+    order = np.lexsort((-margin, -revenue))
+    ordered_margin = margin[order]
+    best_so_far = np.maximum.accumulate(ordered_margin)
+    keep = np.r_[True, ordered_margin[1:] > best_so_far[:-1]]
+    return order[keep]
+
+
+def optimize_promotion(sim_sales, category, budget, audience=("All Customers",), region=ALL_LABEL,
+                       store_type=ALL_LABEL, margin_floor=0.0, stock_cap=None,
+                       objective='incremental_revenue', durations=range(1, 31),
+                       promo_types=tuple(PROMO_TYPE_MULTIPLIERS), bounds=OPTIMIZER_BOUNDS,
+                       elasticity=None):
+    """Best discount x duration x type under the budget, margin floor and stock cap.
+
+    A scenario is feasible when its discount cost is within ``budget``, its margin
+    (scenario_margin) is at least ``margin_floor`` and, if ``stock_cap`` is set,
+    its projected units fit in stock. The grid is searched at
+    OPTIMIZER_COARSE_STEP discount steps, then refined to OPTIMIZER_FINE_STEP
+    around each (duration, type)'s best feasible coarse discount, where the
+    binding constraint usually sits.
+
+    Returns a dict with ``best`` (row of the feasible maximum of ``objective`` or
+    None), ``frontier`` (feasible scenarios Pareto-optimal on incremental revenue
+    vs. margin, the same measure as ``margin_floor``; OPTIMIZER_COLUMNS), and ``evaluated``, ``feasible`` and
+    ``seconds``.
+    """
+    started = time.perf_counter()
+    audience = tuple(audience)
+    low, high = bounds
+
+    def evaluate(discounts):
+        grid = simulate_grid(
+            sim_sales, category, budget, discounts=discounts, durations=durations,
+            promo_types=promo_types, audiences=(audience,), regions=(region,),
+            store_types=(store_type,), elasticity=elasticity
+        )
+        grid = grid_slice(grid, audience=audience, region=region, store_type=store_type)
+        margin = scenario_margin(grid['metrics'])
+        feasible = (grid['metrics']['discount_cost'] <= budget) & (margin >= margin_floor)
+        if stock_cap is not None:
+            feasible &= grid['metrics']['projected_units'] <= stock_cap
+        return grid, margin, feasible
+
+    coarse_discounts = np.arange(low, high + OPTIMIZER_COARSE_STEP / 2, OPTIMIZER_COARSE_STEP)
+    grid, margin, feasible = evaluate(coarse_discounts)
+
+    # Refine around each (duration, type)'s best feasible coarse discount
+    score = np.where(feasible, grid['metrics'][objective], -np.inf)
+    has_feasible = np.isfinite(score.max(axis=0))
+    centers = np.unique(coarse_discounts[score.argmax(axis=0)[has_feasible]])
+    window = np.arange(-OPTIMIZER_COARSE_STEP, OPTIMIZER_COARSE_STEP + OPTIMIZER_FINE_STEP / 2, OPTIMIZER_FINE_STEP)
+    fine_discounts = np.clip((centers[:, None] + window).ravel(), low, high)
+    discounts = np.unique(np.round(np.concatenate([coarse_discounts, fine_discounts]), 6))
+    if len(discounts) > len(coarse_discounts):
+        grid, margin, feasible = evaluate(discounts)
+
+    index = pd.MultiIndex.from_product([grid['coords'][dim] for dim in grid['dims']], names=grid['dims'])
+    scenarios = pd.DataFrame(
+        {name: grid['metrics'][name].ravel() for name in OPTIMIZER_COLUMNS if name in grid['metrics']},
+        index=index
+    ).reset_index()
+    scenarios['margin'] = margin.ravel()
+    scenarios = scenarios.loc[feasible.ravel(), OPTIMIZER_COLUMNS].reset_index(drop=True)
+
+    best = scenarios.loc[scenarios[objective].idxmax()].to_dict() if len(scenarios) else None
+    frontier = scenarios.iloc[pareto_frontier(scenarios['incremental_revenue'], scenarios['margin'])]
+    return {
+        'best': best,
+        'frontier': frontier.reset_index(drop=True),
+        'evaluated': int(feasible.size),
+        'feasible': len(scenarios),
+        'seconds': time.perf_counter() - started
+    }
+
+
+# =============================================================================
+# MONTE CARLO
+# =============================================================================
+
+MC_DRAW_OPTIONS = (10_000, 25_000, 50_000, 100_000)
+MC_CHUNK = 5_000
+MC_TIME_BUDGET = 1.0
+MC_PERCENTILES = (10, 50, 90)
+# Upper bound on days x draws x pairs cells per stock-capping step
+MC_CAP_CELLS = 2_000_000
+
+# Elasticity spread is kept between these shares of its magnitude
+ELASTICITY_MIN_CV = 0.05
+ELASTICITY_MAX_CV = 0.5
+ELASTICITY_DEFAULT_CV = 0.2
+# Spread of the duration (fatigue) multiplier is kept between these shares of
+# duration_factor
+FATIGUE_MIN_CV = 0.05
+FATIGUE_MAX_CV = 0.3
+FATIGUE_DEFAULT_CV = 0.1
+
+
+def daily_history(sim_sales):
+    """Units and revenue per calendar day, zero-filled across the history's date span."""
+    dates = sim_sales['transaction_date'].dt.normalize()
+    daily = sim_sales.groupby(dates)[['quantity_sold', 'revenue']].sum()
+    daily['avg_price'] = sim_sales.groupby(dates)['unit_price'].mean()
+    if daily.empty:
+        return daily
+    full_range = pd.date_range(daily.index.min(), daily.index.max(), freq='D')
+    daily = daily.reindex(full_range)
+    return daily.fillna({'quantity_sold': 0, 'revenue': 0})
+
+
+def elasticity_spread(daily, elasticity):
+    """Standard deviation of the elasticity draw.
+
+    Uses the standard error of a log-log fit of daily units on daily average
+    price when the history has enough price variation, bounded to
+    ELASTICITY_MIN_CV..ELASTICITY_MAX_CV of the elasticity's magnitude.
+    """
+    magnitude = abs(elasticity)
+    sold = daily.dropna(subset=['avg_price'])
+    sold = sold[(sold['quantity_sold'] > 0) & (sold['avg_price'] > 0)]
+    if len(sold) < 10:
+        return ELASTICITY_DEFAULT_CV * magnitude
+    log_price = np.log(sold['avg_price'].to_numpy(dtype='float64'))
+    log_units = np.log(sold['quantity_sold'].to_numpy(dtype='float64'))
+    spread = log_price - log_price.mean()
+    if (spread ** 2).sum() == 0:
+        return ELASTICITY_DEFAULT_CV * magnitude
+    slope = (spread * (log_units - log_units.mean())).sum() / (spread ** 2).sum()
+    residuals = log_units - log_units.mean() - slope * spread
+    standard_error = np.sqrt((residuals ** 2).sum() / (len(sold) - 2) / (spread ** 2).sum())
+    return float(np.clip(standard_error, ELASTICITY_MIN_CV * magnitude, ELASTICITY_MAX_CV * magnitude))
+
+
+def fatigue_spread(daily, duration):
+    """Standard deviation of the duration (fatigue) multiplier draw.
+
+    Uses how far demand drifts between the first and second half of every
+    ``duration``-day window in the history (standard deviation of the log ratio
+    of the halves' daily units), bounded to FATIGUE_MIN_CV..FATIGUE_MAX_CV of
+    duration_factor.
+    """
+    factor = duration_factor(duration)
+    half = duration // 2
+    units = daily['quantity_sold'].to_numpy(dtype='float64')
+    if half == 0:
+        return FATIGUE_MIN_CV * factor
+    if len(units) < duration + 10:
+        return FATIGUE_DEFAULT_CV * factor
+    cumulative = np.concatenate([[0.0], np.cumsum(units)])
+    starts = np.arange(len(units) - duration + 1)
+    early = cumulative[starts + half] - cumulative[starts]
+    late = cumulative[starts + duration] - cumulative[starts + duration - half]
+    valid = (early > 0) & (late > 0)
+    if valid.sum() < 10:
+        return FATIGUE_DEFAULT_CV * factor
+    drift = np.log(late[valid] / early[valid]).std()
+    return float(np.clip(drift * factor, FATIGUE_MIN_CV * factor, FATIGUE_MAX_CV * factor))
+
+
+def _monte_carlo_lost(demand, availability):
+    """Units lost to stockouts per draw and day, for ``demand`` (draws x days).
+
+    Each draw's demand is split across the tracked (SKU, store) pairs of
+    ``availability`` (simulate_inventory) by their share of demand and sold
+    against their stock and reorders. Only pairs whose stock could run short in
+    some draw are stepped, in slices of at most MC_CAP_CELLS cells.
+    """
+    pairs = availability['pairs']
+    lost = np.zeros_like(demand)
+    total_rate = availability['daily_demand'][0] if len(availability['daily_demand']) else 0.0
+    if pairs.empty or total_rate <= 0:
+        return lost
+    shares = pairs['daily_demand'].to_numpy(dtype='float64') / total_rate
+    opening, reorder_point, reorder_quantity, lead_time = _stock_arrays(pairs)
+    at_risk = opening < shares * demand.sum(axis=1).max()
+    if not at_risk.any():
+        return lost
+
+    shares = shares[at_risk]
+    positions = (opening[at_risk], reorder_point[at_risk], reorder_quantity[at_risk], lead_time[at_risk])
+    duration = demand.shape[1]
+    step = max(MC_CAP_CELLS // (duration * len(shares)), 1)
+    for start in range(0, len(demand), step):
+        pair_demand = demand[start:start + step].T[:, :, None] * shares
+        sold = _sell_through(pair_demand, *positions)
+        lost[start:start + step] = (pair_demand - sold).sum(axis=2).T
+    return lost
+
+
+def simulate_monte_carlo(sim_sales, category, discount, duration, promo_type, audience, budget,
+                         draws=MC_DRAW_OPTIONS[0], seed=42, time_budget=MC_TIME_BUDGET,
+                         elasticity=None, elasticity_sd=None, availability=None):
+    """Monte Carlo version of simulate_promotion with P10/P50/P90 bands.
+
+    Each draw samples an elasticity (normal around ``elasticity`` or the category
+    prior, spread ``elasticity_sd`` or else from elasticity_spread), a fatigue
+    multiplier around duration_factor (spread from fatigue_spread), and
+    ``duration`` baseline days bootstrapped from the daily history. With
+    ``availability`` (simulate_inventory) each draw's units are capped at the
+    pairs' stock and reorders before the percentiles are taken. Draws run in
+    chunks of MC_CHUNK until ``draws`` are done or ``time_budget`` seconds have
+    passed.
+
+    Returns None without history; otherwise a dict of cumulative per-day bands
+    (``revenue_bands``, ``units_bands``, ``baseline_revenue_bands``; each maps
+    percentile -> array), percentiles of the campaign totals and
+    ``prob_positive`` (share of draws with positive incremental revenue).
+    """
+    daily = daily_history(sim_sales)
+    if daily.empty:
+        return None
+
+    rng = np.random.default_rng(seed)
+    multiplier = PROMO_TYPE_MULTIPLIERS.get(promo_type, 1.0)
+    elasticity = category_elasticity(category, elasticity) * multiplier
+    if elasticity_sd is None:
+        elasticity_sd = elasticity_spread(daily, elasticity)
+    else:
+        elasticity_sd = abs(elasticity_sd * multiplier)
+    fatigue_sd = fatigue_spread(daily, duration)
+    audience_mult = audience_factor(audience)
+    price = sim_sales['unit_price'].mean() * (1 - discount / 100)
+    daily_units = daily['quantity_sold'].to_numpy(dtype='float64')
+    daily_revenue = daily['revenue'].to_numpy(dtype='float64')
+
+    units_paths = []
+    baseline_paths = []
+    started = time.perf_counter()
+    done = 0
+    while done < draws and (done == 0 or time.perf_counter() - started < time_budget):
+        n = min(MC_CHUNK, draws - done)
+        days = rng.integers(0, len(daily), size=(n, duration))
+        lift = (
+            np.abs(rng.normal(elasticity, elasticity_sd, n)) * discount / 100
+            * np.maximum(rng.normal(duration_factor(duration), fatigue_sd, n), 0)
+            * audience_mult
+        )
+        demand = daily_units[days] * (1 + lift[:, None])
+        if availability is not None:
+            demand -= _monte_carlo_lost(demand, availability)
+        units_paths.append(demand.astype('float32'))
+        baseline_paths.append(daily_revenue[days].astype('float32'))
+        done += n
+
+    units = np.cumsum(np.concatenate(units_paths), axis=1)
+    baseline_revenue = np.cumsum(np.concatenate(baseline_paths), axis=1)
+    revenue = units * price
+    incremental = revenue[:, -1] - baseline_revenue[:, -1]
+
+    def bands(paths):
+        return dict(zip(MC_PERCENTILES, np.percentile(paths, MC_PERCENTILES, axis=0)))
+
+    def totals(values):
+        return dict(zip(MC_PERCENTILES, np.percentile(values, MC_PERCENTILES).tolist()))
+
+    return {
+        'draws': done,
+        'seconds': time.perf_counter() - started,
+        'elasticity_sd': elasticity_sd,
+        'fatigue_sd': fatigue_sd,
+        'days': np.arange(1, duration + 1),
+        'revenue_bands': bands(revenue),
+        'units_bands': bands(units),
+        'baseline_revenue_bands': bands(baseline_revenue),
+        'total_revenue': totals(revenue[:, -1]),
+        'total_units': totals(units[:, -1]),
+        'incremental_revenue': totals(incremental),
+        'roi': totals(incremental / budget * 100) if budget > 0 else dict.fromkeys(MC_PERCENTILES, 0.0),
+        'prob_positive': float((incremental > 0).mean())
+    }
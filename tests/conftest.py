@@ -0,0 +1,41 @@
+"""Shared fixtures for the headless promo_pulse tests."""
+
+import pytest
+
+from promo_pulse import data, elasticity
+
+
+@pytest.fixture(scope="session")
+def sample_frames():
+    """A small sample dataset as star-schema frames."""
+    sales_df, inventory_df, promotions_df, products_df, stores_df = data.generate_sample_data(
+        n_sales=5_000, n_skus=30, n_stores=6, n_days=120, n_promos=40, seed=7
+    )
+    return data.build_star_schema(
+        data.apply_column_schema(sales_df, 'sales'),
+        data.apply_column_schema(inventory_df, 'inventory'),
+        data.apply_column_schema(promotions_df, 'promotions'),
+        products_df, stores_df
+    )
+
+
+@pytest.fixture
+def memo_store(monkeypatch):
+    """A fresh dataset memo store for the test."""
+    store = {}
+    monkeypatch.setattr(data, '_memo_store', store)
+    return store
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the dataset and elasticity caches at a temporary directory."""
+    monkeypatch.setattr(data, 'DATA_CACHE_DIR', tmp_path)
+    monkeypatch.setattr(elasticity, 'ELASTICITY_CACHE_DIR', tmp_path / ".elasticity")
+    return tmp_path
+
+
+@pytest.fixture
+def views(sample_frames, memo_store):
+    """Sales, inventory and promotions views (plus products) with a fresh memo."""
+    return data.dataset_views(sample_frames, "sample-test")
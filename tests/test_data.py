@@ -0,0 +1,52 @@
+"""Timestamp rescue, dataset views and the per-dataset memo."""
+
+import pandas as pd
+
+from promo_pulse import data
+
+
+def test_dataset_views_are_memoized_per_dataset(sample_frames, memo_store):
+    views = data.dataset_views(sample_frames, "dataset-a")
+    assert data.dataset_views(sample_frames, "dataset-a") is views
+    assert 'category' in views[0].columns
+
+    other = data.dataset_views(sample_frames, "dataset-b")
+    assert other is not views
+    assert data.dataset_views(sample_frames) is not data.dataset_views(sample_frames)
+
+
+def test_dataset_memo_only_matches_the_exact_views(sample_frames, memo_store):
+    sales_view = data.dataset_views(sample_frames, "dataset-a")[0]
+    assert data._dataset_memo(sales_view) is not None
+
+    # Copies, sorts and fills keep attrs and length but must not share the memo
+    assert data._dataset_memo(sales_view.copy()) is None
+    assert data._dataset_memo(sales_view.sort_values('revenue')) is None
+    assert data._dataset_memo(sales_view.fillna({'revenue': 0})) is None
+    assert data._dataset_memo(sales_view.head(10)) is None
+
+
+def test_rescue_timestamps_parses_each_format_group():
+    values = pd.Series([
+        '2024-03-05 10:20:30', '2024-03-05T10:20:30', ' 2024-03-05 10:20', '2024-03-05',
+        '2024/03/05', '5/3/2024 10:20', '05/03/2024', '1709634030', '1709634030000',
+    ])
+    parsed, issues = data.rescue_timestamps(values, window_end=pd.Timestamp('2025-01-01'))
+    expected = pd.to_datetime([
+        '2024-03-05 10:20:30', '2024-03-05 10:20:30', '2024-03-05 10:20', '2024-03-05',
+        '2024-03-05', '2024-03-05 10:20', '2024-03-05', '2024-03-05 10:20:30', '2024-03-05 10:20:30',
+    ], format='ISO8601')
+    assert (parsed.to_numpy() == expected.to_numpy(dtype='datetime64[us]')).all()
+    assert (issues == 'ok').all()
+
+
+def test_rescue_timestamps_flags_bad_values():
+    values = pd.Series(['', 'NULL', None, 'soon', '2024-02-30', '1970-01-01', '1900-01-01 00:00',
+                        '1990-06-01', '2030-01-01', '2024-06-01'])
+    parsed, issues = data.rescue_timestamps(values, window_end=pd.Timestamp('2025-01-01'))
+    assert issues.tolist() == [
+        'missing', 'missing', 'missing', 'unparseable', 'invalid_date', 'epoch_sentinel',
+        'epoch_sentinel', 'out_of_window', 'out_of_window', 'ok',
+    ]
+    assert parsed.isna().tolist() == [True] * 9 + [False]
+    assert list(issues.cat.categories) == data.TIMESTAMP_ISSUES
@@ -0,0 +1,43 @@
+"""LTTB downsampling of trend series."""
+
+import numpy as np
+import pandas as pd
+
+from promo_pulse.downsampling import MIN_POINTS, downsample, lttb_indices, point_budget
+
+
+def test_lttb_keeps_endpoints_within_budget():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=5000).cumsum()
+    x = np.arange(len(y), dtype='float64')
+    for n_out in (3, 50, 731):
+        kept = lttb_indices(x, y, n_out)
+        assert len(kept) == n_out
+        assert kept[0] == 0 and kept[-1] == len(y) - 1
+        assert (np.diff(kept) > 0).all()
+
+
+def test_lttb_keeps_spikes():
+    y = np.zeros(1000)
+    y[[137, 612]] = [50.0, -40.0]
+    kept = lttb_indices(np.arange(1000), y, 60)
+    assert {137, 612} <= set(kept.tolist())
+
+
+def test_short_series_and_budgets():
+    assert lttb_indices(np.arange(10), np.arange(10), 20).tolist() == list(range(10))
+    assert lttb_indices(np.arange(10), np.arange(10), 2).tolist() == list(range(10))
+    assert point_budget(40) == MIN_POINTS
+    assert point_budget(1200) == 600
+
+
+def test_downsample_on_dates():
+    frame = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=400, freq='D'),
+        'revenue': np.sin(np.arange(400) / 10),
+    })
+    assert downsample(frame, 'date', 'revenue', 500) is frame
+    sampled = downsample(frame, 'date', 'revenue', 80)
+    assert len(sampled) == 80
+    assert sampled['date'].iloc[0] == frame['date'].iloc[0]
+    assert sampled['date'].iloc[-1] == frame['date'].iloc[-1]
@@ -0,0 +1,67 @@
+"""Elasticity estimates and their disk cache."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from promo_pulse import data, elasticity
+from promo_pulse.simulation import CATEGORY_ELASTICITY
+
+
+def synthetic_observations(category, slope, n_skus, n_days, seed=0):
+    """Daily (SKU, price, units) rows with log-linear demand of the given slope."""
+    rng = np.random.default_rng(seed)
+    sku = np.repeat([f"{category}-{i}" for i in range(n_skus)], n_days)
+    base_price = np.repeat(rng.uniform(10, 100, n_skus), n_days)
+    price = base_price * rng.uniform(0.6, 1.0, len(sku))
+    intercept = np.repeat(rng.uniform(3, 6, n_skus), n_days)
+    units = np.exp(intercept + slope * np.log(price / base_price) + rng.normal(0, 0.05, len(sku)))
+    return pd.DataFrame({'sku_id': sku, 'category': category, 'units': units, 'price': price})
+
+
+def test_fit_recovers_a_known_slope():
+    observations = pd.concat([
+        synthetic_observations('Electronics', -1.2, n_skus=6, n_days=120),
+        synthetic_observations('Clothing', -2.8, n_skus=1, n_days=10, seed=1),
+        synthetic_observations('Unlisted', -1.0, n_skus=1, n_days=10, seed=2),
+    ], ignore_index=True)
+    estimates = elasticity.fit_elasticities(observations)
+    categories = estimates[estimates['level'] == 'category'].set_index('category')
+
+    fitted = categories.loc['Electronics']
+    assert fitted['source'] == 'fitted'
+    assert fitted['raw_estimate'] == pytest.approx(-1.2, abs=0.02)
+    assert fitted['elasticity'] == pytest.approx(-1.2, abs=0.02)
+    assert fitted['weight'] > 0.99
+
+    # Too few observations: the prior (or the default for unknown categories) is kept
+    assert categories.loc['Clothing', 'source'] == 'prior'
+    assert categories.loc['Clothing', 'elasticity'] == CATEGORY_ELASTICITY['Clothing']
+    assert categories.loc['Unlisted', 'source'] == 'default'
+
+    skus = estimates[(estimates['level'] == 'sku') & (estimates['category'] == 'Electronics')]
+    assert len(skus) == 6
+    assert skus['elasticity'].to_numpy() == pytest.approx(-1.2, abs=0.05)
+    looked_up = elasticity.lookup_elasticity(estimates, 'Electronics', skus['sku_id'].iloc[0])
+    assert looked_up['level'] == 'sku'
+
+
+def test_dataset_cache_pruning_keeps_elasticity_tables(sample_frames, memo_store, cache_dir):
+    sales_view = data.dataset_views(sample_frames, dataset_id="sample-test")[0]
+    elasticity.estimate_elasticities(sales_view)
+    tables = list((cache_dir / ".elasticity").glob("*.parquet"))
+    assert len(tables) == 1
+
+    for i in range(data.DATA_CACHE_MAX_ENTRIES + 1):
+        data.write_dataset_cache(f"dataset-{i}", {'sales': sample_frames['sales'].head(10)})
+
+    assert all(table.exists() for table in tables)
+    assert len([p for p in cache_dir.iterdir() if not p.name.startswith(".")]) == data.DATA_CACHE_MAX_ENTRIES
+
+
+def test_elasticity_cache_is_bounded(sample_frames, memo_store, cache_dir, monkeypatch):
+    monkeypatch.setattr(elasticity, 'ELASTICITY_CACHE_MAX_ENTRIES', 2)
+    sales_view = data.dataset_views(sample_frames, dataset_id="sample-test")[0]
+    for store_id in sorted(sales_view['store_id'].unique())[:4]:
+        elasticity.estimate_elasticities(sales_view, {'store_id': store_id})
+    assert len(list((cache_dir / ".elasticity").glob("*.parquet"))) == 2
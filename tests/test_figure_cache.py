@@ -0,0 +1,46 @@
+"""Figure cache eviction and fingerprints."""
+
+import numpy as np
+import pandas as pd
+
+from promo_pulse.figure_cache import FigureCache, fingerprint
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = FigureCache(max_entries=2, max_bytes=1024)
+    cache.put('a', '{"a": 1}')
+    cache.put('b', '{"b": 2}')
+    assert cache.get('a') == '{"a": 1}'  # a is now more recent than b
+    cache.put('c', '{"c": 3}')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == '{"a": 1}' and cache.get('c') == '{"c": 3}'
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_byte_cap_evicts_until_the_total_fits():
+    cache = FigureCache(max_entries=10, max_bytes=10)
+    cache.put('a', 'x' * 4)
+    cache.put('b', 'y' * 4)
+    cache.put('c', 'z' * 4)
+    assert cache.get('a') is None
+    assert cache.total_bytes == 8
+
+    cache.put('b', 'w' * 2)  # replacing an entry releases its old size
+    assert cache.total_bytes == 6
+
+    cache.put('huge', 'h' * 11)  # larger than the cap: never stored
+    assert cache.get('huge') is None
+    assert cache.get('b') == 'ww' and cache.get('c') == 'zzzz'
+
+
+def test_fingerprint_tracks_content():
+    frame = pd.DataFrame({'x': np.arange(5000), 'y': np.ones(5000)})
+    changed = frame.copy()
+    changed.loc[2500, 'y'] = 2.0  # in the middle, which repr() would elide
+    assert fingerprint(frame, {'title': 'A'}) == fingerprint(frame.copy(), {'title': 'A'})
+    assert fingerprint(frame, {'title': 'A'}) != fingerprint(changed, {'title': 'A'})
+    assert fingerprint(frame, {'title': 'A'}) != fingerprint(frame, {'title': 'B'})
+    assert fingerprint(np.arange(5000)) != fingerprint(np.arange(5000) * 2)
@@ -0,0 +1,53 @@
+"""Each dashboard render function runs exactly once per rerun.
+
+The app is driven headlessly with Streamlit's AppTest on the sample dataset; the
+counts come from ``track_render`` via ``session_state['render_counts']``.
+"""
+
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+
+APP_PATH = Path(__file__).resolve().parents[1] / "app.py"
+
+SECTION_RENDERERS = {
+    "🧹 Data Cleaning": 'render_data_cleaning',
+    "📈 Sales Analytics": 'render_sales_analysis',
+    "📦 Inventory Health": 'render_inventory_analysis',
+    "🎯 Promotions": 'render_promotions_analysis',
+    "🧪 What-If Simulator": 'render_promo_simulator',
+    "🏪 Store Performance": 'render_store_performance',
+    "⏰ Time Analysis": 'render_time_analysis',
+}
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = AppTest.from_file(str(APP_PATH), default_timeout=300)
+    app.run()
+    return app
+
+
+def assert_rendered_once(app, section_renderer):
+    assert not app.exception, [error.message for error in app.exception]
+    counts = dict(app.session_state['render_counts'])
+    assert {'render_sidebar', 'render_overview_kpis', section_renderer} <= set(counts)
+    assert all(count == 1 for count in counts.values()), counts
+
+
+def test_initial_run_renders_once(app):
+    assert_rendered_once(app, SECTION_RENDERERS[app.radio(key='main_section').value])
+
+
+@pytest.mark.parametrize("section", list(SECTION_RENDERERS))
+def test_section_renders_once(app, section):
+    app.radio(key='main_section').set_value(section).run()
+    assert_rendered_once(app, SECTION_RENDERERS[section])
+
+
+def test_simulation_results_render_once(app):
+    app.radio(key='main_section').set_value("🧪 What-If Simulator").run()
+    app.button(key='run_sim_btn').click().run()
+    assert_rendered_once(app, 'render_promo_simulator')
@@ -0,0 +1,120 @@
+"""Scenario grid, optimizer, Monte Carlo and inventory sell-through."""
+
+import numpy as np
+import pytest
+
+from promo_pulse import simulation
+from promo_pulse.analytics import filter_rows
+
+
+GRID_TO_SCALAR = {
+    'lift': 'final_lift',
+    'projected_units': 'projected_total_units',
+    'projected_revenue': 'projected_total_revenue',
+    'baseline_revenue': 'baseline_revenue',
+    'incremental_revenue': 'incremental_revenue',
+    'discount_cost': 'discount_cost',
+    'net_impact': 'net_impact',
+    'roi': 'roi',
+}
+
+
+@pytest.fixture
+def sim_sales(views):
+    sales = views[0]
+    return filter_rows(sales, {'category': sales['category'].iloc[0]})
+
+
+def test_simulate_grid_matches_simulate_promotion(sim_sales):
+    category = sim_sales['category'].iloc[0]
+    audiences = [("All Customers",), ("Premium Members", "High-Value Customers", "New Customers")]
+    grid = simulation.simulate_grid(
+        sim_sales, category, 25000, discounts=[5, 20, 45], durations=[3, 7, 14, 30],
+        audiences=audiences, elasticity=-1.7
+    )
+    baseline = simulation.simulation_baseline(sim_sales)
+    for row in simulation.grid_frame(grid).itertuples(index=False):
+        expected = simulation.simulate_promotion(
+            baseline, category, row.discount, row.duration, row.promo_type, row.audience, 25000,
+            elasticity=-1.7
+        )
+        for metric, key in GRID_TO_SCALAR.items():
+            assert getattr(row, metric) == pytest.approx(expected[key], rel=1e-9)
+
+
+def test_optimizer_respects_constraints_and_frontier_is_pareto(sim_sales):
+    category = sim_sales['category'].iloc[0]
+    baseline = simulation.simulation_baseline(sim_sales)
+    stock_cap = baseline['daily_units'] * 20
+    result = simulation.optimize_promotion(
+        sim_sales, category, 20000, margin_floor=0.1, stock_cap=stock_cap, durations=range(1, 31, 3)
+    )
+    best, frontier = result['best'], result['frontier']
+    assert best is not None and 0 < result['feasible'] < result['evaluated']
+
+    for scenario in [best, *frontier.to_dict('records')]:
+        assert scenario['discount_cost'] <= 20000
+        assert scenario['margin'] >= 0.1
+        assert scenario['projected_units'] <= stock_cap
+    assert best['incremental_revenue'] == pytest.approx(frontier['incremental_revenue'].max())
+    # Along the frontier revenue falls as margin rises
+    assert (np.diff(frontier['incremental_revenue']) <= 0).all()
+    assert (np.diff(frontier['margin']) > 0).all()
+
+
+def test_pareto_frontier_keeps_exactly_the_undominated_points():
+    rng = np.random.default_rng(3)
+    revenue = rng.normal(size=300)
+    margin = rng.normal(size=300)
+    undominated = {
+        i for i in range(len(revenue))
+        if not ((revenue > revenue[i]) & (margin > margin[i])).any()
+    }
+    frontier = simulation.pareto_frontier(revenue, margin)
+    assert set(frontier.tolist()) == undominated
+    assert (np.diff(revenue[frontier]) < 0).all()
+
+
+def test_monte_carlo_is_reproducible_for_a_seed(sim_sales, views):
+    category = sim_sales['category'].iloc[0]
+    availability = simulation.simulate_inventory(sim_sales, views[1], 0.4, 14)
+    kwargs = dict(draws=2000, time_budget=float('inf'), availability=availability)
+    args = (sim_sales, category, 25, 14, "Flash Sale", ("All Customers",), 20000)
+
+    first = simulation.simulate_monte_carlo(*args, seed=7, **kwargs)
+    second = simulation.simulate_monte_carlo(*args, seed=7, **kwargs)
+    other = simulation.simulate_monte_carlo(*args, seed=8, **kwargs)
+
+    assert first['draws'] == second['draws'] == 2000
+    for key in ('total_revenue', 'total_units', 'incremental_revenue', 'prob_positive'):
+        assert first[key] == second[key]
+    for percentile in simulation.MC_PERCENTILES:
+        np.testing.assert_array_equal(first['revenue_bands'][percentile], second['revenue_bands'][percentile])
+    assert first['total_revenue'] != other['total_revenue']
+
+
+def test_sell_through_caps_at_stock_and_lands_reorders():
+    demand = np.full((6, 2), 4.0)
+    sold = simulation._sell_through(
+        demand,
+        opening=np.array([10.0, 10.0]),
+        reorder_point=np.array([2.0, 2.0]),
+        # Pair 0 orders 20 units; pair 1 has no quantity and orders back up to opening
+        reorder_quantity=np.array([20.0, np.nan]),
+        lead_time=np.array([2, 1]),
+    )
+    # Pair 0 hits the reorder point on day 1, sells out on day 2 and restocks on day 3
+    np.testing.assert_array_equal(sold[:, 0], [4, 4, 2, 4, 4, 4])
+    # Pair 1's one-day orders of 8 arrive before it runs out
+    np.testing.assert_array_equal(sold[:, 1], [4, 4, 4, 4, 4, 4])
+
+
+def test_sell_through_scenarios_are_independent():
+    rng = np.random.default_rng(0)
+    demand = rng.uniform(0, 6, size=(10, 5, 3))
+    positions = (np.array([20.0, 5.0, 40.0]), np.array([5.0, 1.0, 10.0]), np.array([10.0, np.nan, 15.0]),
+                 np.array([3, 2, 4]))
+    sold = simulation._sell_through(demand, *positions)
+    assert (sold <= demand + 1e-12).all()
+    for draw in range(demand.shape[1]):
+        np.testing.assert_allclose(sold[:, draw], simulation._sell_through(demand[:, draw], *positions))